@@ -6,19 +6,24 @@ Claims Processing Workflow with LangGraph
 # ---- libraries ----- #
 #======================#
 
-from openai import OpenAI  
+from openai import OpenAI
 from enum import Enum
 import json
 from pydantic import BaseModel, Field  
 from typing import List, Dict, Optional, Literal, TypedDict, Annotated
 import os
+import sys
 from dotenv import load_dotenv
-import argparse
+import threading
+import uuid
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.messages import HumanMessage, SystemMessage
 import logging
 
+# Reintentos, rate limit, batch/streaming y CLI: claims_runtime.py (junto a este script)
+from claims_runtime import RetryPolicy, main, throttle
+
 #========================================#
 # ----- setup logging ----- #
 #========================================#
@@ -33,7 +38,8 @@ logger = logging.getLogger(__name__)
 # ----- load environment variables ----- #
 #========================================#
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# max_retries=0: los reintentos los gestiona RetryPolicy (backoff + presupuesto por claim)
+client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
 
 #===========================#
 # ----- define models ----- #
@@ -48,6 +54,7 @@ class OpenAIModels(str, Enum):
 MODEL = OpenAIModels.GPT_41_MINI
 
 
+
 def get_completion(
     messages: Optional[List[Dict[str, str]]] = None,
     system_prompt: Optional[str] = None,
@@ -65,6 +72,8 @@ def get_completion(
     if not messages_list:
         raise ValueError("Must provide messages or prompts")
     
+    throttle()  # --max-rps
+    
     try:
         response = client.chat.completions.create(
             model=model or MODEL.value,
@@ -216,6 +225,37 @@ def gate3_validate_routing(routing_json: str) -> ClaimRouting:
         raise ValueError(f"Invalid routing format: {e}") from e
 
 
+#================================#   
+# ----- Routing Rules ----- #
+#================================#
+
+# Las reglas de QUEUE_ROUTING_PROMPT son una funcion pura de severity y damage_area:
+# se evaluan localmente, en orden (gana la primera), y el LLM solo decide si ninguna aplica
+GLASS_AREAS = {"windshield", "glass"}
+ROUTING_RULES = [
+    ("glass", lambda info, severity: severity.severity == "Low" and set(info.damage_area) <= GLASS_AREAS),
+    ("fast_track", lambda info, severity: severity.severity == "Low"),
+    ("material_damage", lambda info, severity: severity.severity == "Medium"),
+    ("total_loss", lambda info, severity: severity.severity == "High"),
+]
+
+
+def route_by_rules(claim_info: ClaimInformation, severity: SeverityAssessment) -> Optional[ClaimRouting]:
+    """Cola de la primera regla que aplica, o None si la decision queda para el LLM"""
+    for queue, applies in ROUTING_RULES:
+        if applies(claim_info, severity):
+            return ClaimRouting(claim_id=claim_info.claim_id, queue=queue)
+    return None
+
+
+#================================#   
+# ----- Retry Policy ----- #
+#================================#
+
+# Backoff en errores transitorios y re-pregunta con el error del gate (ver claims_runtime.RetryPolicy)
+retry_policy = RetryPolicy(get_completion)
+
+
 #================================#   
 # ----- LangGraph Nodes ----- #
 #================================#
@@ -229,8 +269,7 @@ def extract_claim_node(state: ClaimWorkflowState) -> ClaimWorkflowState:
             {"role": "system", "content": INFO_EXTRACTION_PROMPT},
             {"role": "user", "content": state["fnol"]}
         ]
-        response = get_completion(messages=messages, model=state.get("model"))
-        claim_info = gate1_validate_claims_info(response)
+        claim_info = retry_policy.run("extract_claim", state, messages, gate1_validate_claims_info)
         
         logger.info(f"✅ Extracted claim: {claim_info.claim_id}")
         
@@ -243,13 +282,6 @@ def extract_claim_node(state: ClaimWorkflowState) -> ClaimWorkflowState:
     except Exception as e:
         logger.error(f"❌ Extraction failed: {e}")
         state["errors"].append(f"Extraction error: {e}")
-        state["retry_count"] += 1
-        
-        # Retry logic
-        if state["retry_count"] < 3:
-            logger.warning(f"🔄 Retrying... (attempt {state['retry_count']})")
-            return extract_claim_node(state)
-        
         return {**state, "status": "failed"}
 
 
@@ -263,8 +295,7 @@ def assess_severity_node(state: ClaimWorkflowState) -> ClaimWorkflowState:
             {"role": "system", "content": SEVERITY_ASSESSMENT_PROMPT},
             {"role": "user", "content": claim_json}
         ]
-        response = get_completion(messages=messages, model=state.get("model"))
-        severity = gate2_cost_range_ok(response)
+        severity = retry_policy.run("assess_severity", state, messages, gate2_cost_range_ok)
         
         logger.info(f"✅ Severity: {severity.severity} (${severity.est_cost})")
         
@@ -281,10 +312,19 @@ def assess_severity_node(state: ClaimWorkflowState) -> ClaimWorkflowState:
 
 
 def route_claim_node(state: ClaimWorkflowState) -> ClaimWorkflowState:
-    """Node 3: Route claim to appropriate queue"""
+    """Node 3: Route claim to appropriate queue (reglas locales primero, LLM si ninguna aplica)"""
     logger.info(f"🚦 Routing claim {state['claim_info'].claim_id}...")
     
     try:
+        routing = route_by_rules(state["claim_info"], state["severity"])
+        if routing is not None:
+            logger.info(f"✅ Routed to: {routing.queue} (regla local)")
+            return {
+                **state,
+                "routing": routing,
+                "status": "completed"
+            }
+        
         routing_input = {
             'claim_info': state["claim_info"].model_dump(),
             'severity_assessment': state["severity"].model_dump()
@@ -293,8 +333,7 @@ def route_claim_node(state: ClaimWorkflowState) -> ClaimWorkflowState:
             {"role": "system", "content": QUEUE_ROUTING_PROMPT},
             {"role": "user", "content": json.dumps(routing_input)}
         ]
-        response = get_completion(messages=messages, model=state.get("model"))
-        routing = gate3_validate_routing(response)
+        routing = retry_policy.run("route_claim", state, messages, gate3_validate_routing)
         
         logger.info(f"✅ Routed to: {routing.queue}")
         
@@ -363,16 +402,26 @@ def build_workflow() -> StateGraph:
 # ----- Process Claims ----- #
 #================================#
 
-def process_claim(fnol: str, model: str = None) -> Dict:
+# El grafo se compila una sola vez y se reutiliza para todos los claims.
+# Cada claim corre en su propio thread_id, asi que el checkpointer compartido no mezcla estados.
+_memory = MemorySaver()
+_app = None
+_app_lock = threading.Lock()
+
+
+def get_app():
+    """Devuelve el workflow compilado (se compila en la primera llamada)"""
+    global _app
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                _app = build_workflow().compile(checkpointer=_memory)
+    return _app
+
+
+def process_claim(fnol: str, model: str = None, thread_id: str = None) -> Dict:
     """Procesa un solo claim a través del workflow"""
     
-    # Construir workflow
-    workflow = build_workflow()
-    
-    # Compilar con memoria para checkpoint
-    memory = MemorySaver()
-    app = workflow.compile(checkpointer=memory)
-    
     # Estado inicial
     initial_state: ClaimWorkflowState = {
         "fnol": fnol,
@@ -385,139 +434,23 @@ def process_claim(fnol: str, model: str = None) -> Dict:
         "model": model or MODEL.value
     }
     
-    # Ejecutar workflow
-    config = {"configurable": {"thread_id": "claim_processing"}}
-    final_state = app.invoke(initial_state, config)
+    # Ejecutar workflow con un thread_id propio por claim
+    thread_id = thread_id or f"claim-{uuid.uuid4().hex}"
+    config = {"configurable": {"thread_id": thread_id}}
+    try:
+        final_state = get_app().invoke(initial_state, config)
+    finally:
+        # El resultado se devuelve al caller; el checkpoint ya no hace falta y en un
+        # backlog grande acumularia memoria
+        _memory.delete_thread(thread_id)
     
     return final_state
 
 
-def process_batch(fnols: List[str], model: str = None) -> List[Dict]:
-    """Procesa múltiples claims"""
-    results = []
-    
-    for i, fnol in enumerate(fnols, 1):
-        logger.info(f"\n{'='*60}")
-        logger.info(f"Processing claim {i}/{len(fnols)}")
-        logger.info(f"{'='*60}")
-        
-        result = process_claim(fnol, model)
-        results.append(result)
-    
-    return results
-
-
 #================================#   
 # ----- CLI with argparse ----- #
 #================================#
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="Claims Processing Workflow with LangGraph",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  # Process single claim
-  python workflow.py --fnol "Claim ID: C001..."
-  
-  # Process batch from file
-  python workflow.py --batch claims.json
-  
-  # Use different model
-  python workflow.py --batch claims.json --model gpt-4o-mini
-  
-  # Debug mode
-  python workflow.py --batch claims.json --debug
-        """
-    )
-    
-    # Input options
-    input_group = parser.add_mutually_exclusive_group(required=True)
-    input_group.add_argument(
-        "--fnol",
-        type=str,
-        help="Single FNOL report text"
-    )
-    input_group.add_argument(
-        "--batch",
-        type=str,
-        help="JSON file with array of FNOL reports"
-    )
-    
-    # Model options
-    parser.add_argument(
-        "--model",
-        type=str,
-        choices=["gpt-4o-mini", "gpt-4.1-mini", "gpt-4.1-nano"],
-        default="gpt-4.1-nano",
-        help="OpenAI model to use (default: gpt-4.1-nano)"
-    )
-    
-    # Output options
-    parser.add_argument(
-        "--output",
-        type=str,
-        help="Output JSON file for results"
-    )
-    
-    # Logging options
-    parser.add_argument(
-        "--debug",
-        action="store_true",
-        help="Enable debug logging"
-    )
-    
-    parser.add_argument(
-        "--quiet",
-        action="store_true",
-        help="Suppress output (only errors)"
-    )
-    
-    args = parser.parse_args()
-    
-    # Configure logging
-    if args.debug:
-        logger.setLevel(logging.DEBUG)
-    elif args.quiet:
-        logger.setLevel(logging.ERROR)
-    
-    # Process claims
-    try:
-        if args.fnol:
-            # Single claim
-            result = process_claim(args.fnol, args.model)
-            results = [result]
-        else:
-            # Batch processing
-            with open(args.batch, 'r') as f:
-                fnols = json.load(f)
-            results = process_batch(fnols, args.model)
-        
-        # Output results
-        if args.output:
-            with open(args.output, 'w') as f:
-                json.dump(results, f, indent=2, default=str)
-            logger.info(f"\n✅ Results saved to {args.output}")
-        else:
-            # Print to console
-            print("\n" + "="*60)
-            print("RESULTS")
-            print("="*60)
-            for result in results:
-                if result.get("claim_info"):
-                    print(f"\nClaim: {result['claim_info'].claim_id}")
-                    print(f"Severity: {result['severity'].severity if result.get('severity') else 'N/A'}")
-                    print(f"Queue: {result['routing'].queue if result.get('routing') else 'N/A'}")
-                    print(f"Status: {result['status']}")
-                    if result['errors']:
-                        print(f"Errors: {result['errors']}")
-    
-    except Exception as e:
-        logger.error(f"❌ Fatal error: {e}")
-        return 1
-    
-    return 0
-
-
+# --fnol, --batch, --jsonl, --watch, --shards, ...: ver claims_runtime.main
 if __name__ == "__main__":
-    exit(main())
\ No newline at end of file
+    exit(main(sys.modules[__name__]))
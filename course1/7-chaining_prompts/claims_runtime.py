@@ -0,0 +1,1252 @@
+'''
+Batch runtime for the LangGraph claims workflow (chaining-prompting_langgraph.py)
+
+Todo lo que no es el grafo en sí: reintentos y rate limit de las llamadas al LLM,
+batch concurrente, streaming JSONL, sink Parquet, shards multi-proceso, el daemon
+que vigila un inbox y la CLI. Las funciones reciben el módulo del workflow (`demo`)
+y usan su process_claim(), get_app() y retry_policy.
+'''
+
+#======================#
+# ---- libraries ----- #
+#======================#
+
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError
+)
+import json
+from pydantic import BaseModel
+from typing import Callable, List, Dict, Optional, Iterable, Iterator
+import os
+import argparse
+import ctypes
+import hashlib
+import importlib.util
+import multiprocessing
+import multiprocessing.connection
+import random
+import select
+import shutil
+import signal
+import struct
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from array import array
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+import logging
+from datetime import datetime, timezone
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow es opcional: solo hace falta para --output *.parquet
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+#================================#   
+# ----- Rate Limit ----- #
+#================================#
+
+class RateLimiter:
+    """Espacia las llamadas al LLM para no pasar de `rate` peticiones por segundo (thread-safe)"""
+    
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+    
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# Límite de peticiones/segundo de este proceso (--max-rps); None = sin límite
+rate_limiter: Optional[RateLimiter] = None
+
+
+def set_max_rps(max_rps: Optional[float]) -> None:
+    """Fija el límite de peticiones/segundo del proceso (None = sin límite)"""
+    global rate_limiter
+    rate_limiter = RateLimiter(max_rps) if max_rps else None
+
+
+def throttle() -> None:
+    """Espera el turno de la próxima llamada al LLM (get_completion la llama antes de cada petición)"""
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+
+
+#================================#   
+# ----- Retry Policy ----- #
+#================================#
+
+TRANSIENT_ERRORS = (APIConnectionError, APITimeoutError, InternalServerError, RateLimitError)
+
+GATE_FEEDBACK_PROMPT = (
+    "Your previous answer was rejected by validation: {error}\n"
+    "Return a corrected JSON object only."
+)
+
+
+def is_transient(error: Exception) -> bool:
+    """Errores de red / 429 / 5xx (get_completion los envuelve en RuntimeError)"""
+    return isinstance(error, TRANSIENT_ERRORS) or isinstance(error.__cause__, TRANSIENT_ERRORS)
+
+
+class RetryMetrics:
+    """Contadores por nodo, thread-safe (se comparten entre claims en paralelo)"""
+    
+    FIELDS = ("calls", "transient_retries", "gate_reasks", "recovered", "exhausted")
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+    
+    def add(self, node: str, field: str, value: int = 1) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(node, dict.fromkeys(self.FIELDS, 0))
+            counts[field] += value
+    
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {node: dict(counts) for node, counts in self._counts.items()}
+    
+    def log_summary(self) -> None:
+        for node, counts in self.snapshot().items():
+            logger.info(f"🔁 {node}: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
+
+
+class RetryPolicy:
+    """
+    Política de reintentos reutilizable para los nodos.
+    
+    - Errores transitorios de la API: backoff exponencial con jitter (respeta Retry-After)
+    - Errores de validación del gate: se re-pregunta al LLM con el error del gate
+      añadido a la conversación (como mucho `gate_reasks` veces por nodo)
+    - Todos los reintentos de un claim consumen un presupuesto común
+      (`claim_budget`, contado en state["retry_count"])
+    
+    `complete` es la función que llama al LLM (get_completion del workflow).
+    """
+    
+    def __init__(self, complete: Callable[..., str], max_transient_retries: int = 3, gate_reasks: int = 1,
+                 claim_budget: int = 4, base_delay: float = 0.5, max_delay: float = 8.0):
+        self.complete = complete
+        self.max_transient_retries = max_transient_retries
+        self.gate_reasks = gate_reasks
+        self.claim_budget = claim_budget
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.metrics = RetryMetrics()
+    
+    def backoff(self, attempt: int, error: Exception) -> float:
+        """Segundos a esperar antes del reintento `attempt` (0-based)"""
+        cause = error.__cause__ if isinstance(error.__cause__, RateLimitError) else error
+        response = getattr(cause, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(self.max_delay, float(retry_after))
+            except ValueError:
+                pass
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return delay * random.uniform(0.5, 1.0)
+    
+    def run(self, node: str, state: Dict, messages: List[Dict[str, str]], validate):
+        """
+        Llama al LLM y valida la respuesta aplicando la política.
+        
+        Parameters:
+        node (str): Nombre del nodo (para métricas)
+        state (dict): Estado del claim; se actualiza state["retry_count"]
+        messages (list): Mensajes del prompt
+        validate (callable): Gate que recibe el texto y devuelve el modelo o lanza ValueError
+        
+        Returns:
+        BaseModel: La respuesta validada
+        """
+        conversation = list(messages)
+        transient = reasks = 0
+        self.metrics.add(node, "calls")
+        while True:
+            try:
+                response = self.complete(messages=conversation, model=state.get("model"))
+                result = validate(response)
+                if transient or reasks:
+                    self.metrics.add(node, "recovered")
+                return result
+            except Exception as e:
+                budget_left = state["retry_count"] < self.claim_budget
+                if is_transient(e) and transient < self.max_transient_retries and budget_left:
+                    delay = self.backoff(transient, e)
+                    transient += 1
+                    state["retry_count"] += 1
+                    self.metrics.add(node, "transient_retries")
+                    logger.warning(f"🔄 {node}: transient error, retry {transient} in {delay:.2f}s ({e})")
+                    time.sleep(delay)
+                elif isinstance(e, ValueError) and reasks < self.gate_reasks and budget_left:
+                    reasks += 1
+                    state["retry_count"] += 1
+                    self.metrics.add(node, "gate_reasks")
+                    logger.warning(f"🔄 {node}: gate rejected answer, re-asking with feedback ({e})")
+                    conversation = list(messages) + [
+                        {"role": "assistant", "content": response},
+                        {"role": "user", "content": GATE_FEEDBACK_PROMPT.format(error=e)}
+                    ]
+                else:
+                    self.metrics.add(node, "exhausted")
+                    raise
+
+
+
+
+#================================#   
+# ----- Batch ----- #
+#================================#
+
+def _safe_process_claim(demo, fnol: str, model: str, label) -> Dict:
+    """
+    Ejecuta un claim atrapando cualquier excepción: un claim roto no debe tumbar el batch.
+    
+    Añade al resultado started_at (UTC) y elapsed_s para los sinks de resultados.
+    """
+    logger.info(f"Processing claim {label}")
+    started_at = datetime.now(timezone.utc)
+    start = time.perf_counter()
+    try:
+        result = demo.process_claim(fnol, model, thread_id=f"claim-{label}-{uuid.uuid4().hex[:8]}")
+    except Exception as e:
+        logger.error(f"❌ Claim {label} crashed: {e}")
+        result = {"fnol": fnol, "claim_info": None, "severity": None, "routing": None,
+                  "errors": [f"Workflow error: {e}"], "status": "failed", "model": model}
+    return {**result, "started_at": started_at, "elapsed_s": time.perf_counter() - start}
+
+
+def process_batch(demo, fnols: List[str], model: str = None, concurrency: int = 8) -> List[Dict]:
+    """
+    Procesa múltiples claims en paralelo.
+    
+    Las llamadas al LLM son I/O, así que un thread pool con `concurrency` workers
+    solapa la latencia de la API. El resultado mantiene el orden de entrada.
+    """
+    total = len(fnols)
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        results = list(executor.map(
+            lambda item: _safe_process_claim(demo, item[1], model, f"{item[0]}/{total}"),
+            enumerate(fnols, 1)
+        ))
+    elapsed = time.perf_counter() - start
+    
+    completed = sum(1 for result in results if result["status"] == "completed")
+    throughput = total / elapsed if elapsed > 0 else 0.0
+    logger.info(f"📈 Batch done: {completed}/{total} completed in {elapsed:.1f}s "
+                f"({throughput:.2f} claims/sec, concurrency={concurrency})")
+    demo.retry_policy.metrics.log_summary()
+    
+    return results
+
+
+
+#================================#   
+# ----- Streaming JSONL ----- #
+#================================#
+
+def fnol_key(fnol: str) -> str:
+    """Id estable para un FNOL sin id explícito (hash del texto)"""
+    return hashlib.sha1(fnol.encode("utf-8")).hexdigest()[:16]
+
+
+def iter_jsonl_fnols(path: str) -> Iterator[Dict]:
+    """
+    Lee FNOLs de un archivo JSONL (o stdin con "-") sin cargarlo entero en memoria.
+    
+    Cada línea es un string JSON con el FNOL, o un objeto {"fnol": ..., "id": ...}.
+    Una línea mal formada no corta el run: se entrega como {"id": "line-N", "error": ...}
+    y acaba en la salida como un claim fallido.
+    """
+    source = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        for line_no, line in enumerate(source, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                record = {"error": f"invalid JSON ({e})"}
+            if isinstance(record, str):
+                record = {"fnol": record}
+            if not isinstance(record, dict) or not isinstance(record.get("fnol"), str):
+                error = record.get("error") if isinstance(record, dict) else None
+                error = error or "expected a FNOL string or an object with 'fnol'"
+                logger.warning(f"⚠️ Line {line_no}: {error}")
+                yield {"id": f"line-{line_no}", "fnol": None, "error": f"Line {line_no}: {error}"}
+                continue
+            yield {"id": str(record.get("id") or fnol_key(record["fnol"])), "fnol": record["fnol"]}
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+
+def load_done_ids(path: str) -> set:
+    """Ids de claims ya completados en un archivo de salida JSONL existente"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Última línea truncada por un crash: ese claim se vuelve a procesar
+                continue
+            if record.get("status") == "completed":
+                done.add(record["id"])
+    return done
+
+
+def result_record(claim_id: str, result: Dict) -> Dict:
+    """Estado final como dict JSON-serializable (los modelos Pydantic como dicts)"""
+    record = {"id": claim_id}
+    for key in ("status", "claim_info", "severity", "routing", "errors", "retry_count", "elapsed_s"):
+        value = result.get(key)
+        record[key] = value.model_dump() if isinstance(value, BaseModel) else value
+    if result.get("started_at"):
+        record["started_at"] = result["started_at"].isoformat()
+    return record
+
+
+def serialize_result(claim_id: str, result: Dict) -> str:
+    """Convierte el estado final en una línea JSON"""
+    return json.dumps(result_record(claim_id, result), default=str)
+
+
+#================================#   
+# ----- Parquet Sink ----- #
+#================================#
+
+# Una columna tipada por campo; status/severity/queue se guardan con diccionario
+RESULT_COLUMNS = [
+    ("id", "string"),
+    ("status", "string"),
+    ("model", "string"),
+    ("claim_id", "string"),
+    ("name", "string"),
+    ("vehicle", "string"),
+    ("loss_desc", "string"),
+    ("damage_area", "list<string>"),
+    ("severity", "string"),
+    ("est_cost", "float64"),
+    ("queue", "string"),
+    ("errors", "list<string>"),
+    ("error_count", "int32"),
+    ("retry_count", "int32"),
+    ("started_at", "timestamp[ms, UTC]"),
+    ("elapsed_s", "float64"),
+]
+
+
+def result_schema():
+    """Schema Arrow de RESULT_COLUMNS"""
+    types = {
+        "string": pa.string(),
+        "list<string>": pa.list_(pa.string()),
+        "float64": pa.float64(),
+        "int32": pa.int32(),
+        "timestamp[ms, UTC]": pa.timestamp("ms", tz="UTC"),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in RESULT_COLUMNS])
+
+
+def flatten_result(claim_id: str, result: Dict) -> Dict:
+    """Aplana ClaimInformation, SeverityAssessment, ClaimRouting, status, errores y tiempos en una fila"""
+    claim_info, severity, routing = result.get("claim_info"), result.get("severity"), result.get("routing")
+    errors = result.get("errors") or []
+    return {
+        "id": claim_id,
+        "status": result.get("status"),
+        "model": result.get("model"),
+        "claim_id": claim_info.claim_id if claim_info else None,
+        "name": claim_info.name if claim_info else None,
+        "vehicle": claim_info.vehicle if claim_info else None,
+        "loss_desc": claim_info.loss_desc if claim_info else None,
+        "damage_area": list(claim_info.damage_area) if claim_info else None,
+        "severity": severity.severity if severity else None,
+        "est_cost": severity.est_cost if severity else None,
+        "queue": routing.queue if routing else None,
+        "errors": [str(error) for error in errors],
+        "error_count": len(errors),
+        "retry_count": result.get("retry_count", 0),
+        "started_at": result.get("started_at"),
+        "elapsed_s": result.get("elapsed_s"),
+    }
+
+
+class ParquetResultWriter:
+    """
+    Escribe resultados en Parquet por row groups a medida que los claims terminan.
+    
+    Las filas se acumulan por columna y cada `row_group_size` filas se escriben como un
+    row group (compresión zstd), así la memoria queda acotada aunque el run tenga
+    millones de claims y el archivo se puede consultar por columnas.
+    """
+    
+    def __init__(self, path: str, row_group_size: int = 50_000, compression: str = "zstd"):
+        if pq is None:
+            raise RuntimeError("Parquet output needs pyarrow: pip install pyarrow")
+        self.path = path
+        self.row_group_size = max(1, row_group_size)
+        self.schema = result_schema()
+        self._writer = pq.ParquetWriter(path, self.schema, compression=compression)
+        self._columns = {name: [] for name in self.schema.names}
+        self._buffered = 0
+        self.rows = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def write(self, claim_id: str, result: Dict) -> None:
+        """Añade un claim; escribe un row group cuando el buffer se llena"""
+        for name, value in flatten_result(claim_id, result).items():
+            self._columns[name].append(value)
+        self._buffered += 1
+        if self._buffered >= self.row_group_size:
+            self.flush()
+    
+    def flush(self) -> None:
+        """Escribe las filas pendientes como un row group"""
+        if not self._buffered:
+            return
+        self._writer.write_table(pa.Table.from_pydict(self._columns, schema=self.schema))
+        self.rows += self._buffered
+        self._columns = {name: [] for name in self.schema.names}
+        self._buffered = 0
+    
+    def close(self) -> None:
+        """Escribe el último row group y cierra el archivo (el footer de Parquet va al final)"""
+        self.flush()
+        self._writer.close()
+
+
+def is_parquet(path: Optional[str]) -> bool:
+    return bool(path) and path.endswith(".parquet")
+
+
+def _input_error_result(item: Dict, model: str) -> Dict:
+    """Resultado fallido para una línea de entrada que no se pudo leer"""
+    return {"fnol": None, "claim_info": None, "severity": None, "routing": None,
+            "errors": [f"Input error: {item['error']}"], "status": "failed", "model": model,
+            "started_at": datetime.now(timezone.utc), "elapsed_s": 0.0}
+
+
+def process_stream(demo, items: Iterable[Dict], model: str = None, concurrency: int = 8) -> Iterator[tuple]:
+    """
+    Procesa un stream de FNOLs con memoria constante.
+    
+    Como mucho `2 * concurrency` claims están en vuelo; cada resultado se entrega
+    en cuanto termina (orden de finalización, no de entrada) como (item, result).
+    Las líneas de entrada inválidas se entregan al momento como claims fallidos.
+    """
+    max_in_flight = 2 * max(1, concurrency)
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        pending = {}
+        for item in items:
+            if item.get("error"):
+                yield item, _input_error_result(item, model)
+                continue
+            future = executor.submit(_safe_process_claim, demo, item["fnol"], model, item["id"])
+            pending[future] = item
+            if len(pending) >= max_in_flight:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    yield pending.pop(future), future.result()
+        for future in as_completed(pending):
+            yield pending[future], future.result()
+
+
+def run_jsonl(demo, input_path: str, output_path: Optional[str], model: str, concurrency: int,
+              skip_done: bool) -> int:
+    """
+    Pipeline JSONL -> JSONL: escribe y hace flush de cada claim al terminar.
+    
+    Con `skip_done` se añade al archivo existente y solo se saltan los claims
+    completados: un claim que había fallado se vuelve a procesar y su nuevo registro
+    se añade detrás del anterior. Quien lea la salida debe quedarse con el último
+    registro de cada id.
+    """
+    done = load_done_ids(output_path) if skip_done and output_path else set()
+    if done:
+        logger.info(f"⏭️  Skipping {len(done)} claims already completed in {output_path}")
+    items = (item for item in iter_jsonl_fnols(input_path) if item["id"] not in done)
+    
+    if is_parquet(output_path):
+        return run_parquet(demo, items, output_path, model, concurrency)
+    
+    out = open(output_path, "a" if skip_done else "w", encoding="utf-8") if output_path else sys.stdout
+    if skip_done and out.tell() > 0:
+        with open(output_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                # Cerrar la línea truncada para que el primer registro nuevo no quede pegado
+                out.write("\n")
+    processed = completed = 0
+    start = time.perf_counter()
+    try:
+        for item, result in process_stream(demo, items, model, concurrency):
+            out.write(serialize_result(item["id"], result) + "\n")
+            out.flush()
+            processed += 1
+            completed += result["status"] == "completed"
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    
+    throughput = processed / elapsed if elapsed > 0 else 0.0
+    logger.info(f"📈 Stream done: {completed}/{processed} completed in {elapsed:.1f}s "
+                f"({throughput:.2f} claims/sec, concurrency={concurrency})")
+    demo.retry_policy.metrics.log_summary()
+    return 0
+
+
+def run_parquet(demo, items: Iterable[Dict], output_path: str, model: str, concurrency: int) -> int:
+    """Pipeline JSONL -> Parquet: cada claim terminado va al row group en curso"""
+    processed = completed = 0
+    start = time.perf_counter()
+    with ParquetResultWriter(output_path) as writer:
+        for item, result in process_stream(demo, items, model, concurrency):
+            writer.write(item["id"], result)
+            processed += 1
+            completed += result["status"] == "completed"
+    elapsed = time.perf_counter() - start
+    
+    throughput = processed / elapsed if elapsed > 0 else 0.0
+    logger.info(f"📈 Stream done: {completed}/{processed} completed in {elapsed:.1f}s "
+                f"({throughput:.2f} claims/sec, concurrency={concurrency}) → {output_path}")
+    demo.retry_policy.metrics.log_summary()
+    return 0
+
+
+#================================#   
+# ----- Sharded Batch ----- #
+#================================#
+
+# Los shards intercambian resultados por archivos "índice\tregistro JSON", una línea por claim.
+# Un worker que muere a mitad de escritura solo puede dejar truncada la última línea.
+
+
+def shard_of(claim_id: str, shards: int) -> int:
+    """Shard de un claim: hash estable del id (hash() de Python cambia entre procesos)"""
+    digest = hashlib.blake2b(claim_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shards
+
+
+def load_workflow(path: str):
+    """Carga el script del workflow como módulo (su nombre con guiones no se puede importar)"""
+    spec = importlib.util.spec_from_file_location("claims_workflow", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _shard_worker(shard: int, workflow_path: str, input_path: str, output_path: str, model: str,
+                  concurrency: int, max_rps: Optional[float], retry_budget: int, log_level: int) -> None:
+    """
+    Proceso de un shard (arrancado con spawn).
+    
+    Al cargar el workflow en el proceso nuevo se crea su propio cliente OpenAI (con su
+    pool de conexiones) y get_app() compila su propio grafo; el rate limit es su parte
+    del total. Cada resultado se añade a output_path con flush en cuanto termina.
+    """
+    demo = load_workflow(workflow_path)
+    logger.setLevel(log_level)
+    demo.logger.setLevel(log_level)
+    demo.retry_policy.claim_budget = retry_budget
+    set_max_rps(max_rps)
+    
+    def items() -> Iterator[Dict]:
+        with open(input_path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+    
+    processed = 0
+    start = time.perf_counter()
+    with open(output_path, "a", encoding="utf-8") as out:
+        for item, result in process_stream(demo, items(), model, concurrency):
+            out.write(f"{item['index']}\t{serialize_result(item['id'], result)}\n")
+            out.flush()
+            processed += 1
+    elapsed = time.perf_counter() - start
+    
+    throughput = processed / elapsed if elapsed > 0 else 0.0
+    logger.info(f"📦 Shard {shard}: {processed} claims in {elapsed:.1f}s ({throughput:.2f} claims/sec)")
+    demo.retry_policy.metrics.log_summary()
+
+
+def _shard_done_indices(path: str) -> set:
+    """Índices ya escritos en la salida de un shard; descarta una última línea truncada por un crash"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "rb+") as f:
+        valid_end = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            done.add(int(line.split(b"\t", 1)[0]))
+            valid_end += len(line)
+        f.truncate(valid_end)
+    return done
+
+
+def _write_unfinished(input_path: str, done: set, pending_path: str) -> int:
+    """Copia a pending_path los claims del shard que aún no tienen resultado; devuelve cuántos"""
+    unfinished = 0
+    with open(input_path, "r", encoding="utf-8") as source, open(pending_path, "w", encoding="utf-8") as pending:
+        for line in source:
+            if json.loads(line)["index"] not in done:
+                pending.write(line)
+                unfinished += 1
+    return unfinished
+
+
+def _fail_unfinished(pending_path: str, output_path: str, reason: str) -> None:
+    """Registra como fallidos los claims que ningún worker pudo terminar"""
+    with open(pending_path, "r", encoding="utf-8") as pending, open(output_path, "a", encoding="utf-8") as out:
+        for line in pending:
+            item = json.loads(line)
+            result = {"status": "failed", "errors": [f"Workflow error: {reason}"]}
+            out.write(f"{item['index']}\t{serialize_result(item['id'], result)}\n")
+
+
+def _merge_shards(outputs: List[str], total: int, output_path: Optional[str]) -> int:
+    """
+    Junta las salidas de los shards en el orden de entrada.
+    
+    Primero indexa (shard, offset) de cada línea en arrays compactos y luego copia
+    los registros por índice, sin cargar los resultados en memoria.
+    Devuelve el número de claims completados.
+    """
+    owner = array("i", [-1]) * total
+    offsets = array("q", [0]) * total
+    completed = 0
+    for shard, path in enumerate(outputs):
+        if not os.path.exists(path):
+            continue
+        with open(path, "rb") as f:
+            offset = 0
+            for line in f:
+                index, record = line.split(b"\t", 1)
+                owner[int(index)] = shard
+                offsets[int(index)] = offset
+                completed += json.loads(record).get("status") == "completed"
+                offset += len(line)
+    
+    handles = [open(path, "rb") if os.path.exists(path) else None for path in outputs]
+    out = open(output_path, "wb") if output_path else sys.stdout.buffer
+    try:
+        for index in range(total):
+            if owner[index] < 0:
+                raise RuntimeError(f"Claim #{index} has no result in any shard")
+            handle = handles[owner[index]]
+            handle.seek(offsets[index])
+            out.write(handle.readline().split(b"\t", 1)[1])
+    finally:
+        for handle in handles:
+            if handle is not None:
+                handle.close()
+        if out is not sys.stdout.buffer:
+            out.close()
+        else:
+            out.flush()
+    return completed
+
+
+def run_sharded(demo, input_path: str, output_path: Optional[str], model: str, concurrency: int, shards: int,
+                max_rps: Optional[float] = None, max_restarts: int = 2) -> int:
+    """
+    Pipeline JSONL -> JSONL repartido en `shards` procesos.
+    
+    Los FNOLs se particionan por hash del claim id; cada proceso tiene su propio grafo,
+    cliente y parte del rate limit (max_rps / shards) y procesa `concurrency` claims a
+    la vez, así que el throughput escala con los cores hasta chocar con los límites de
+    la API. Si un worker muere, sus claims sin resultado pasan a un único proceso nuevo
+    del mismo shard (como mucho `max_restarts` veces por shard; después quedan como
+    fallidos). No se reparten entre los demás shards: el reemplazo tiene la misma parte
+    del rate limit que el worker caído, así que un shard que muere tarde termina solo
+    y puede alargar el run. Al final los resultados se escriben en el orden de entrada.
+    """
+    base_dir = os.path.dirname(os.path.abspath(output_path)) if output_path else None
+    workdir = tempfile.mkdtemp(prefix=".claims-shards-", dir=base_dir)
+    inputs = [os.path.join(workdir, f"shard-{k}.in.jsonl") for k in range(shards)]
+    outputs = [os.path.join(workdir, f"shard-{k}.out.tsv") for k in range(shards)]
+    
+    # Particionar en una sola pasada, sin cargar el backlog en memoria
+    total = 0
+    counts = [0] * shards
+    files = [open(path, "w", encoding="utf-8") for path in inputs]
+    try:
+        for item in iter_jsonl_fnols(input_path):
+            shard = shard_of(item["id"], shards)
+            files[shard].write(json.dumps({"index": total, **item}) + "\n")
+            counts[shard] += 1
+            total += 1
+    finally:
+        for f in files:
+            f.close()
+    logger.info(f"🧩 {total} claims partitioned into {shards} shards: {counts}")
+    
+    context = multiprocessing.get_context("spawn")
+    rps_share = max_rps / shards if max_rps else None
+    
+    def spawn(shard: int, path: str):
+        process = context.Process(
+            target=_shard_worker,
+            args=(shard, os.path.abspath(demo.__file__), path, outputs[shard], model, concurrency, rps_share,
+                  demo.retry_policy.claim_budget, logger.getEffectiveLevel()),
+            name=f"claims-shard-{shard}"
+        )
+        process.start()
+        return process
+    
+    start = time.perf_counter()
+    running = {spawn(k, inputs[k]): k for k in range(shards) if counts[k]}
+    restarts = [0] * shards
+    try:
+        while running:
+            multiprocessing.connection.wait([process.sentinel for process in running])
+            for process in [p for p in running if p.exitcode is not None]:
+                shard = running.pop(process)
+                pending_path = os.path.join(workdir, f"shard-{shard}.retry-{restarts[shard] + 1}.jsonl")
+                unfinished = _write_unfinished(inputs[shard], _shard_done_indices(outputs[shard]), pending_path)
+                if not unfinished:
+                    continue
+                if restarts[shard] >= max_restarts:
+                    logger.error(f"❌ Shard {shard}: {unfinished} claims unfinished after "
+                                 f"{restarts[shard]} restarts, marking them failed")
+                    _fail_unfinished(pending_path, outputs[shard],
+                                     f"shard worker exited with code {process.exitcode}")
+                    continue
+                restarts[shard] += 1
+                logger.warning(f"💀 Shard {shard} worker exited with code {process.exitcode}; "
+                               f"handing its {unfinished} unfinished claims to a replacement worker")
+                running[spawn(shard, pending_path)] = shard
+    finally:
+        for process in running:
+            process.terminate()
+    
+    completed = _merge_shards(outputs, total, output_path)
+    elapsed = time.perf_counter() - start
+    shutil.rmtree(workdir, ignore_errors=True)
+    
+    throughput = total / elapsed if elapsed > 0 else 0.0
+    logger.info(f"📈 Sharded run done: {completed}/{total} completed in {elapsed:.1f}s "
+                f"({throughput:.2f} claims/sec, shards={shards}, concurrency={concurrency}/shard, "
+                f"restarts={sum(restarts)})")
+    return 0
+
+
+#================================#   
+# ----- Watch Daemon ----- #
+#================================#
+
+# Eventos inotify que indican un archivo completo en el inbox
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+INOTIFY_EVENT = struct.Struct("iIII")
+
+FNOL_SUFFIXES = (".txt", ".json", ".jsonl")
+
+
+class DirectoryWatcher:
+    """
+    Avisa de archivos nuevos en un directorio.
+    
+    En Linux usa inotify (vía ctypes, sin dependencias) y solo reporta archivos ya
+    cerrados o movidos al directorio. Si inotify no está disponible, cae a polling y
+    reporta archivos cuyo tamaño y mtime no cambiaron durante `settle` segundos, para
+    no leer archivos a medio escribir.
+    """
+    
+    def __init__(self, path: str, settle: float = 1.0):
+        self.path = path
+        self.settle = settle
+        self.fd = None
+        self._seen: Dict[str, tuple] = {}
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0 or libc.inotify_add_watch(fd, path.encode(), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+                raise OSError(ctypes.get_errno(), "inotify unavailable")
+            self.fd = fd
+        except (AttributeError, OSError) as e:
+            logger.info(f"👀 inotify not available ({e}), polling {path} instead")
+    
+    @property
+    def mode(self) -> str:
+        return "inotify" if self.fd is not None else "polling"
+    
+    def _is_candidate(self, name: str) -> bool:
+        return not name.startswith(".") and name.endswith(FNOL_SUFFIXES) and \
+            os.path.isfile(os.path.join(self.path, name))
+    
+    def initial(self) -> List[str]:
+        """Archivos que ya estaban en el inbox al arrancar (más antiguos primero)"""
+        names = [name for name in os.listdir(self.path) if self._is_candidate(name)]
+        return sorted(names, key=lambda name: os.path.getmtime(os.path.join(self.path, name)))
+    
+    def poll(self, timeout: float) -> List[str]:
+        """Espera hasta `timeout` segundos y devuelve los archivos listos para procesar"""
+        if self.fd is None:
+            return self._poll_scan(timeout)
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        names = []
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return []
+        offset = 0
+        while offset < len(data):
+            _, _, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace")
+            offset += length
+            if self._is_candidate(name) and name not in names:
+                names.append(name)
+        return names
+    
+    def _poll_scan(self, timeout: float) -> List[str]:
+        time.sleep(timeout)
+        now = time.time()
+        ready = []
+        current = {}
+        for name in os.listdir(self.path):
+            if not self._is_candidate(name):
+                continue
+            stat = os.stat(os.path.join(self.path, name))
+            current[name] = (stat.st_size, stat.st_mtime)
+            if self._seen.get(name) == current[name] and now - stat.st_mtime >= self.settle:
+                ready.append(name)
+        self._seen = {name: sig for name, sig in current.items() if name not in ready}
+        return ready
+    
+    def close(self) -> None:
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+def read_fnol_file(path: str) -> List[Dict]:
+    """
+    Lee los FNOLs de un archivo del inbox.
+    
+    - .txt: un FNOL (id = nombre del archivo)
+    - .json: un FNOL (string), un objeto {"fnol", "id"} o una lista de ellos
+    - .jsonl: como --jsonl (las líneas inválidas llegan como items con "error")
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if path.endswith(".jsonl"):
+        return [{**item, "id": f"{stem}:{item['id']}"} for item in iter_jsonl_fnols(path)]
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".txt"):
+            return [{"id": stem, "fnol": f.read()}]
+        data = json.load(f)
+    records = data if isinstance(data, list) else [data]
+    items = []
+    for index, record in enumerate(records, 1):
+        if isinstance(record, str):
+            record = {"fnol": record}
+        if "fnol" not in record:
+            raise ValueError(f"{path}: record {index} has no 'fnol'")
+        claim_id = record.get("id") or (stem if len(records) == 1 else f"{stem}:{index}")
+        items.append({"id": str(claim_id), "fnol": record["fnol"]})
+    return items
+
+
+class RotatingParquetSink:
+    """
+    Sink Parquet para el daemon: cada parte se cierra (y se vuelve consultable) cada
+    `rotate_rows` claims o `rotate_seconds` segundos. Se escribe como .tmp y se renombra
+    al cerrar, así los lectores nunca ven un archivo sin footer.
+    """
+    
+    def __init__(self, path: str, rotate_rows: int = 50_000, rotate_seconds: float = 300):
+        self.prefix = path[:-len(".parquet")]
+        self.rotate_rows = rotate_rows
+        self.rotate_seconds = rotate_seconds
+        self.part = 0
+        self._writer = None
+    
+    def _open(self) -> None:
+        self.part += 1
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        self._final = f"{self.prefix}-{stamp}-{self.part:05d}.parquet"
+        self._writer = ParquetResultWriter(self._final + ".tmp", row_group_size=self.rotate_rows)
+        self._opened = time.monotonic()
+    
+    def write(self, claim_id: str, result: Dict) -> None:
+        if self._writer is None:
+            self._open()
+        self._writer.write(claim_id, result)
+        self.maybe_rotate()
+    
+    def maybe_rotate(self) -> None:
+        """Cierra la parte actual si llegó al límite de filas o de tiempo"""
+        if self._writer is None:
+            return
+        rows = self._writer.rows + self._writer._buffered
+        if rows >= self.rotate_rows or time.monotonic() - self._opened >= self.rotate_seconds:
+            self.close()
+    
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            os.replace(self._final + ".tmp", self._final)
+            self._writer = None
+
+
+class JsonlSink:
+    """Sink JSONL: una línea por claim con flush inmediato"""
+    
+    def __init__(self, path: Optional[str]):
+        self.out = open(path, "a", encoding="utf-8") if path else sys.stdout
+    
+    def write(self, claim_id: str, result: Dict) -> None:
+        self.out.write(serialize_result(claim_id, result) + "\n")
+        self.out.flush()
+    
+    def maybe_rotate(self) -> None:
+        pass
+    
+    def close(self) -> None:
+        if self.out is not sys.stdout:
+            self.out.close()
+
+
+def run_watch(demo, inbox: str, output_path: Optional[str], model: str, concurrency: int,
+              poll_interval: float = 1.0) -> int:
+    """
+    Daemon: procesa los FNOLs que aparecen en `inbox` con el grafo ya compilado.
+    
+    Cada archivo se mueve de forma atómica a inbox/.processing al tomarlo, y a
+    inbox/processed (o inbox/failed si no se pudo leer o fallaron todos sus claims)
+    cuando terminan todos sus claims. Como mucho `2 * concurrency` claims están en
+    vuelo; cada resultado se escribe en cuanto termina. Archivos que quedaron en
+    .processing por un crash se reprocesan al arrancar (at-least-once).
+    """
+    dirs = {name: os.path.join(inbox, name) for name in (".processing", "processed", "failed")}
+    for path in dirs.values():
+        os.makedirs(path, exist_ok=True)
+    
+    # Recuperar archivos de un run anterior interrumpido
+    for name in os.listdir(dirs[".processing"]):
+        os.replace(os.path.join(dirs[".processing"], name), os.path.join(inbox, name))
+    
+    watcher = DirectoryWatcher(inbox, settle=poll_interval)
+    sink = RotatingParquetSink(output_path) if is_parquet(output_path) else JsonlSink(output_path)
+    demo.get_app()  # compilar el grafo antes del primer archivo
+    
+    stop = threading.Event()
+    previous_handlers = {signum: signal.signal(signum, lambda *_: stop.set())
+                         for signum in (signal.SIGINT, signal.SIGTERM)}
+    
+    max_in_flight = 2 * max(1, concurrency)
+    backlog = deque()  # (file_state, item)
+    pending = {}  # future -> (file_state, item)
+    processed = completed = 0
+    
+    def take(name: str) -> None:
+        source = os.path.join(inbox, name)
+        working = os.path.join(dirs[".processing"], name)
+        try:
+            os.replace(source, working)
+            items = read_fnol_file(working)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Cannot read {name}: {e}")
+            if os.path.exists(working):
+                os.replace(working, os.path.join(dirs["failed"], name))
+            return
+        if not items:
+            os.replace(working, os.path.join(dirs["processed"], name))
+            return
+        state = {"name": name, "path": working, "remaining": len(items), "completed": 0}
+        backlog.extend((state, item) for item in items)
+        logger.info(f"📥 {name}: {len(items)} claims queued")
+    
+    def finish(state: Dict) -> None:
+        target = "processed" if state["completed"] else "failed"
+        os.replace(state["path"], os.path.join(dirs[target], state["name"]))
+        logger.info(f"📦 {state['name']}: {state['completed']} completed → {target}/")
+    
+    logger.info(f"👀 Watching {inbox} ({watcher.mode}, concurrency={concurrency})")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        for name in watcher.initial():
+            take(name)
+        while not stop.is_set() or pending:
+            if not stop.is_set() and len(backlog) < max_in_flight:
+                for name in watcher.poll(0 if pending or backlog else poll_interval):
+                    take(name)
+            while backlog and len(pending) < max_in_flight and not stop.is_set():
+                state, item = backlog.popleft()
+                if item.get("error"):
+                    future = Future()
+                    future.set_result(_input_error_result(item, model))
+                else:
+                    future = executor.submit(_safe_process_claim, demo, item["fnol"], model, item["id"])
+                pending[future] = (state, item)
+            if pending:
+                done, _ = wait(pending, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    state, item = pending.pop(future)
+                    result = future.result()
+                    sink.write(item["id"], result)
+                    processed += 1
+                    completed += result["status"] == "completed"
+                    state["completed"] += result["status"] == "completed"
+                    state["remaining"] -= 1
+                    if state["remaining"] == 0:
+                        finish(state)
+            sink.maybe_rotate()
+    
+    # Claims nunca enviados (parada): sus archivos vuelven al inbox para el próximo arranque
+    for state in {id(state): state for state, _ in backlog}.values():
+        os.replace(state["path"], os.path.join(inbox, state["name"]))
+    watcher.close()
+    sink.close()
+    for signum, handler in previous_handlers.items():
+        signal.signal(signum, handler)
+    
+    elapsed = time.perf_counter() - start
+    logger.info(f"🛑 Daemon stopped: {completed}/{processed} completed in {elapsed:.1f}s")
+    demo.retry_policy.metrics.log_summary()
+    return 0
+
+
+
+#================================#   
+# ----- CLI with argparse ----- #
+#================================#
+
+def main(demo) -> int:
+    parser = argparse.ArgumentParser(
+        description="Claims Processing Workflow with LangGraph",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Process single claim
+  python workflow.py --fnol "Claim ID: C001..."
+  
+  # Process batch from file
+  python workflow.py --batch claims.json
+  
+  # Use different model
+  python workflow.py --batch claims.json --model gpt-4o-mini
+  
+  # Process 32 claims at a time
+  python workflow.py --batch claims.json --concurrency 32
+  
+  # Stream a large backlog (JSONL in, JSONL out) and resume after a crash
+  python workflow.py --jsonl claims.jsonl --output results.jsonl --skip-done
+  cat claims.jsonl | python workflow.py --jsonl - > results.jsonl
+  
+  # Columnar output for analytics (needs pyarrow)
+  python workflow.py --jsonl claims.jsonl --output results.parquet
+  
+  # Very large backlogs: 8 processes (hash of the claim id), 16 claims each, 40 req/s in total
+  python workflow.py --jsonl claims.jsonl --output results.jsonl --shards 8 --concurrency 16 --max-rps 40
+  
+  # Daemon: process FNOL files (.txt/.json/.jsonl) dropped into inbox/
+  python workflow.py --watch inbox/ --output results.jsonl --concurrency 16
+  
+  # Debug mode
+  python workflow.py --batch claims.json --debug
+        """
+    )
+    
+    # Input options
+    input_group = parser.add_mutually_exclusive_group(required=True)
+    input_group.add_argument(
+        "--fnol",
+        type=str,
+        help="Single FNOL report text"
+    )
+    input_group.add_argument(
+        "--batch",
+        type=str,
+        help="JSON file with array of FNOL reports"
+    )
+    input_group.add_argument(
+        "--jsonl",
+        type=str,
+        help="JSONL file ('-' for stdin), one FNOL string or {\"id\", \"fnol\"} object per line"
+    )
+    input_group.add_argument(
+        "--watch",
+        type=str,
+        help="Inbox directory to watch for FNOL files (.txt, .json, .jsonl); runs until SIGINT/SIGTERM"
+    )
+    
+    # Model options
+    parser.add_argument(
+        "--model",
+        type=str,
+        choices=["gpt-4o-mini", "gpt-4.1-mini", "gpt-4.1-nano"],
+        default="gpt-4.1-nano",
+        help="OpenAI model to use (default: gpt-4.1-nano)"
+    )
+    
+    # Batch options
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Claims processed in parallel in batch mode (default: 8)"
+    )
+    
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="With --jsonl: worker processes, FNOLs partitioned by claim id hash; "
+             "--concurrency applies to each one (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--max-rps",
+        type=float,
+        help="Maximum LLM requests per second, split evenly across shards (default: unlimited)"
+    )
+    
+    parser.add_argument(
+        "--retry-budget",
+        type=int,
+        default=4,
+        help="Maximum retries per claim across all nodes (default: 4)"
+    )
+    
+    # Output options
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="Output file for results (JSON, JSONL with --jsonl/--watch, or Parquet if it ends in .parquet; "
+             "stdout if omitted)"
+    )
+    parser.add_argument(
+        "--skip-done",
+        action="store_true",
+        help="With --jsonl: append to --output and skip claims already completed there "
+             "(failed claims are retried and appended again; the last record per id wins)"
+    )
+    
+    # Logging options
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Enable debug logging"
+    )
+    
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Suppress output (only errors)"
+    )
+    
+    args = parser.parse_args()
+    
+    # Configure logging
+    for log in (logger, demo.logger):
+        if args.debug:
+            log.setLevel(logging.DEBUG)
+        elif args.quiet:
+            log.setLevel(logging.ERROR)
+    
+    demo.retry_policy.claim_budget = args.retry_budget
+    set_max_rps(args.max_rps)
+    
+    if args.skip_done and not (args.jsonl and args.output):
+        parser.error("--skip-done requires --jsonl and --output")
+    if args.skip_done and is_parquet(args.output):
+        parser.error("--skip-done needs a JSONL --output (Parquet files cannot be appended to)")
+    if args.shards < 1:
+        parser.error("--shards must be at least 1")
+    if args.shards > 1 and not args.jsonl:
+        parser.error("--shards requires --jsonl")
+    if args.shards > 1 and (args.skip_done or is_parquet(args.output)):
+        parser.error("--shards writes a new JSONL --output (no --skip-done or Parquet)")
+    
+    # Process claims
+    try:
+        if args.watch:
+            # Daemon: el grafo se compila una vez y queda caliente para todos los archivos
+            return run_watch(demo, args.watch, args.output, args.model, args.concurrency)
+        
+        if args.jsonl and args.shards > 1:
+            # Multi-proceso: un grafo, cliente y parte del rate limit por shard
+            return run_sharded(demo, args.jsonl, args.output, args.model, args.concurrency, args.shards, args.max_rps)
+        
+        if args.jsonl:
+            # Streaming: cada resultado se escribe al terminar, memoria constante
+            return run_jsonl(demo, args.jsonl, args.output, args.model, args.concurrency, args.skip_done)
+        
+        if args.fnol:
+            # Single claim
+            result = demo.process_claim(args.fnol, args.model)
+            results = [result]
+        else:
+            # Batch processing
+            with open(args.batch, 'r') as f:
+                fnols = json.load(f)
+            results = process_batch(demo, fnols, args.model, args.concurrency)
+        
+        # Output results
+        if is_parquet(args.output):
+            with ParquetResultWriter(args.output) as writer:
+                for index, result in enumerate(results, 1):
+                    writer.write(str(index), result)
+            logger.info(f"\n✅ Results saved to {args.output}")
+        elif args.output:
+            with open(args.output, 'w') as f:
+                json.dump([result_record(str(index), result) for index, result in enumerate(results, 1)],
+                          f, indent=2, default=str)
+            logger.info(f"\n✅ Results saved to {args.output}")
+        else:
+            # Print to console
+            print("\n" + "="*60)
+            print("RESULTS")
+            print("="*60)
+            for result in results:
+                if result.get("claim_info"):
+                    print(f"\nClaim: {result['claim_info'].claim_id}")
+                    print(f"Severity: {result['severity'].severity if result.get('severity') else 'N/A'}")
+                    print(f"Queue: {result['routing'].queue if result.get('routing') else 'N/A'}")
+                    print(f"Status: {result['status']}")
+                    if result['errors']:
+                        print(f"Errors: {result['errors']}")
+    
+    except Exception as e:
+        logger.error(f"❌ Fatal error: {e}")
+        return 1
+    
+    return 0
@@ -0,0 +1,19 @@
+"""Setup compartido de los tests del runtime (ninguno llama a la API)"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# claims_runtime.py vive junto a los scripts del workflow, no en un paquete
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+STUB_WORKFLOW = str(Path(__file__).resolve().parent / "stub_workflow.py")
+
+
+@pytest.fixture
+def demo():
+    """Módulo del workflow falso (tests/stub_workflow.py), cargado de nuevo en cada test"""
+    from claims_runtime import load_workflow
+
+    return load_workflow(STUB_WORKFLOW)
@@ -0,0 +1,72 @@
+'''
+Workflow falso para los tests del runtime: mismo contrato que
+chaining-prompting_langgraph.py (process_claim, get_app, retry_policy, logger)
+pero sin grafo ni LLM.
+
+El texto del FNOL controla el resultado:
+- "CRASH": process_claim lanza una excepción
+- "EXIT": el proceso termina en seco la primera vez (marca en $STUB_EXIT_MARKER)
+- "SLEEP <s>": tarda <s> segundos en terminar
+'''
+
+import logging
+import os
+import re
+import time
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+from claims_runtime import RetryPolicy
+
+logger = logging.getLogger("stub_workflow")
+
+retry_policy = RetryPolicy(lambda **kwargs: "")
+finished: List[str] = []
+
+
+class ClaimInformation(BaseModel):
+    claim_id: str
+    name: str
+    vehicle: str
+    loss_desc: str
+    damage_area: List[str]
+
+
+class SeverityAssessment(BaseModel):
+    severity: str
+    est_cost: float
+
+
+class ClaimRouting(BaseModel):
+    claim_id: str
+    queue: str
+
+
+def get_app():
+    return None
+
+
+def process_claim(fnol: str, model: str = None, thread_id: str = None) -> Dict:
+    if "CRASH" in fnol:
+        raise RuntimeError("graph exploded")
+    marker = os.environ.get("STUB_EXIT_MARKER")
+    if "EXIT" in fnol and marker and not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(3)
+    sleep = re.search(r"SLEEP ([\d.]+)", fnol)
+    if sleep:
+        time.sleep(float(sleep.group(1)))
+    claim_id = fnol.split()[0]
+    finished.append(claim_id)
+    return {
+        "fnol": fnol,
+        "claim_info": ClaimInformation(claim_id=claim_id, name="Ana Diaz", vehicle="Seat Ibiza",
+                                       loss_desc=fnol, damage_area=["front", "hood"]),
+        "severity": SeverityAssessment(severity="Low", est_cost=450.0),
+        "routing": ClaimRouting(claim_id=claim_id, queue="fast_track"),
+        "errors": [],
+        "retry_count": 0,
+        "status": "completed",
+        "model": model or "gpt-4.1-nano",
+    }
@@ -0,0 +1,21 @@
+"""Tests del batch concurrente con el workflow falso"""
+
+from claims_runtime import process_batch
+
+
+def test_results_keep_the_input_order(demo):
+    fnols = [f"C{index} SLEEP {0.05 * (5 - index)}" for index in range(5)]
+    results = process_batch(demo, fnols, concurrency=5)
+
+    assert [result["claim_info"].claim_id for result in results] == [f"C{index}" for index in range(5)]
+    # Terminan en orden inverso: el orden de la salida no depende del de finalización
+    assert demo.finished == [f"C{index}" for index in reversed(range(5))]
+    assert all(result["elapsed_s"] >= 0 and result["started_at"].tzinfo for result in results)
+
+
+def test_a_crashing_claim_does_not_stop_the_batch(demo):
+    results = process_batch(demo, ["C1", "C2 CRASH", "C3"], concurrency=2)
+
+    assert [result["status"] for result in results] == ["completed", "failed", "completed"]
+    assert results[1]["errors"] == ["Workflow error: graph exploded"]
+    assert results[1]["claim_info"] is None
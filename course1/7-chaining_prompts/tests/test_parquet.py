@@ -0,0 +1,54 @@
+"""Tests del sink Parquet: flatten_result, ParquetResultWriter y el pipeline JSONL -> Parquet"""
+
+import json
+
+import pytest
+
+from claims_runtime import RESULT_COLUMNS, ParquetResultWriter, flatten_result, process_batch, run_jsonl
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def test_flatten_result_has_one_value_per_column(demo):
+    completed, failed = process_batch(demo, ["C1", "C2 CRASH"], concurrency=1)
+
+    row = flatten_result("fnol-1", completed)
+    assert list(row) == [name for name, _ in RESULT_COLUMNS]
+    assert row["claim_id"] == "C1" and row["damage_area"] == ["front", "hood"]
+    assert row["severity"] == "Low" and row["est_cost"] == 450.0 and row["queue"] == "fast_track"
+    assert row["errors"] == [] and row["error_count"] == 0
+
+    row = flatten_result("fnol-2", failed)
+    assert row["status"] == "failed" and row["claim_id"] is None and row["queue"] is None
+    assert row["errors"] == ["Workflow error: graph exploded"] and row["error_count"] == 1
+
+
+def test_writer_round_trip_in_row_groups(tmp_path, demo):
+    results = process_batch(demo, ["C1", "C2 CRASH", "C3", "C4", "C5"], concurrency=2)
+    path = str(tmp_path / "results.parquet")
+    with ParquetResultWriter(path, row_group_size=2) as writer:
+        for index, result in enumerate(results):
+            writer.write(f"fnol-{index}", result)
+
+    parquet = pq.ParquetFile(path)
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.schema_arrow == writer.schema
+    table = parquet.read()
+    assert table.column("id").to_pylist() == [f"fnol-{index}" for index in range(5)]
+    assert table.column("status").to_pylist() == ["completed", "failed", "completed", "completed", "completed"]
+    assert table.column("claim_id").to_pylist() == ["C1", None, "C3", "C4", "C5"]
+    assert table.column("started_at").to_pylist()[0] == results[0]["started_at"].replace(
+        microsecond=results[0]["started_at"].microsecond // 1000 * 1000)
+
+
+def test_jsonl_to_parquet_pipeline(tmp_path, demo):
+    source = tmp_path / "claims.jsonl"
+    source.write_text("\n".join([json.dumps({"id": "a", "fnol": "C1"}), json.dumps("C2 CRASH"), "{broken"]) + "\n")
+    output = str(tmp_path / "results.parquet")
+
+    assert run_jsonl(demo, str(source), output, None, concurrency=2, skip_done=False) == 0
+    rows = {row["id"]: row for row in pq.read_table(output).to_pylist()}
+    assert len(rows) == 3
+    assert rows["a"]["status"] == "completed"
+    assert rows["line-3"]["errors"][0].startswith("Input error: Line 3: invalid JSON")
+    assert sorted(row["status"] for row in rows.values()) == ["completed", "failed", "failed"]
@@ -0,0 +1,132 @@
+"""Tests de RetryPolicy con un `complete` falso que no llama a la API"""
+
+import httpx
+import pytest
+from openai import APIConnectionError, RateLimitError
+
+from claims_runtime import GATE_FEEDBACK_PROMPT, RetryPolicy, is_transient
+
+REQUEST = httpx.Request("POST", "http://llm.test/v1/chat/completions")
+MESSAGES = [{"role": "system", "content": "Assess"}, {"role": "user", "content": "Claim"}]
+
+
+def rate_limited() -> RuntimeError:
+    """429 envuelto como lo hace get_completion del workflow"""
+    response = httpx.Response(429, request=REQUEST, headers={"retry-after": "0"})
+    cause = RateLimitError("Rate limit reached", response=response, body=None)
+    error = RuntimeError(f"API error: {cause}")
+    error.__cause__ = cause
+    return error
+
+
+def connection_error() -> RuntimeError:
+    cause = APIConnectionError(request=REQUEST)
+    error = RuntimeError(f"API error: {cause}")
+    error.__cause__ = cause
+    return error
+
+
+class FakeComplete:
+    """Devuelve (o lanza) las respuestas en orden y guarda las conversaciones recibidas"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.conversations = []
+
+    def __call__(self, messages, model=None):
+        self.conversations.append(messages)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def gate(response: str) -> str:
+    if response != "ok":
+        raise ValueError(f"Cost out of range: {response}")
+    return response
+
+
+def policy(complete: FakeComplete, **kwargs) -> RetryPolicy:
+    return RetryPolicy(complete, base_delay=0.0, **kwargs)
+
+
+def state() -> dict:
+    return {"model": "gpt-4.1-nano", "retry_count": 0}
+
+
+def test_transient_errors_are_retried_with_backoff():
+    complete = FakeComplete(rate_limited(), connection_error(), "ok")
+    retry, claim = policy(complete), state()
+
+    assert retry.run("extract_claim", claim, MESSAGES, gate) == "ok"
+    assert len(complete.conversations) == 3
+    assert all(conversation == MESSAGES for conversation in complete.conversations)
+    assert claim["retry_count"] == 2
+    assert retry.metrics.snapshot() == {"extract_claim": {
+        "calls": 1, "transient_retries": 2, "gate_reasks": 0, "recovered": 1, "exhausted": 0,
+    }}
+
+
+def test_gate_rejection_is_reasked_with_the_error_appended():
+    complete = FakeComplete("12", "ok")
+    retry, claim = policy(complete), state()
+
+    assert retry.run("assess_severity", claim, MESSAGES, gate) == "ok"
+    feedback = complete.conversations[1]
+    assert feedback[:2] == MESSAGES
+    assert feedback[2] == {"role": "assistant", "content": "12"}
+    assert feedback[3] == {"role": "user",
+                           "content": GATE_FEEDBACK_PROMPT.format(error="Cost out of range: 12")}
+    assert claim["retry_count"] == 1
+    assert retry.metrics.snapshot()["assess_severity"]["gate_reasks"] == 1
+
+
+def test_gate_reasks_are_limited_per_node():
+    complete = FakeComplete("12", "13", "ok")
+    retry, claim = policy(complete, gate_reasks=1), state()
+
+    with pytest.raises(ValueError, match="13"):
+        retry.run("assess_severity", claim, MESSAGES, gate)
+    assert len(complete.conversations) == 2
+    assert retry.metrics.snapshot()["assess_severity"]["exhausted"] == 1
+
+
+def test_claim_budget_is_shared_between_nodes():
+    complete = FakeComplete(rate_limited(), "ok", rate_limited(), "12")
+    retry, claim = policy(complete, claim_budget=2), state()
+
+    assert retry.run("extract_claim", claim, MESSAGES, gate) == "ok"
+    with pytest.raises(ValueError):
+        retry.run("assess_severity", claim, MESSAGES, gate)
+
+    # El reintento transitorio de assess_severity gasta el último punto del presupuesto,
+    # así que el rechazo del gate ya no se re-pregunta
+    assert claim["retry_count"] == 2
+    assert len(complete.conversations) == 4
+    snapshot = retry.metrics.snapshot()
+    assert snapshot["extract_claim"]["recovered"] == 1
+    assert snapshot["assess_severity"] == {
+        "calls": 1, "transient_retries": 1, "gate_reasks": 0, "recovered": 0, "exhausted": 1,
+    }
+
+
+def test_permanent_errors_are_not_retried():
+    complete = FakeComplete(RuntimeError("API error: invalid api key"))
+    retry, claim = policy(complete), state()
+
+    with pytest.raises(RuntimeError, match="invalid api key"):
+        retry.run("route_claim", claim, MESSAGES, gate)
+    assert len(complete.conversations) == 1 and claim["retry_count"] == 0
+    assert not is_transient(RuntimeError("API error"))
+    assert is_transient(rate_limited())
+
+
+def test_retry_after_header_sets_the_delay():
+    retry = RetryPolicy(FakeComplete(), max_delay=8.0)
+    response = httpx.Response(429, request=REQUEST, headers={"retry-after": "3"})
+    error = RuntimeError("API error")
+    error.__cause__ = RateLimitError("Rate limit reached", response=response, body=None)
+    assert retry.backoff(0, error) == 3.0
+    assert 0.25 <= retry.backoff(0, connection_error()) <= 0.5
+    assert retry.backoff(10, connection_error()) <= 8.0
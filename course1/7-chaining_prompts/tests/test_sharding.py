@@ -0,0 +1,73 @@
+"""Tests del batch por shards: partición, recuperación de salidas truncadas y merge en orden"""
+
+import json
+from collections import Counter
+
+import pytest
+
+from claims_runtime import _merge_shards, _shard_done_indices, run_sharded, shard_of
+
+
+def shard_line(index: int, claim_id: str, status: str = "completed") -> str:
+    return f"{index}\t{json.dumps({'id': claim_id, 'status': status})}\n"
+
+
+def read_ids(path) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["id"] for line in f]
+
+
+def test_shard_of_is_stable_and_spreads_ids():
+    assert shard_of("C000123", 4) == shard_of("C000123", 4)
+    counts = Counter(shard_of(f"C{index:06d}", 4) for index in range(4000))
+    assert sorted(counts) == [0, 1, 2, 3]
+    assert min(counts.values()) > 800
+
+
+def test_truncated_last_line_is_dropped(tmp_path):
+    path = tmp_path / "shard-0.out.tsv"
+    path.write_text(shard_line(0, "a") + shard_line(3, "d") + '5\t{"id": "f", "sta')
+
+    assert _shard_done_indices(str(path)) == {0, 3}
+    assert path.read_text() == shard_line(0, "a") + shard_line(3, "d")
+    assert _shard_done_indices(str(tmp_path / "missing.tsv")) == set()
+
+
+def test_merge_writes_results_in_input_order(tmp_path):
+    outputs = [str(tmp_path / f"shard-{shard}.out.tsv") for shard in range(3)]
+    with open(outputs[0], "w") as f:
+        f.write(shard_line(4, "e") + shard_line(1, "b", "failed"))
+    with open(outputs[1], "w") as f:
+        f.write(shard_line(3, "d") + shard_line(0, "a"))
+    with open(outputs[2], "w") as f:
+        f.write(shard_line(2, "c"))
+    merged = tmp_path / "results.jsonl"
+
+    assert _merge_shards(outputs, 5, str(merged)) == 4
+    assert read_ids(merged) == ["a", "b", "c", "d", "e"]
+
+    with pytest.raises(RuntimeError, match="Claim #5 has no result"):
+        _merge_shards(outputs, 6, str(merged))
+
+
+def test_sharded_run_recovers_a_dead_worker(tmp_path, monkeypatch, demo):
+    monkeypatch.setenv("STUB_EXIT_MARKER", str(tmp_path / "exited"))
+    claims = [f"C{index} SLEEP 0.01" for index in range(12)]
+    claims[5] = "C5 EXIT"  # el worker de su shard muere una vez al llegar a este claim
+    claims[7] = "C7 CRASH"
+    source = tmp_path / "claims.jsonl"
+    source.write_text("".join(json.dumps({"id": f"id-{index}", "fnol": fnol}) + "\n"
+                              for index, fnol in enumerate(claims)) + "{broken\n")
+    output = tmp_path / "results.jsonl"
+
+    assert run_sharded(demo, str(source), str(output), None, concurrency=1, shards=3) == 0
+
+    assert (tmp_path / "exited").exists()
+    with open(output, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert [record["id"] for record in records] == [f"id-{index}" for index in range(12)] + ["line-13"]
+    statuses = [record["status"] for record in records]
+    assert statuses[5] == "completed"
+    assert statuses[7] == "failed" and statuses[12] == "failed"
+    assert statuses.count("completed") == 11
+    assert not any(path.name.startswith(".claims-shards-") for path in tmp_path.iterdir())
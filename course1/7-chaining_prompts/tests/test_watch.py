@@ -0,0 +1,91 @@
+"""Tests del daemon del inbox: lectura de archivos, DirectoryWatcher y movimientos de run_watch"""
+
+import ctypes
+import json
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from claims_runtime import DirectoryWatcher, read_fnol_file, run_watch
+
+
+def write(path, text: str) -> str:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return str(path)
+
+
+def wait_for(condition, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_read_fnol_file_formats(tmp_path):
+    assert read_fnol_file(write(tmp_path / "c1.txt", "C1 rear-ended")) == [{"id": "c1", "fnol": "C1 rear-ended"}]
+    assert read_fnol_file(write(tmp_path / "one.json", json.dumps("C2"))) == [{"id": "one", "fnol": "C2"}]
+    assert read_fnol_file(write(tmp_path / "many.json", json.dumps(["C3", {"id": "x", "fnol": "C4"}]))) == [
+        {"id": "many:1", "fnol": "C3"}, {"id": "x", "fnol": "C4"},
+    ]
+    items = read_fnol_file(write(tmp_path / "b.jsonl", json.dumps({"id": "y", "fnol": "C5"}) + "\n{oops\n"))
+    assert items[0] == {"id": "b:y", "fnol": "C5"}
+    assert items[1]["id"] == "b:line-2" and "invalid JSON" in items[1]["error"]
+    with pytest.raises(ValueError, match="no 'fnol'"):
+        read_fnol_file(write(tmp_path / "bad.json", json.dumps({"id": "z"})))
+
+
+def test_polling_fallback_waits_for_files_to_settle(tmp_path, monkeypatch):
+    def no_inotify(*args, **kwargs):
+        raise OSError("no inotify here")
+
+    monkeypatch.setattr(ctypes, "CDLL", no_inotify)
+    watcher = DirectoryWatcher(str(tmp_path), settle=0.0)
+    assert watcher.mode == "polling"
+
+    write(tmp_path / "c1.txt", "C1")
+    write(tmp_path / ".hidden.txt", "C2")
+    write(tmp_path / "notes.md", "C3")
+    assert watcher.poll(0) == []  # primera vez que se ve: aún puede estar a medio escribir
+    with open(tmp_path / "c1.txt", "a") as f:
+        f.write(" still writing")
+    assert watcher.poll(0) == []  # cambió de tamaño desde el último scan
+    assert watcher.poll(0) == ["c1.txt"]
+
+
+def test_run_watch_moves_files_and_writes_results(tmp_path, monkeypatch, demo):
+    inbox, output = tmp_path / "inbox", str(tmp_path / "results.jsonl")
+    os.makedirs(inbox / ".processing")
+    write(inbox / ".processing" / "leftover.txt", "C0")  # de un run anterior interrumpido
+    write(inbox / "ok.txt", "C1")
+    write(inbox / "mixed.json", json.dumps(["C2", "C3 CRASH"]))
+    write(inbox / "crash.json", json.dumps(["C4 CRASH"]))
+    write(inbox / "broken.json", "{not json")
+
+    handlers = {}
+    monkeypatch.setattr(signal, "signal", lambda signum, handler: handlers.setdefault(signum, handler))
+
+    def processed() -> list:
+        return os.listdir(inbox / "processed") if os.path.isdir(inbox / "processed") else []
+
+    def feed_and_stop():
+        wait_for(lambda: len(processed()) == 3)
+        write(inbox / ".late.tmp", "C5")
+        os.replace(inbox / ".late.tmp", inbox / "late.txt")  # llega con el daemon ya en marcha
+        wait_for(lambda: "late.txt" in processed())
+        handlers[signal.SIGTERM]()
+
+    stopper = threading.Thread(target=feed_and_stop, daemon=True)
+    stopper.start()
+    assert run_watch(demo, str(inbox), output, None, concurrency=2, poll_interval=0.05) == 0
+    stopper.join(5)
+
+    assert sorted(os.listdir(inbox / "processed")) == ["late.txt", "leftover.txt", "mixed.json", "ok.txt"]
+    assert sorted(os.listdir(inbox / "failed")) == ["broken.json", "crash.json"]
+    assert os.listdir(inbox / ".processing") == []
+    with open(output, encoding="utf-8") as f:
+        statuses = {record["id"]: record["status"] for record in map(json.loads, f)}
+    assert statuses == {"leftover": "completed", "ok": "completed", "mixed:1": "completed",
+                        "mixed:2": "failed", "crash": "failed", "late": "completed"}
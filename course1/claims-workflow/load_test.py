@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Load test the claims workflow through the LangGraph API.
+
+Opens many concurrent thread + streamed run pairs against the local `langgraph dev`
+server and reports time-to-first-event, end-to-end latency histograms, error rates
+and server-side queueing as a JSON report that can be diffed between runs.
+
+Modes:
+    closed  N virtual users, each starting its next run as soon as the previous one ends
+    open    runs arrive at a target rate (constant or Poisson) regardless of how fast the
+            server answers; latency is measured from the scheduled start, so client-side
+            backlog is not hidden (no coordinated omission)
+
+Usage:
+    python load_test.py --mode closed --users 16 --duration 60
+    python load_test.py --mode open --rps 5 --duration 120 --arrivals poisson --output load_open.json
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import requests
+
+BASE_URL = "http://127.0.0.1:2024"
+
+# Bucket upper bounds in seconds for the latency histograms
+HISTOGRAM_BUCKETS = [0.1, 0.25, 0.5, 1, 2, 3, 5, 8, 13, 20, 30, 60]
+
+SAMPLE_FNOLS = [
+    """Claim ID: C001
+Customer: John Smith
+Vehicle: 2018 Toyota Camry
+Incident: A rock hit the windshield on the highway and left a small chip about the size of a coin.""",
+    """Claim ID: C002
+Customer: Sarah Johnson
+Vehicle: 2020 Honda Civic
+Incident: Another car hit me at low speed, dented the rear bumper and broke the taillight.""",
+    """Claim ID: C003
+Customer: Michael Rodriguez
+Vehicle: 2022 Ford F-150
+Incident: I was involved in a serious collision at an intersection. The front of my truck is
+severely damaged, including the hood, bumper, radiator, and engine compartment. The airbags
+deployed and the vehicle is not drivable.""",
+]
+
+
+def iter_sse(response):
+    """Yield (event, data) pairs from a text/event-stream response."""
+    event, data = None, []
+    for line in response.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if not line:
+            if data:
+                yield event or "message", "\n".join(data)
+            event, data = None, []
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].lstrip())
+    if data:
+        yield event or "message", "\n".join(data)
+
+
+def run_claim(session, base_url, assistant_id, fnol, model, timeout, scheduled_at=None):
+    """
+    Create a thread, stream one run to completion and time it.
+
+    Returns:
+        dict with the timings (seconds, relative to the scheduled start), final status and error
+    """
+    start = time.perf_counter()
+    scheduled_at = scheduled_at or start
+    result = {"client_lag": start - scheduled_at, "error": None, "status": None}
+    try:
+        response = session.post(f"{base_url}/threads", json={}, timeout=timeout)
+        response.raise_for_status()
+        thread_id = response.json()["thread_id"]
+        result["thread_created"] = time.perf_counter() - scheduled_at
+
+        payload = {
+            "assistant_id": assistant_id,
+            "input": {"fnol": fnol, "model": model},
+            "stream_mode": ["values"],
+        }
+        with session.post(f"{base_url}/threads/{thread_id}/runs/stream", json=payload,
+                          stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            values = {}
+            for event, data in iter_sse(response):
+                now = time.perf_counter() - scheduled_at
+                result.setdefault("first_event", now)
+                if event == "metadata":
+                    # The server emits metadata once a worker picks the run up
+                    result.setdefault("run_started", now)
+                elif event == "values":
+                    result.setdefault("first_values", now)
+                    values = json.loads(data)
+                elif event == "error":
+                    result["error"] = f"run error: {data[:200]}"
+        result["end_to_end"] = time.perf_counter() - scheduled_at
+        result["status"] = values.get("status")
+        if result["error"] is None and values.get("errors"):
+            result["error"] = f"workflow error: {values['errors'][-1][:200]}"
+    except requests.RequestException as e:
+        result["error"] = f"{type(e).__name__}: {str(e)[:200]}"
+        result["end_to_end"] = time.perf_counter() - scheduled_at
+    return result
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+def summarize(values):
+    """Percentiles (ms) and a non-cumulative bucket histogram of a list of seconds."""
+    if not values:
+        return {"count": 0}
+    histogram, lower = {}, 0
+    for bound in HISTOGRAM_BUCKETS:
+        histogram[f"{lower}-{bound}s"] = sum(1 for v in values if lower <= v < bound)
+        lower = bound
+    histogram[f">={lower}s"] = sum(1 for v in values if v >= lower)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 1),
+        "p90_ms": round(percentile(values, 90) * 1000, 1),
+        "p95_ms": round(percentile(values, 95) * 1000, 1),
+        "p99_ms": round(percentile(values, 99) * 1000, 1),
+        "max_ms": round(max(values) * 1000, 1),
+        "mean_ms": round(sum(values) / len(values) * 1000, 1),
+        "histogram": histogram,
+    }
+
+
+def closed_loop(args, fnols, session_for):
+    """N users, each running claims back to back until the duration (or request budget) is spent."""
+    results, lock = [], threading.Lock()
+    deadline = time.perf_counter() + args.duration
+    budget = [args.requests or float("inf")]
+
+    def user(number):
+        session = session_for()
+        rng = random.Random(args.seed + number)
+        while time.perf_counter() < deadline:
+            with lock:
+                if budget[0] <= 0:
+                    return
+                budget[0] -= 1
+            result = run_claim(session, args.url, args.assistant, rng.choice(fnols), args.model, args.timeout)
+            with lock:
+                results.append(result)
+
+    threads = [threading.Thread(target=user, args=(n,), daemon=True) for n in range(args.users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def open_loop(args, fnols, session_for):
+    """Runs arrive at args.rps (constant or Poisson) for the duration, whatever the server does."""
+    rng = random.Random(args.seed)
+    local = threading.local()
+
+    def task(fnol, scheduled_at):
+        if not hasattr(local, "session"):
+            local.session = session_for()
+        return run_claim(local.session, args.url, args.assistant, fnol, args.model, args.timeout, scheduled_at)
+
+    futures = []
+    with ThreadPoolExecutor(max_workers=args.max_in_flight) as executor:
+        start = time.perf_counter()
+        next_at = start
+        total = args.requests or int(args.rps * args.duration)
+        for _ in range(total):
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(executor.submit(task, rng.choice(fnols), next_at))
+            gap = rng.expovariate(args.rps) if args.arrivals == "poisson" else 1 / args.rps
+            next_at += gap
+        return [future.result() for future in futures]
+
+
+def build_report(args, results, wall_time):
+    ok = [r for r in results if r["error"] is None]
+    errors = {}
+    for r in results:
+        if r["error"]:
+            kind = r["error"].split(":", 1)[0]
+            errors[kind] = errors.get(kind, 0) + 1
+
+    def collect(key, rows):
+        return [r[key] for r in rows if r.get(key) is not None]
+
+    return {
+        "tool": "claims-load-test",
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "url": args.url, "assistant": args.assistant, "model": args.model, "mode": args.mode,
+            "users": args.users if args.mode == "closed" else None,
+            "rps": args.rps if args.mode == "open" else None,
+            "arrivals": args.arrivals if args.mode == "open" else None,
+            "duration_s": args.duration, "requests": args.requests, "seed": args.seed,
+        },
+        "totals": {
+            "runs": len(results),
+            "ok": len(ok),
+            "errors": len(results) - len(ok),
+            "error_rate": round((len(results) - len(ok)) / len(results), 4) if results else None,
+            "errors_by_type": errors,
+            "statuses": {s: sum(1 for r in ok if r["status"] == s) for s in sorted({r["status"] for r in ok}, key=str)},
+            "wall_time_s": round(wall_time, 2),
+            "throughput_rps": round(len(ok) / wall_time, 3) if wall_time else None,
+        },
+        "latency": {
+            "time_to_first_event": summarize(collect("first_event", ok)),
+            "time_to_first_values": summarize(collect("first_values", ok)),
+            "end_to_end": summarize(collect("end_to_end", ok)),
+            "thread_create": summarize(collect("thread_created", results)),
+            # Wait from our request until a server worker started the run
+            "server_queueing": summarize([r["run_started"] - r["thread_created"] for r in ok
+                                          if r.get("run_started") is not None]),
+            "client_lag": summarize(collect("client_lag", results)),
+        },
+    }
+
+
+def print_report(report):
+    print("=" * 80)
+    print(f"Load test: {report['config']['mode']} loop against {report['config']['url']}")
+    print("=" * 80)
+    totals = report["totals"]
+    print(f"Runs: {totals['runs']}  OK: {totals['ok']}  Errors: {totals['errors']} "
+          f"({totals['error_rate']})  Throughput: {totals['throughput_rps']} runs/s")
+    for kind, count in totals["errors_by_type"].items():
+        print(f"  ❌ {kind}: {count}")
+    print(f"\n{'metric':<24}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, stats in report["latency"].items():
+        if stats["count"]:
+            print(f"{name:<24}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['max_ms']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load test for the claims LangGraph server")
+    parser.add_argument("--url", default=BASE_URL, help="LangGraph server URL")
+    parser.add_argument("--assistant", default="claims_processor", help="Assistant / graph id")
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument("--users", type=int, default=8, help="Concurrent users (closed loop)")
+    parser.add_argument("--rps", type=float, default=2.0, help="Target arrival rate (open loop)")
+    parser.add_argument("--arrivals", choices=["constant", "poisson"], default="poisson")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="Client connection cap (open loop)")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to generate load")
+    parser.add_argument("--requests", type=int, help="Stop after this many runs instead")
+    parser.add_argument("--timeout", type=float, default=120, help="Per-request timeout")
+    parser.add_argument("--fnols", help="JSONL file with {'fnol': ...} records (default: built-in samples)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="load_test_report.json")
+    args = parser.parse_args()
+
+    fnols = SAMPLE_FNOLS
+    if args.fnols:
+        with open(args.fnols) as f:
+            fnols = [json.loads(line)["fnol"] for line in f if line.strip()]
+
+    def session_for():
+        session = requests.Session()
+        session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=4))
+        return session
+
+    requests.get(f"{args.url}/ok", timeout=5).raise_for_status()
+
+    start = time.perf_counter()
+    results = (closed_loop if args.mode == "closed" else open_loop)(args, fnols, session_for)
+    report = build_report(args, results, time.perf_counter() - start)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    print(f"\nReport written to {args.output}")
+    return report["totals"]["errors"] == 0
+
+
+if __name__ == "__main__":
+    try:
+        exit(0 if main() else 1)
+    except requests.ConnectionError as e:
+        print(f"❌ Cannot reach the LangGraph server: {e}")
+        exit(1)
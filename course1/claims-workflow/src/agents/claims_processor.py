@@ -2,16 +2,25 @@
 
 import json
 import logging
+import os
 from typing import Dict, Literal
 
 from langgraph.graph import StateGraph, START, END
 
 # ✅ CAMBIAR A IMPORTS ABSOLUTOS (sin ..)
-from src.state import ClaimState
+from src.state import (
+    ClaimState,
+    ClaimInformation,
+    SeverityAssessment,
+    ClaimRouting,
+    FusedClaimAssessment
+)
 from src.prompts import (
     INFO_EXTRACTION_PROMPT,
+    PARTIAL_EXTRACTION_PROMPT,
     SEVERITY_ASSESSMENT_PROMPT,
-    QUEUE_ROUTING_PROMPT
+    QUEUE_ROUTING_PROMPT,
+    FUSED_CLAIM_PROMPT
 )
 from src.gates import (
     gate1_validate_claims_info,
@@ -19,6 +28,11 @@ from src.gates import (
     gate3_validate_routing
 )
 from src.utils import get_completion
+from src.rules import routing_engine
+from src.preextract import preextract, partial_model, describe_fields
+from src.instrumentation import instrument
+from src.dedup import dedup_index
+from src.cascade import cascade_policy
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -28,25 +42,99 @@ logger = logging.getLogger(__name__)
 # ----- Node Functions ----- #
 #================================#
 
+def dedup_check_node(state: ClaimState) -> Dict:
+    """
+    Node 0: Detect resubmitted FNOLs before any LLM call.
+    
+    This node:
+    1. Fingerprints the normalized FNOL (exact hash + SimHash)
+    2. For a duplicate of a finished claim, reuses its result (status "completed")
+    3. For a duplicate of a claim still in progress, links to it (status "duplicate")
+       without a result; the work queue defers it until the original finishes
+    4. Otherwise registers the FNOL and lets the workflow continue
+    
+    duplicate_of holds the original's claim id.
+    """
+    match = dedup_index.check(state["fnol"], state.get("claim_id"))
+    if not match.duplicate:
+        return {"dedup_key": match.key}
+    
+    original = match.original
+    if original.result is None:
+        logger.info(f"🔗 Duplicate FNOL (distance {match.distance}) of claim {original.claim_id} in progress, linked")
+        return {"dedup_key": match.key, "duplicate_of": original.claim_id, "status": "duplicate"}
+    
+    logger.info(
+        f"♻️ Duplicate FNOL (distance {match.distance}) of claim "
+        f"{original.result['claim_info'].claim_id}, reusing its result"
+    )
+    return {**original.result, "dedup_key": match.key, "duplicate_of": original.claim_id, "status": "completed"}
+
+
+def dedup_record_node(state: ClaimState) -> Dict:
+    """
+    Final node: store a completed claim's result for later duplicates, or
+    drop the fingerprint of a failed claim so a resubmission is processed again.
+    """
+    if state["status"] == "completed":
+        dedup_index.record(state["dedup_key"], {
+            "claim_info": state["claim_info"],
+            "severity": state["severity"],
+            "routing": state["routing"]
+        })
+    else:
+        dedup_index.forget(state["dedup_key"])
+    return {}
+
+
 def extract_claim_node(state: ClaimState) -> Dict:
     """
     Node 1: Extract claim information from FNOL.
     
     This node:
-    1. Sends FNOL to LLM with extraction prompt
-    2. Validates response with gate1
-    3. Updates state with ClaimInformation
+    1. Pre-extracts header fields (Claim ID, Customer, Policy, ...) locally
+    2. Sends only the remaining text to LLM, asking only for the missing fields
+       (skipped entirely when the headers cover every field)
+    3. Validates the merged result with gate1, escalating to the next model of
+       the node's cascade when the gate rejects it (model "cascade")
+    4. Updates state with ClaimInformation
     """
     logger.info("🔍 Extracting claim information...")
     
     try:
-        messages = [
-            {"role": "system", "content": INFO_EXTRACTION_PROMPT},
-            {"role": "user", "content": state["fnol"]}
-        ]
+        pre = preextract(state["fnol"])
+        missing = pre["missing"]
+        
+        def attempt(model: str) -> ClaimInformation:
+            fields = dict(pre["fields"])
+            if len(missing) == len(ClaimInformation.model_fields):
+                # No headers recognized: full extraction as before
+                messages = [
+                    {"role": "system", "content": INFO_EXTRACTION_PROMPT},
+                    {"role": "user", "content": state["fnol"]}
+                ]
+                return gate1_validate_claims_info(
+                    get_completion(messages=messages, model=model, response_model=ClaimInformation)
+                )
+            if missing:
+                logger.debug(f"Pre-extracted {sorted(fields)}, asking LLM for {missing}")
+                messages = [
+                    {"role": "system", "content": PARTIAL_EXTRACTION_PROMPT.format(fields=describe_fields(missing))},
+                    {"role": "user", "content": pre["residual"]}
+                ]
+                partial = get_completion(
+                    messages=messages,
+                    model=model,
+                    max_tokens=60 * len(missing),
+                    response_model=partial_model(missing)
+                )
+                fields.update(partial.model_dump())
+            return gate1_validate_claims_info(json.dumps(fields))
         
-        response = get_completion(messages=messages, model=state["model"])
-        claim_info = gate1_validate_claims_info(response)
+        if missing:
+            claim_info = cascade_policy.run("extract_claim", state["model"], attempt)
+        else:
+            claim_info = attempt(state["model"])
         
         logger.info(f"✅ Successfully extracted claim: {claim_info.claim_id}")
         
@@ -70,7 +158,8 @@ def assess_severity_node(state: ClaimState) -> Dict:
     This node:
     1. Takes ClaimInformation as input
     2. Sends to LLM with severity assessment prompt
-    3. Validates cost range with gate2
+    3. Validates cost range with gate2, escalating through the node's
+       model cascade on rejection (model "cascade")
     4. Updates state with SeverityAssessment
     """
     logger.info(f"📊 Assessing severity for claim {state['claim_info'].claim_id}...")
@@ -83,8 +172,9 @@ def assess_severity_node(state: ClaimState) -> Dict:
             {"role": "user", "content": claim_json}
         ]
         
-        response = get_completion(messages=messages, model=state["model"])
-        severity = gate2_cost_range_ok(response)
+        severity = cascade_policy.run("assess_severity", state["model"], lambda model: gate2_cost_range_ok(
+            get_completion(messages=messages, model=model, response_model=SeverityAssessment)
+        ))
         
         logger.info(
             f"✅ Severity assessed: {severity.severity} "
@@ -110,13 +200,26 @@ def route_claim_node(state: ClaimState) -> Dict:
     
     This node:
     1. Takes ClaimInformation and SeverityAssessment as input
-    2. Determines routing queue based on damage and severity
-    3. Validates routing decision with gate3
-    4. Updates state with ClaimRouting
+    2. Decides queue and priority with the local rule table (src/rules.py)
+    3. Only for claims the rules mark ambiguous, asks the LLM
+    4. Validates routing decision with gate3 (escalating through the
+       model cascade on rejection)
+    5. Updates state with ClaimRouting
     """
     logger.info(f"🚦 Routing claim {state['claim_info'].claim_id}...")
     
     try:
+        decision = routing_engine.evaluate(state["claim_info"], state["severity"])
+        
+        if not decision.ambiguous:
+            routing = gate3_validate_routing(decision.routing)
+            logger.info(f"✅ Claim routed to: {routing.queue} (rule '{decision.rule}')")
+            return {
+                "routing": routing,
+                "status": "completed"
+            }
+        
+        logger.info(f"🤔 Rules ambiguous ({decision.rule or 'no match'}), asking LLM")
         routing_input = {
             'claim_info': state["claim_info"].model_dump(),
             'severity_assessment': state["severity"].model_dump()
@@ -127,8 +230,9 @@ def route_claim_node(state: ClaimState) -> Dict:
             {"role": "user", "content": json.dumps(routing_input, indent=2)}
         ]
         
-        response = get_completion(messages=messages, model=state["model"])
-        routing = gate3_validate_routing(response)
+        routing = cascade_policy.run("route_claim", state["model"], lambda model: gate3_validate_routing(
+            get_completion(messages=messages, model=model, response_model=ClaimRouting)
+        ))
         
         logger.info(f"✅ Claim routed to: {routing.queue}")
         
@@ -145,6 +249,66 @@ def route_claim_node(state: ClaimState) -> Dict:
         }
 
 
+def fused_claim_node(state: ClaimState) -> Dict:
+    """
+    Fused node: extract, assess and route the claim with a single LLM call.
+    
+    This node:
+    1. Sends FNOL to LLM with the combined prompt and schema
+    2. Runs gate1 and gate2 locally on the claim information and severity
+    3. Routes with the local rule table like route_claim, keeping the LLM's
+       routing (checked by gate3) only when the rules are ambiguous
+    4. Keeps every part up to the first rejected gate; the three-stage
+       graph then resumes from that stage (status "fused_fallback")
+    
+    With model "cascade" the fused call uses the cheapest tier; the fallback
+    stages escalate through their own cascades.
+    """
+    logger.info("⚡ Processing claim in fused mode...")
+    
+    try:
+        messages = [
+            {"role": "system", "content": FUSED_CLAIM_PROMPT},
+            {"role": "user", "content": state["fnol"]}
+        ]
+        fused = get_completion(
+            messages=messages,
+            model=cascade_policy.tiers("fused_claim", state["model"])[0],
+            max_tokens=800,
+            response_model=FusedClaimAssessment
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Fused call failed, falling back to three-stage graph: {e}")
+        return {"status": "fused_fallback"}
+    
+    update: Dict = {}
+    gates = (
+        ("claim_info", gate1_validate_claims_info, fused.claim_info),
+        ("severity", gate2_cost_range_ok, fused.severity),
+        ("routing", gate3_validate_routing, fused.routing),
+    )
+    for field, gate, part in gates:
+        if field == "routing":
+            # Same routing as the three-stage graph: the rule table wins when it decides
+            decision = routing_engine.evaluate(update["claim_info"], update["severity"])
+            if not decision.ambiguous:
+                update[field] = gate3_validate_routing(decision.routing)
+                continue
+        try:
+            update[field] = gate(part)
+        except ValueError as e:
+            logger.warning(f"⚠️ Fused {field} rejected by gate, falling back: {e}")
+            update["status"] = "fused_fallback"
+            return update
+    
+    logger.info(
+        f"✅ Fused claim {update['claim_info'].claim_id}: "
+        f"{update['severity'].severity} → {update['routing'].queue}"
+    )
+    update["status"] = "completed"
+    return update
+
+
 #================================#
 # ----- Conditional Logic ----- #
 #================================#
@@ -167,11 +331,39 @@ def should_continue(state: ClaimState) -> Literal["continue", "end"]:
     return "continue"
 
 
+def after_dedup(state: ClaimState) -> Literal["duplicate", "new"]:
+    """
+    Conditional edge after the dedup check.
+    
+    Returns:
+        "duplicate" if the FNOL was answered or linked from an earlier claim,
+        "new" if it has to be processed
+    """
+    return "duplicate" if state.get("duplicate_of") else "new"
+
+
+def after_fused(state: ClaimState) -> Literal["done", "extract_claim", "assess_severity", "route_claim"]:
+    """
+    Conditional edge after the fused node.
+    
+    Returns:
+        "done" if every gate accepted the fused answer, otherwise the first
+        stage whose output is still missing
+    """
+    if state["status"] == "completed":
+        return "done"
+    if not state.get("claim_info"):
+        return "extract_claim"
+    if not state.get("severity"):
+        return "assess_severity"
+    return "route_claim"
+
+
 #================================#
 # ----- Build Graph ----- #
 #================================#
 
-def build_graph() -> StateGraph:
+def build_graph(fused: bool = False, dedup: bool = False) -> StateGraph:
     """
     Build the claims processing workflow graph.
     
@@ -180,18 +372,66 @@ def build_graph() -> StateGraph:
         
     Conditional edges after each node allow early termination on failure.
     
+    With dedup, a check first answers resubmitted FNOLs from the result of the earlier
+    claim (or links them to it while it is still running) without any LLM call:
+        START → dedup_check → END
+        START → dedup_check → extract_claim → ... → route_claim → dedup_record → END
+    
+    In fused mode a single-call node runs first and the three-stage chain is
+    only entered (at the first rejected stage) when a gate rejects its answer:
+        START → fused_claim → END
+                    ↘ extract_claim | assess_severity | route_claim → ...
+    
+    Every node is wrapped with src.instrumentation (wall time, queue wait, tokens,
+    retries and gate outcome; exported when CLAIMS_METRICS_FILE / CLAIMS_SPAN_LOG are set).
+    
+    Args:
+        fused: Start with the single-call fused node
+        dedup: Detect duplicate FNOLs with src.dedup before processing (opt-in: a
+            false match hands another claim's result to this one)
+    
     Returns:
         Compiled StateGraph ready for execution
     """
     workflow = StateGraph(ClaimState)
     
     # Add nodes
-    workflow.add_node("extract_claim", extract_claim_node)
-    workflow.add_node("assess_severity", assess_severity_node)
-    workflow.add_node("route_claim", route_claim_node)
+    workflow.add_node("extract_claim", instrument("extract_claim", extract_claim_node))
+    workflow.add_node("assess_severity", instrument("assess_severity", assess_severity_node))
+    workflow.add_node("route_claim", instrument("route_claim", route_claim_node))
     
     # Define flow
-    workflow.add_edge(START, "extract_claim")
+    first = "fused_claim" if fused else "extract_claim"
+    if dedup:
+        workflow.add_node("dedup_check", instrument("dedup_check", dedup_check_node))
+        workflow.add_node("dedup_record", instrument("dedup_record", dedup_record_node))
+        workflow.add_edge(START, "dedup_check")
+        workflow.add_conditional_edges(
+            "dedup_check",
+            after_dedup,
+            {
+                "duplicate": END,
+                "new": first
+            }
+        )
+        workflow.add_edge("dedup_record", END)
+        finish = "dedup_record"
+    else:
+        workflow.add_edge(START, first)
+        finish = END
+    
+    if fused:
+        workflow.add_node("fused_claim", instrument("fused_claim", fused_claim_node))
+        workflow.add_conditional_edges(
+            "fused_claim",
+            after_fused,
+            {
+                "done": finish,
+                "extract_claim": "extract_claim",
+                "assess_severity": "assess_severity",
+                "route_claim": "route_claim"
+            }
+        )
     
     # Conditional edges with failure handling
     workflow.add_conditional_edges(
@@ -199,7 +439,7 @@ def build_graph() -> StateGraph:
         should_continue,
         {
             "continue": "assess_severity",
-            "end": END
+            "end": finish
         }
     )
     
@@ -208,14 +448,16 @@ def build_graph() -> StateGraph:
         should_continue,
         {
             "continue": "route_claim",
-            "end": END
+            "end": finish
         }
     )
     
-    workflow.add_edge("route_claim", END)
+    workflow.add_edge("route_claim", finish)
     
     return workflow
 
 
-# Create the graph instance for langgraph.json
-graph = build_graph().compile()
\ No newline at end of file
+# Create the graph instances for langgraph.json (CLAIMS_DEDUP=1 enables the dedup nodes)
+_DEDUP = os.getenv("CLAIMS_DEDUP", "0").lower() in ("1", "true", "yes")
+graph = build_graph(dedup=_DEDUP).compile()
+fused_graph = build_graph(fused=True, dedup=_DEDUP).compile()
\ No newline at end of file
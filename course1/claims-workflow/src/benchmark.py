@@ -0,0 +1,444 @@
+"""
+Claims throughput benchmark.
+
+Generates synthetic FNOLs across a severity mix, drives build_graph() against a fake LLM
+(the mock OpenAI server in tools/, with configurable latency) or any OpenAI-compatible
+endpoint, and reports for each concurrency level:
+    claims/sec, p50/p95/p99 latency per node and end to end, gate failure rates,
+    rule-engine decisions and peak memory.
+
+Usage:
+    python -m src.benchmark --claims 500 --concurrency 1,8,32,64 --latency-median 0.4
+    python -m src.benchmark --fused --output bench_fused.json
+    python -m src.benchmark --duplicate-rate 0.1 --dedup
+    python -m src.benchmark --base-url http://127.0.0.1:8765/v1   # external mock or local LLM
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import random
+import re
+import resource
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from openai import OpenAI
+
+from src import utils
+from src.agents.claims_processor import build_graph
+from src.prompts import (
+    INFO_EXTRACTION_PROMPT,
+    PARTIAL_EXTRACTION_PROMPT,
+    SEVERITY_ASSESSMENT_PROMPT,
+    QUEUE_ROUTING_PROMPT,
+    FUSED_CLAIM_PROMPT
+)
+from src.rules import routing_engine
+from src.dedup import dedup_index
+from src.cascade import CASCADE_MODEL, cascade_policy
+
+# The mock server lives in the repository-level tools/ directory
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "tools"))
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEVERITY_MIX = {"Low": 0.5, "Medium": 0.35, "High": 0.15}
+
+COST_RANGES = {"Low": (150, 950), "Medium": (1200, 4800), "High": (6000, 45000)}
+
+# (incident type, narrative) per severity; the fake LLM recognizes the narratives
+DAMAGE_TEMPLATES = {
+    "Low": [
+        ("glass", "A rock hit the windshield on the highway and left a small chip about the size of a coin."),
+        ("vandalism", "Someone keyed the car in a parking lot and left light scratches along the driver's door."),
+        ("collision", "Minor scuff on the rear bumper after touching a pole while parking."),
+    ],
+    "Medium": [
+        ("collision", "Another car hit me at low speed, dented the rear bumper and broke the taillight."),
+        ("hail", "A hailstorm left multiple dents on the hood, roof and trunk."),
+        ("collision", "Side-swiped on the highway; the passenger door is dented and the mirror is broken."),
+    ],
+    "High": [
+        ("collision", "Serious collision at an intersection. The front end, radiator and engine compartment "
+                      "are severely damaged and the airbags deployed."),
+        ("fire", "Engine fire in a parking garage; the vehicle is burned out."),
+        ("flood", "The car was submerged in a flash flood and water reached the dashboard."),
+    ],
+}
+
+FIRST_NAMES = ["John", "Sarah", "Michael", "Emma", "David", "Olivia", "James", "Sofia", "Daniel", "Mia"]
+LAST_NAMES = ["Smith", "Johnson", "Rodriguez", "Williams", "Brown", "Garcia", "Miller", "Davis", "Lopez"]
+VEHICLES = ["2018 Toyota Camry", "2020 Honda Civic", "2022 Ford F-150", "2019 Subaru Outback",
+            "2021 Tesla Model 3", "2017 Chevrolet Malibu", "2023 Hyundai Tucson"]
+CHANNEL_NOTES = ["Submitted via mobile app.", "Sent by email from the customer.", "Reported by phone to the agent."]
+LOCATIONS = ["Austin, TX", "Denver, CO", "Miami, FL", "Seattle, WA", "Chicago, IL", "Phoenix, AZ"]
+
+NODES = ("dedup_check", "fused_claim", "extract_claim", "assess_severity", "route_claim", "dedup_record")
+ERROR_PREFIXES = {"Extraction": "extract_claim", "Severity": "assess_severity", "Routing": "route_claim"}
+
+
+#================================#
+# ----- Synthetic FNOLs ----- #
+#================================#
+
+def generate_fnols(count: int, severity_mix: Optional[Dict[str, float]] = None, seed: int = 0,
+                   full_header_ratio: float = 0.5, duplicate_rate: float = 0.0) -> List[Dict]:
+    """
+    Generate synthetic FNOL reports.
+
+    Args:
+        count: Number of FNOLs
+        severity_mix: Severity -> weight (defaults to DEFAULT_SEVERITY_MIX)
+        seed: Random seed, so runs are comparable
+        full_header_ratio: Share of FNOLs that also carry Policy/Date/Location headers;
+            the rest use the short Claim ID/Customer/Vehicle/Incident format
+        duplicate_rate: Share of FNOLs that resubmit an earlier one through another
+            channel (reformatted, sometimes with a channel note appended)
+
+    Returns:
+        List[Dict]: {"id", "severity", "fnol"} per claim
+    """
+    mix = severity_mix or DEFAULT_SEVERITY_MIX
+    rng = random.Random(seed)
+    severities, weights = zip(*mix.items())
+    fnols = []
+    for number in range(1, count + 1):
+        if fnols and rng.random() < duplicate_rate:
+            original = rng.choice(fnols)
+            text = original["fnol"].replace(": ", ":  ").upper()
+            if rng.random() < 0.5:
+                text += f"\n{rng.choice(CHANNEL_NOTES)}"
+            fnols.append({"id": f"C{number:06d}", "severity": original["severity"], "fnol": text,
+                          "duplicate_of": original["id"]})
+            continue
+        severity = rng.choices(severities, weights)[0]
+        _, narrative = rng.choice(DAMAGE_TEMPLATES[severity])
+        claim_id = f"C{number:06d}"
+        lines = [
+            f"Claim ID: {claim_id}",
+            f"Customer: {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            f"Vehicle: {rng.choice(VEHICLES)}",
+        ]
+        if rng.random() < full_header_ratio:
+            lines += [
+                f"Policy: POL-{rng.randint(100000, 999999)}",
+                f"Date: 2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                f"Location: {rng.choice(LOCATIONS)}",
+            ]
+        lines.append(f"Incident: {narrative}")
+        fnols.append({"id": claim_id, "severity": severity, "fnol": "\n".join(lines)})
+    return fnols
+
+
+#================================#
+# ----- Fake LLM ----- #
+#================================#
+
+class FakeClaimsLLM:
+    """
+    Responder for the mock server that answers the claims prompts like a well-behaved model.
+
+    Severity follows the synthetic narrative, costs fall inside the severity range, and a
+    configurable share of severity answers is deliberately out of range so gate failures
+    show up in the benchmark. Models listed as reliable never make that mistake, which
+    lets a model cascade escalate to them.
+    """
+
+    def __init__(self, gate_error_rate: float = 0.02, reliable_models: tuple = ()):
+        self.gate_error_rate = gate_error_rate
+        self.reliable_models = reliable_models
+        self.narrative_severity = {
+            narrative: severity
+            for severity, templates in DAMAGE_TEMPLATES.items() for _, narrative in templates
+        }
+        self.narrative_type = {
+            narrative: incident_type
+            for templates in DAMAGE_TEMPLATES.values() for incident_type, narrative in templates
+        }
+        self.stages = [
+            ("fused", FUSED_CLAIM_PROMPT[:60]),
+            ("partial", PARTIAL_EXTRACTION_PROMPT[:60]),
+            ("extract", INFO_EXTRACTION_PROMPT[:60]),
+            ("severity", SEVERITY_ASSESSMENT_PROMPT[:60]),
+            ("routing", QUEUE_ROUTING_PROMPT[:60]),
+        ]
+
+    def _narrative(self, text: str) -> str:
+        return next((narrative for narrative in self.narrative_severity if narrative in text), "")
+
+    def _rng(self, text: str) -> random.Random:
+        return random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+
+    def _extraction(self, text: str, fields: List[str]) -> Dict:
+        narrative = self._narrative(text)
+        claim_id = re.search(r"Claim ID:\s*(\S+)", text)
+        values = {
+            "claim_id": claim_id.group(1) if claim_id else "Unknown",
+            "incident_type": self.narrative_type.get(narrative, "collision"),
+            "damage_description": narrative or "Unknown",
+        }
+        return {field: values.get(field, "Unknown") for field in fields}
+
+    def _severity(self, text: str, model: str = "") -> Dict:
+        rng = self._rng(text)
+        severity = self.narrative_severity.get(self._narrative(text), "Medium")
+        low, high = COST_RANGES[severity]
+        if rng.random() < self.gate_error_rate and model not in self.reliable_models:
+            # Out-of-range estimate: gate2 must reject it
+            low, high = COST_RANGES["High" if severity == "Low" else "Low"]
+        return {"severity": severity, "est_cost": round(rng.uniform(low, high), 2),
+                "reasoning": f"Damage consistent with {severity.lower()} severity"}
+
+    def _routing(self, severity: str) -> Dict:
+        queue, priority = {"Low": ("auto", "low"), "Medium": ("manual", "medium"),
+                           "High": ("specialist", "high")}[severity]
+        return {"queue": queue, "priority": priority, "reasoning": f"{severity} severity claim"}
+
+    def __call__(self, payload: Dict) -> Optional[str]:
+        messages = payload.get("messages", [])
+        system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+        user = "\n".join(m["content"] for m in messages if m.get("role") == "user")
+        stage = next((name for name, prefix in self.stages if system.startswith(prefix)), None)
+
+        if stage == "partial":
+            schema = ((payload.get("response_format") or {}).get("json_schema") or {}).get("schema")
+            fields = list(schema["properties"]) if schema else re.findall(r'^\s*"(\w+)":', system, re.MULTILINE)
+            return json.dumps(self._extraction(user, fields))
+        if stage == "extract":
+            fields = ["claim_id", "policy_number", "claimant_name", "incident_date",
+                      "incident_type", "damage_description", "location"]
+            return json.dumps(self._extraction(user, fields))
+        if stage == "severity":
+            return json.dumps(self._severity(user, payload.get("model", "")))
+        if stage == "routing":
+            severity = re.search(r'"severity":\s*"(\w+)"', user)
+            return json.dumps(self._routing(severity.group(1) if severity else "Medium"))
+        if stage == "fused":
+            claim_info = self._extraction(user, ["claim_id", "policy_number", "claimant_name", "incident_date",
+                                                  "incident_type", "damage_description", "location"])
+            severity = self._severity(user, payload.get("model", ""))
+            return json.dumps({"claim_info": claim_info, "severity": severity,
+                               "routing": self._routing(severity["severity"])})
+        return None
+
+
+#================================#
+# ----- Measurement ----- #
+#================================#
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile (None for an empty list)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def latency_summary(values: List[float]) -> Dict:
+    """p50/p95/p99/mean in milliseconds."""
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "mean_ms": round(sum(values) / len(values) * 1000, 2),
+    }
+
+
+def run_claim(app, item: Dict, model: str, enqueued_at: Optional[float] = None) -> Dict:
+    """Run one claim through the graph, timing every node from the update stream."""
+    state = {"fnol": item["fnol"], "model": model, "errors": [], "status": "processing",
+             "enqueued_at": enqueued_at or time.time()}
+    final = dict(state)
+    node_times = {}
+    start = last = time.perf_counter()
+    for update in app.stream(state, stream_mode="updates"):
+        now = time.perf_counter()
+        for node, values in update.items():
+            node_times[node] = now - last
+            if values:
+                final.update(values)
+        last = now
+    return {"total": last - start, "nodes": node_times, "status": final["status"],
+            "errors": final.get("errors", [])}
+
+
+def run_level(app, fnols: List[Dict], concurrency: int, model: str, trace_memory: bool = False) -> Dict:
+    """
+    Process all FNOLs at one concurrency level.
+
+    Returns:
+        Dict: Throughput, latency percentiles, gate failure rates and memory for this level
+    """
+    routing_engine.reset_stats()
+    cascade_policy.reset_stats()
+    dedup_index.clear()
+    if trace_memory:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        enqueued_at = time.time()
+        runs = list(executor.map(lambda item: run_claim(app, item, model, enqueued_at), fnols))
+    elapsed = time.perf_counter() - start
+
+    node_latencies = {node: [] for node in NODES}
+    failures = {node: 0 for node in NODES}
+    for run in runs:
+        for node, seconds in run["nodes"].items():
+            node_latencies[node].append(seconds)
+        for error in run["errors"]:
+            node = ERROR_PREFIXES.get(error.split(" ", 1)[0])
+            if node:
+                failures[node] += 1
+
+    result = {
+        "concurrency": concurrency,
+        "claims": len(runs),
+        "elapsed_s": round(elapsed, 3),
+        "claims_per_sec": round(len(runs) / elapsed, 2) if elapsed else None,
+        "completed": sum(1 for run in runs if run["status"] == "completed"),
+        "failed": sum(1 for run in runs if run["status"] == "failed"),
+        "linked_duplicates": sum(1 for run in runs if run["status"] == "duplicate"),
+        "latency": {"end_to_end": latency_summary([run["total"] for run in runs])},
+        "gate_failure_rate": {
+            node: round(failures[node] / len(node_latencies[node]), 4)
+            for node in NODES if node_latencies[node]
+        },
+        "routing_rules": routing_engine.stats(),
+        "dedup": dedup_index.stats(),
+        "cascade": cascade_policy.report(),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+    for node in NODES:
+        if node_latencies[node]:
+            result["latency"][node] = latency_summary(node_latencies[node])
+    if trace_memory:
+        result["peak_traced_mb"] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+        tracemalloc.stop()
+    return result
+
+
+def run_benchmark(claims: int = 200, concurrency_levels: List[int] = (1, 8, 32), fused: bool = False,
+                  base_url: Optional[str] = None, latency_dist: str = "lognormal", latency: float = 0.2,
+                  latency_median: float = 0.3, latency_sigma: float = 0.4, gate_error_rate: float = 0.02,
+                  severity_mix: Optional[Dict[str, float]] = None, duplicate_rate: float = 0.0,
+                  dedup: bool = False, model: str = utils.DEFAULT_MODEL, seed: int = 0,
+                  trace_memory: bool = False) -> Dict:
+    """
+    Run the full concurrency sweep.
+
+    Args:
+        claims: FNOLs per concurrency level
+        concurrency_levels: Worker counts to sweep
+        fused: Benchmark the fused single-call graph
+        base_url: Use this OpenAI-compatible endpoint instead of the in-process mock
+        latency_dist, latency, latency_median, latency_sigma: Mock latency model
+        gate_error_rate: Share of fake severity answers that gate2 must reject
+        severity_mix: Severity -> weight for the generator
+        duplicate_rate: Share of resubmitted FNOLs in the generated set
+        dedup: Run the graph with the dedup nodes
+        model: Model name sent with each request ("cascade" runs the per-node cascades;
+            the mock then treats each cascade's last tier as never failing the gate)
+        seed: Seed for the generator and the mock
+        trace_memory: Also report the Python heap peak (tracemalloc; slows the run)
+
+    Returns:
+        Dict: {"config": ..., "levels": [...]} ready to be written as JSON
+    """
+    server = None
+    if base_url is None:
+        from mock_openai_server import MockConfig, start_server
+        reliable = tuple(tiers[-1] for tiers in cascade_policy.cascades.values()) if model == CASCADE_MODEL else ()
+        server = start_server(MockConfig(
+            latency_dist=latency_dist, latency=latency, latency_median=latency_median,
+            latency_sigma=latency_sigma, responder=FakeClaimsLLM(gate_error_rate, reliable), seed=seed,
+        ))
+        base_url = server.base_url
+    utils.client = OpenAI(base_url=base_url, api_key=utils.client.api_key or "benchmark")
+
+    fnols = generate_fnols(claims, severity_mix, seed, duplicate_rate=duplicate_rate)
+    app = build_graph(fused=fused, dedup=dedup).compile()
+    config = {
+        "claims": claims, "concurrency_levels": list(concurrency_levels), "fused": fused,
+        "base_url": base_url if server is None else "in-process mock",
+        "latency": {"dist": latency_dist, "fixed_s": latency, "median_s": latency_median, "sigma": latency_sigma},
+        "gate_error_rate": gate_error_rate, "severity_mix": severity_mix or DEFAULT_SEVERITY_MIX,
+        "duplicate_rate": duplicate_rate, "dedup": dedup,
+        "model": model, "seed": seed,
+    }
+    try:
+        levels = []
+        for concurrency in concurrency_levels:
+            logger.info(f"⏱️ Benchmarking {claims} claims at concurrency {concurrency}...")
+            levels.append(run_level(app, fnols, concurrency, model, trace_memory))
+            logger.info(f"✅ {levels[-1]['claims_per_sec']} claims/sec")
+        return {"config": config, "levels": levels}
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+def print_summary(results: Dict) -> None:
+    """Print one line per concurrency level."""
+    print(f"{'conc':>5} {'claims/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'failed':>7} {'rss MB':>8}")
+    for level in results["levels"]:
+        e2e = level["latency"]["end_to_end"]
+        print(f"{level['concurrency']:>5} {level['claims_per_sec']:>9} {e2e['p50_ms']:>9} {e2e['p95_ms']:>9} "
+              f"{e2e['p99_ms']:>9} {level['failed']:>7} {level['peak_rss_mb']:>8}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Claims workflow throughput benchmark")
+    parser.add_argument("--claims", type=int, default=200, help="FNOLs per concurrency level")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--fused", action="store_true", help="Benchmark the fused single-call graph")
+    parser.add_argument("--base-url", help="OpenAI-compatible endpoint instead of the in-process mock")
+    parser.add_argument("--latency-dist", choices=["fixed", "lognormal"], default="lognormal")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per call (fixed)")
+    parser.add_argument("--latency-median", type=float, default=0.3, help="Median seconds per call (lognormal)")
+    parser.add_argument("--latency-sigma", type=float, default=0.4, help="Sigma (lognormal)")
+    parser.add_argument("--gate-error-rate", type=float, default=0.02,
+                        help="Share of fake severity answers with out-of-range costs")
+    parser.add_argument("--mix", default="Low=0.5,Medium=0.35,High=0.15", help="Severity mix weights")
+    parser.add_argument("--duplicate-rate", type=float, default=0.0, help="Share of resubmitted FNOLs")
+    parser.add_argument("--dedup", action="store_true", help="Run the graph with the dedup nodes")
+    parser.add_argument("--model", default=utils.DEFAULT_MODEL)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace-memory", action="store_true", help="Report Python heap peak (slower)")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON results file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    for noisy in ("src.agents.claims_processor", "httpx", "src.utils"):
+        logging.getLogger(noisy).setLevel(logging.ERROR)
+
+    mix = {name: float(weight) for name, weight in (item.split("=") for item in args.mix.split(","))}
+    results = run_benchmark(
+        claims=args.claims,
+        concurrency_levels=[int(level) for level in args.concurrency.split(",")],
+        fused=args.fused, base_url=args.base_url, latency_dist=args.latency_dist, latency=args.latency,
+        latency_median=args.latency_median, latency_sigma=args.latency_sigma,
+        gate_error_rate=args.gate_error_rate, severity_mix=mix, duplicate_rate=args.duplicate_rate,
+        dedup=args.dedup, model=args.model, seed=args.seed,
+        trace_memory=args.trace_memory,
+    )
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print_summary(results)
+    print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,189 @@
+"""Per-node model cascade: cheapest model first, escalate when the gate rejects"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, TypeVar
+
+from .instrumentation import add_collector, current_usage
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Setting ClaimState.model to this value runs every node through its cascade
+CASCADE_MODEL = "cascade"
+
+# Tiers per node, cheapest first
+DEFAULT_CASCADES: Dict[str, List[str]] = {
+    "extract_claim": ["gpt-4.1-nano", "gpt-4o-mini"],
+    "assess_severity": ["gpt-4.1-nano", "gpt-4o-mini"],
+    "route_claim": ["gpt-4.1-nano", "gpt-4o-mini"],
+    "fused_claim": ["gpt-4.1-nano", "gpt-4o-mini"],
+}
+
+# USD per 1M tokens (input, output)
+MODEL_PRICES: Dict[str, tuple] = {
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4o": (2.50, 10.00),
+}
+
+
+def token_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """USD cost of a call (0 for models without a known price)."""
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+class CascadePolicy:
+    """
+    Per-node model tiers and the per-tier outcome statistics.
+
+    run() tries the node's tiers in order, validating each answer with the node's gate,
+    and escalates only when the gate (or the response parsing) rejects it. API errors are
+    not escalated: they propagate like a single-model call.
+    """
+
+    def __init__(self, cascades: Optional[Dict[str, List[str]]] = None):
+        """
+        Args:
+            cascades: Node -> model tiers, cheapest first (defaults to DEFAULT_CASCADES)
+
+        Raises:
+            ValueError: If a node has no tiers
+        """
+        self.cascades = {**DEFAULT_CASCADES, **(cascades or {})}
+        for node, tiers in self.cascades.items():
+            if not tiers:
+                raise ValueError(f"Cascade for '{node}' needs at least one model")
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @classmethod
+    def from_env(cls) -> "CascadePolicy":
+        """Policy with overrides from CLAIMS_CASCADE, e.g. '{"assess_severity": ["gpt-4.1-nano", "gpt-4o"]}'"""
+        return cls(json.loads(os.getenv("CLAIMS_CASCADE", "{}")))
+
+    def tiers(self, node: str, model: str) -> List[str]:
+        """Models to try for a node: its cascade when model is "cascade", else just model."""
+        if model != CASCADE_MODEL:
+            return [model]
+        return self.cascades[node]
+
+    def reset_stats(self) -> None:
+        """Zero all tier statistics"""
+        with self._lock:
+            self._tiers: Dict[tuple, Dict] = {}
+            self._unresolved: Dict[str, int] = {}
+
+    def _record(self, node: str, model: str, tier: int, outcome: str, seconds: float, tokens: tuple) -> None:
+        with self._lock:
+            stats = self._tiers.setdefault((node, tier, model), {
+                "attempts": 0, "resolved": 0, "rejected": 0, "prompt_tokens": 0,
+                "completion_tokens": 0, "cost_usd": 0.0, "latency_s": 0.0,
+            })
+            stats["attempts"] += 1
+            stats[outcome] += 1
+            stats["prompt_tokens"] += tokens[0]
+            stats["completion_tokens"] += tokens[1]
+            stats["cost_usd"] += token_cost(model, *tokens)
+            stats["latency_s"] += seconds
+
+    def run(self, node: str, model: str, attempt: Callable[[str], T]) -> T:
+        """
+        Run a node's LLM step through its cascade.
+
+        Args:
+            node: Node name (selects the tiers)
+            model: ClaimState.model; "cascade" enables the tiers
+            attempt: Calls the LLM with the given model and returns the gate-validated result
+
+        Returns:
+            The first result the gate accepts
+
+        Raises:
+            ValueError: The last tier's rejection, when every tier was rejected
+        """
+        tiers = self.tiers(node, model)
+        for tier, tier_model in enumerate(tiers):
+            start, before = time.perf_counter(), current_usage()
+            try:
+                result = attempt(tier_model)
+            except ValueError as e:
+                tokens = tuple(after - prior for after, prior in zip(current_usage(), before))
+                self._record(node, tier_model, tier, "rejected", time.perf_counter() - start, tokens)
+                if tier == len(tiers) - 1:
+                    with self._lock:
+                        self._unresolved[node] = self._unresolved.get(node, 0) + 1
+                    raise
+                logger.info(f"⏫ {node}: {tier_model} rejected by gate, escalating to {tiers[tier + 1]} ({e})")
+                continue
+            tokens = tuple(after - prior for after, prior in zip(current_usage(), before))
+            self._record(node, tier_model, tier, "resolved", time.perf_counter() - start, tokens)
+            return result
+
+    def report(self) -> Dict:
+        """
+        Claims resolved by each tier, with cost and latency per tier.
+
+        Returns:
+            Dict: {node: {"tiers": [{"tier", "model", "attempts", "resolved", "rejected",
+            "resolved_share", "prompt_tokens", "completion_tokens", "cost_usd",
+            "mean_latency_ms"}], "unresolved", "cost_usd"}}
+        """
+        with self._lock:
+            tiers = {key: dict(stats) for key, stats in self._tiers.items()}
+            unresolved = dict(self._unresolved)
+        report: Dict[str, Dict] = {}
+        for (node, tier, model), stats in sorted(tiers.items()):
+            entry = report.setdefault(node, {"tiers": [], "unresolved": unresolved.get(node, 0), "cost_usd": 0.0})
+            entry["tiers"].append({
+                "tier": tier,
+                "model": model,
+                **{key: stats[key] for key in ("attempts", "resolved", "rejected", "prompt_tokens",
+                                               "completion_tokens")},
+                "cost_usd": round(stats["cost_usd"], 6),
+                "mean_latency_ms": round(stats["latency_s"] / stats["attempts"] * 1000, 1),
+            })
+            entry["cost_usd"] = round(entry["cost_usd"] + stats["cost_usd"], 6)
+        for entry in report.values():
+            claims = sum(tier["resolved"] for tier in entry["tiers"]) + entry["unresolved"]
+            for tier in entry["tiers"]:
+                tier["resolved_share"] = round(tier["resolved"] / claims, 4) if claims else 0.0
+        return report
+
+    def prometheus_lines(self) -> List[str]:
+        """Per-tier outcomes and cost in the text exposition format (a metrics collector)"""
+        report = self.report()
+        lines = [
+            "# HELP claims_cascade_attempts_total Cascade attempts by node, tier model and gate outcome",
+            "# TYPE claims_cascade_attempts_total counter",
+        ]
+        for node, entry in report.items():
+            for tier in entry["tiers"]:
+                for outcome in ("resolved", "rejected"):
+                    lines.append(f'claims_cascade_attempts_total{{node="{node}",tier="{tier["tier"]}",'
+                                 f'model="{tier["model"]}",outcome="{outcome}"}} {tier[outcome]}')
+        lines += [
+            "# HELP claims_cascade_cost_usd_total Estimated LLM cost by node and tier model",
+            "# TYPE claims_cascade_cost_usd_total counter",
+        ]
+        lines += [f'claims_cascade_cost_usd_total{{node="{node}",tier="{tier["tier"]}",model="{tier["model"]}"}} '
+                  f'{tier["cost_usd"]}' for node, entry in report.items() for tier in entry["tiers"]]
+        lines += [
+            "# HELP claims_cascade_unresolved_total Claims every tier of the cascade rejected",
+            "# TYPE claims_cascade_unresolved_total counter",
+        ]
+        lines += [f'claims_cascade_unresolved_total{{node="{node}"}} {entry["unresolved"]}'
+                  for node, entry in report.items()]
+        return lines
+
+
+# Shared policy used by the graph nodes
+cascade_policy = CascadePolicy.from_env()
+add_collector(cascade_policy.prometheus_lines)
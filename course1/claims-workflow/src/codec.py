@@ -0,0 +1,191 @@
+"""Compact checkpoint serialization for ClaimState"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from enum import IntEnum
+from typing import Any, Dict, Tuple
+
+import ormsgpack
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from .state import ClaimInformation, ClaimRouting, FusedClaimAssessment, SeverityAssessment
+
+# Serde type of the rows written by this codec; bump it when the layout below changes
+CODEC_TYPE = "claims-msgpack/1"
+
+# Field and model ids are positions in these tuples: append only, never reorder or remove
+STATE_FIELDS = (
+    "fnol", "model", "claim_info", "severity", "routing", "errors", "status", "trace_id",
+    "enqueued_at", "last_node_end", "dedup_key", "duplicate_of", "claim_id",
+)
+MODELS = (ClaimInformation, SeverityAssessment, ClaimRouting, FusedClaimAssessment)
+MODEL_FIELDS = tuple(tuple(model.model_fields) for model in MODELS)
+
+_FIELD_IDS = {name: i for i, name in enumerate(STATE_FIELDS)}
+_MODEL_IDS = {model: i for i, model in enumerate(MODELS)}
+
+# Tags of the encoded nodes (every encoded list starts with one)
+_MODEL, _TEXT_REF, _ERRORS, _STATE = range(1, 5)
+
+
+class ErrorKind(IntEnum):
+    """Node that reported an error, i.e. the prefix it adds to the message"""
+    OTHER = 0
+    EXTRACTION = 1
+    SEVERITY = 2
+    ROUTING = 3
+
+
+ERROR_PREFIXES = {
+    ErrorKind.EXTRACTION: "Extraction error: ",
+    ErrorKind.SEVERITY: "Severity error: ",
+    ErrorKind.ROUTING: "Routing error: ",
+}
+
+
+def text_key(text: str) -> bytes:
+    """12-byte content id of a stored text"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=12).digest()
+
+
+def split_error(error: str) -> Tuple[ErrorKind, str]:
+    """Split an error into its kind and the message after the node prefix."""
+    for kind, prefix in ERROR_PREFIXES.items():
+        if error.startswith(prefix):
+            return kind, error[len(prefix):]
+    return ErrorKind.OTHER, error
+
+
+class _Unsupported(Exception):
+    """The value is not claim state; the default serializer handles it"""
+
+
+#================================#
+# ----- Text Stores ----- #
+#================================#
+
+class MemoryTextStore:
+    """
+    In-process text store, e.g. for MemorySaver.
+
+    SQLiteCheckpointSaver(compact=True) keeps the texts in its own database instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._texts: Dict[bytes, str] = {}
+
+    def put_text(self, key: bytes, text: str) -> None:
+        with self._lock:
+            self._texts.setdefault(key, text)
+
+    def get_text(self, key: bytes) -> str:
+        return self._texts[key]
+
+    def size_bytes(self) -> int:
+        """Bytes held (keys plus UTF-8 texts)"""
+        with self._lock:
+            return sum(len(key) + len(text.encode("utf-8")) for key, text in self._texts.items())
+
+
+#================================#
+# ----- Serializer ----- #
+#================================#
+
+class ClaimStateSerializer(JsonPlusSerializer):
+    """
+    Checkpoint serializer that writes claim state as compact msgpack.
+
+    - State dicts (inputs, node updates) become [field id, value] pairs instead of keyed maps
+    - Claim models become their model id plus the field values in declaration order
+    - The FNOL text is written once to the text store and referenced by its content id
+    - Errors are stored as (ErrorKind, message id) pairs; each distinct message is stored once
+
+    Anything else (checkpoint metadata, versions, short strings, numbers) goes through
+    the default JsonPlusSerializer, and rows it wrote earlier still load.
+    """
+
+    def __init__(self, text_store=None, ref_min_length: int = 128, recent_texts: int = 4096, **kwargs):
+        """
+        Args:
+            text_store: Object with put_text(key, text) and get_text(key) (defaults to a MemoryTextStore)
+            ref_min_length: Bare string channel values at least this long are stored by reference
+            recent_texts: Content ids remembered as already stored, to skip repeated puts
+            **kwargs: Passed to JsonPlusSerializer (e.g. allowed_msgpack_modules)
+        """
+        super().__init__(**kwargs)
+        self.text_store = text_store if text_store is not None else MemoryTextStore()
+        self.ref_min_length = ref_min_length
+        self.recent_texts = recent_texts
+        self._recent: "OrderedDict[bytes, None]" = OrderedDict()
+        self._recent_lock = threading.Lock()
+
+    def _intern(self, text: str) -> bytes:
+        key = text_key(text)
+        with self._recent_lock:
+            if key in self._recent:
+                self._recent.move_to_end(key)
+                return key
+            # Stored before any row that references it is written
+            self.text_store.put_text(key, text)
+            self._recent[key] = None
+            if len(self._recent) > self.recent_texts:
+                self._recent.popitem(last=False)
+        return key
+
+    def _encode(self, value: Any, by_reference: bool = False) -> Any:
+        if value is None or isinstance(value, (bool, int, float)):
+            return value
+        if isinstance(value, str):
+            return [_TEXT_REF, self._intern(value)] if by_reference else value
+        model_id = _MODEL_IDS.get(type(value))
+        if model_id is not None:
+            return [_MODEL, model_id, *(self._encode(getattr(value, name)) for name in MODEL_FIELDS[model_id])]
+        if isinstance(value, list) and all(isinstance(item, str) for item in value):
+            encoded = [_ERRORS]
+            for error in value:
+                kind, message = split_error(error)
+                encoded += [int(kind), self._intern(message)]
+            return encoded
+        if isinstance(value, dict) and value and all(key in _FIELD_IDS for key in value):
+            encoded = [_STATE]
+            for key, item in value.items():
+                encoded += [_FIELD_IDS[key], self._encode(item, by_reference=key == "fnol")]
+            return encoded
+        raise _Unsupported
+
+    def _decode(self, value: Any) -> Any:
+        if not isinstance(value, list):
+            return value
+        tag = value[0]
+        if tag == _TEXT_REF:
+            return self.text_store.get_text(value[1])
+        if tag == _MODEL:
+            model_id = value[1]
+            fields = {name: self._decode(item) for name, item in zip(MODEL_FIELDS[model_id], value[2:])}
+            # Already validated when the node produced it
+            return MODELS[model_id].model_construct(**fields)
+        if tag == _ERRORS:
+            return [ERROR_PREFIXES.get(ErrorKind(kind), "") + self.text_store.get_text(key)
+                    for kind, key in zip(value[1::2], value[2::2])]
+        if tag == _STATE:
+            return {STATE_FIELDS[field]: self._decode(item) for field, item in zip(value[1::2], value[2::2])}
+        raise ValueError(f"Unknown claims codec tag {tag}")
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        # Scalars and short strings are already compact with the default serializer
+        if obj is None or isinstance(obj, (bool, int, float)) or isinstance(obj, str) and len(obj) < self.ref_min_length:
+            return super().dumps_typed(obj)
+        try:
+            encoded = self._encode(obj, by_reference=isinstance(obj, str))
+        except _Unsupported:
+            return super().dumps_typed(obj)
+        return CODEC_TYPE, ormsgpack.packb(encoded)
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, blob = data
+        if type_ == CODEC_TYPE:
+            return self._decode(ormsgpack.unpackb(blob))
+        return super().loads_typed(data)
+
@@ -0,0 +1,174 @@
+"""
+Checkpoint serialization benchmark: default serializer vs the compact claim codec.
+
+Runs synthetic claims through build_graph() against the in-process mock LLM, records
+every value the checkpointer serializes (channel values, pending writes, checkpoints,
+metadata), then replays them through both serializers and reports:
+    bytes written (the compact codec's text store included), bytes per claim and
+    serialize/deserialize time per value, over all values and over the claim state alone.
+
+Usage:
+    python -m src.codec_benchmark --claims 500
+    python -m src.codec_benchmark --claims 200 --gate-error-rate 0.2 --output codec_bench.json
+"""
+
+import argparse
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from openai import OpenAI
+
+from src import utils
+from src.agents.claims_processor import build_graph
+from src.benchmark import FakeClaimsLLM, generate_fnols
+from src.checkpoint import default_serde
+from src.codec import CODEC_TYPE, ClaimStateSerializer
+
+logger = logging.getLogger(__name__)
+
+
+class RecordingSerializer(JsonPlusSerializer):
+    """Default serializer that keeps every value it is asked to serialize"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.values: List[Any] = []
+
+    def dumps_typed(self, obj: Any):
+        self.values.append(obj)
+        return super().dumps_typed(obj)
+
+
+def record_checkpoint_values(claims: int, gate_error_rate: float, concurrency: int, seed: int) -> List[Any]:
+    """Run the claims with checkpoints and return the values the checkpointer serialized."""
+    from mock_openai_server import MockConfig, start_server
+
+    server = start_server(MockConfig(latency_dist="fixed", latency=0.0,
+                                     responder=FakeClaimsLLM(gate_error_rate), seed=seed))
+    utils.client = OpenAI(base_url=server.base_url, api_key=utils.client.api_key or "benchmark")
+    recorder = default_serde(RecordingSerializer)
+    app = build_graph().compile(checkpointer=MemorySaver(serde=recorder))
+
+    def run(item: Dict) -> None:
+        state = {"fnol": item["fnol"], "model": utils.DEFAULT_MODEL, "errors": [], "status": "processing"}
+        app.invoke(state, {"configurable": {"thread_id": item["id"]}})
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(run, generate_fnols(claims, seed=seed)))
+    finally:
+        server.shutdown()
+    return recorder.values
+
+
+def measure(make_serde: Callable[[], Any], values: List[Any], rounds: int) -> Dict:
+    """Bytes and best-of-rounds serialize/deserialize time of a fresh serializer over the values."""
+    serde = make_serde()
+    dumped = [serde.dumps_typed(value) for value in values]
+    dumps_s = loads_s = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for value in values:
+            serde.dumps_typed(value)
+        dumps_s = min(dumps_s, time.perf_counter() - start)
+        start = time.perf_counter()
+        for row in dumped:
+            serde.loads_typed(row)
+        loads_s = min(loads_s, time.perf_counter() - start)
+    row_bytes = sum(len(type_) + len(blob or b"") for type_, blob in dumped)
+    # The compact codec keeps FNOL texts and error messages once, in its text store
+    text_store = getattr(serde, "text_store", None)
+    text_bytes = text_store.size_bytes() if text_store is not None else 0
+    return {
+        "values": len(values),
+        "row_bytes": row_bytes,
+        "text_store_bytes": text_bytes,
+        "total_bytes": row_bytes + text_bytes,
+        "dumps_us_per_value": round(dumps_s / len(values) * 1e6, 2),
+        "loads_us_per_value": round(loads_s / len(values) * 1e6, 2),
+        "mismatches": sum(1 for value, row in zip(values, dumped) if serde.loads_typed(row) != value),
+    }
+
+
+def run_codec_benchmark(claims: int = 200, gate_error_rate: float = 0.05, concurrency: int = 8,
+                        rounds: int = 5, seed: int = 0) -> Dict:
+    """
+    Compare the default serializer with ClaimStateSerializer on recorded checkpoint traffic.
+
+    Reported twice: over every serialized value, and over the claim state values only
+    (the rest is LangGraph bookkeeping, which both serializers write the same way).
+
+    Args:
+        claims: Synthetic FNOLs to run through the graph
+        gate_error_rate: Share of fake severity answers the gate rejects (claims with errors)
+        concurrency: Claims run in parallel while recording
+        rounds: Timing repetitions (best is reported)
+        seed: Seed for the generator and the mock
+
+    Returns:
+        Dict: {"config", "all": {...}, "claim_state": {...}}, each with the "default" and
+        "compact" measurements, "bytes_ratio" and "bytes_per_claim"; ready to be written as JSON
+    """
+    logger.info(f"⏱️ Recording checkpoint traffic of {claims} claims...")
+    values = record_checkpoint_values(claims, gate_error_rate, concurrency, seed)
+    probe = default_serde(ClaimStateSerializer)
+    state_values = [value for value in values if probe.dumps_typed(value)[0] == CODEC_TYPE]
+
+    results = {"config": {"claims": claims, "gate_error_rate": gate_error_rate, "rounds": rounds, "seed": seed}}
+    for name, subset in (("all", values), ("claim_state", state_values)):
+        logger.info(f"⏱️ Measuring {len(subset)} values ({name})...")
+        default = measure(default_serde, subset, rounds)
+        compact = measure(lambda: default_serde(ClaimStateSerializer), subset, rounds)
+        results[name] = {
+            "default": default,
+            "compact": compact,
+            "bytes_ratio": round(compact["total_bytes"] / default["total_bytes"], 3),
+            "bytes_per_claim": {"default": round(default["total_bytes"] / claims, 1),
+                                "compact": round(compact["total_bytes"] / claims, 1)},
+        }
+    return results
+
+
+def print_summary(results: Dict) -> None:
+    """Print one line per value set and serializer."""
+    print(f"{'values':<12} {'serializer':<10} {'count':>7} {'bytes':>10} {'B/claim':>9} {'dumps us':>9} "
+          f"{'loads us':>9} {'mismatch':>9}")
+    for name in ("all", "claim_state"):
+        for serializer in ("default", "compact"):
+            r = results[name][serializer]
+            print(f"{name:<12} {serializer:<10} {r['values']:>7} {r['total_bytes']:>10} "
+                  f"{results[name]['bytes_per_claim'][serializer]:>9} {r['dumps_us_per_value']:>9} "
+                  f"{r['loads_us_per_value']:>9} {r['mismatches']:>9}")
+        print(f"{name:<12} compact / default bytes: {results[name]['bytes_ratio']}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Checkpoint serializer benchmark")
+    parser.add_argument("--claims", type=int, default=200, help="Synthetic FNOLs to record")
+    parser.add_argument("--gate-error-rate", type=float, default=0.05,
+                        help="Share of fake severity answers with out-of-range costs")
+    parser.add_argument("--concurrency", type=int, default=8, help="Claims run in parallel while recording")
+    parser.add_argument("--rounds", type=int, default=5, help="Timing repetitions (best is reported)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="codec_benchmark.json", help="JSON results file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    for noisy in ("src.agents.claims_processor", "httpx", "src.utils"):
+        logging.getLogger(noisy).setLevel(logging.ERROR)
+
+    results = run_codec_benchmark(args.claims, args.gate_error_rate, args.concurrency, args.rounds, args.seed)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print_summary(results)
+    print(f"\nResults written to {args.output}")
+    return 0 if results["all"]["compact"]["mismatches"] == 0 else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,280 @@
+"""Near-duplicate FNOL detection"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .preextract import preextract
+
+SIMHASH_BITS = 64
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+#================================#
+# ----- Fingerprints ----- #
+#================================#
+
+def normalize_fnol(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace, so channel formatting does not matter."""
+    return " ".join(_TOKEN_PATTERN.findall(text.lower()))
+
+
+def exact_fingerprint(normalized: str) -> str:
+    """sha256 of the normalized text"""
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _shingles(tokens: List[str], size: int = 3) -> Iterable[str]:
+    if len(tokens) < size:
+        yield " ".join(tokens)
+        return
+    for i in range(len(tokens) - size + 1):
+        yield " ".join(tokens[i:i + size])
+
+
+def simhash(normalized: str) -> int:
+    """
+    64-bit SimHash over word 3-shingles.
+
+    Texts that share most of their shingles end up a few bits apart.
+    """
+    weights = [0] * SIMHASH_BITS
+    for shingle in _shingles(normalized.split()):
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+#================================#
+# ----- Dedup Index ----- #
+#================================#
+
+class DedupEntry:
+    """One fingerprinted FNOL: pending while its claim is processed, then holding the result"""
+
+    __slots__ = ("key", "claim_id", "simhash", "identity", "created", "result")
+
+    def __init__(self, key: str, claim_id: str, simhash_value: int, identity: Dict[str, str], created: float):
+        self.key = key
+        self.claim_id = claim_id
+        self.simhash = simhash_value
+        self.identity = identity
+        self.created = created
+        self.result: Optional[Dict] = None
+
+
+class DedupMatch:
+    """Outcome of a dedup check"""
+
+    __slots__ = ("key", "original", "distance")
+
+    def __init__(self, key: str, original: Optional[DedupEntry] = None, distance: Optional[int] = None):
+        self.key = key
+        self.original = original
+        self.distance = distance
+
+    @property
+    def duplicate(self) -> bool:
+        return self.original is not None
+
+
+class DedupIndex:
+    """
+    Index of recent FNOL fingerprints with TTL eviction.
+
+    An FNOL is a duplicate when its normalized text hashes the same as a recent one, or
+    when its SimHash is within max_distance bits of one (near duplicate). Near duplicates
+    whose pre-extracted identity fields (claim id, policy number, claimant) disagree are
+    never merged, which keeps look-alike claims apart.
+
+    FNOLs are short and templated, so distinct claims can be only a few bits apart. On
+    generate_fnols(3000, seed=1) the default max_distance of 3 merges no distinct claims
+    even with the claim id headers removed (distance 4 already merges two), and still
+    catches reformatted resubmissions without an appended note.
+
+    Candidates are found by banding: the 64 bits are split into max_distance + 1 bands,
+    and two hashes within max_distance bits must agree exactly on at least one band.
+
+    Thread-safe; stats() shows hits, vetoes and the distance of accepted near matches so
+    the threshold can be tuned.
+    """
+
+    def __init__(self, ttl: float = 24 * 3600, max_distance: int = 3, max_entries: int = 100_000,
+                 pending_timeout: float = 300,
+                 identity_fields: Tuple[str, ...] = ("claim_id", "policy_number", "claimant_name")):
+        """
+        Args:
+            ttl: Seconds a fingerprint stays in the index
+            max_distance: Largest SimHash Hamming distance treated as a duplicate (0 = exact only)
+            max_entries: Oldest fingerprints are evicted beyond this size
+            pending_timeout: Seconds after which an unfinished original no longer absorbs duplicates
+            identity_fields: ClaimInformation fields that must agree for a near-duplicate match
+
+        Raises:
+            ValueError: If max_distance is outside 0..15
+        """
+        if not 0 <= max_distance < 16:
+            raise ValueError(f"max_distance must be between 0 and 15, got {max_distance}")
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.pending_timeout = pending_timeout
+        self.identity_fields = identity_fields
+        self._bands = max_distance + 1
+        self._band_width = -(-SIMHASH_BITS // self._bands)
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop every fingerprint and zero the stats"""
+        with self._lock:
+            self._entries: "OrderedDict[str, DedupEntry]" = OrderedDict()
+            self._band_index: List[Dict[int, set]] = [{} for _ in range(self._bands)]
+            self._stats = {"checks": 0, "exact_hits": 0, "near_hits": 0, "identity_vetoes": 0,
+                           "linked_pending": 0, "reused_results": 0, "evicted": 0}
+            self._distances = [0] * (self.max_distance + 1)
+
+    def _band_values(self, value: int) -> List[int]:
+        mask = (1 << self._band_width) - 1
+        return [value >> (band * self._band_width) & mask for band in range(self._bands)]
+
+    def _remove(self, entry: DedupEntry) -> None:
+        self._entries.pop(entry.key, None)
+        for band, band_value in enumerate(self._band_values(entry.simhash)):
+            keys = self._band_index[band].get(band_value)
+            if keys is not None:
+                keys.discard(entry.key)
+                if not keys:
+                    del self._band_index[band][band_value]
+
+    def _evict(self, now: float) -> None:
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if now - oldest.created < self.ttl and len(self._entries) <= self.max_entries:
+                break
+            self._remove(oldest)
+            self._stats["evicted"] += 1
+
+    def _usable(self, entry: DedupEntry, now: float) -> bool:
+        return entry.result is not None or now - entry.created < self.pending_timeout
+
+    def _identity_conflict(self, a: Dict[str, str], b: Dict[str, str]) -> bool:
+        return any(
+            field in a and field in b and normalize_fnol(a[field]) != normalize_fnol(b[field])
+            for field in self.identity_fields
+        )
+
+    def check(self, fnol: str, claim_id: Optional[str] = None) -> DedupMatch:
+        """
+        Look an FNOL up and register it as pending when it is new.
+
+        Args:
+            fnol: FNOL text
+            claim_id: Id the claim was submitted under (e.g. the work queue id), recorded so
+                duplicates can point at it; defaults to the FNOL's Claim ID header, then the key
+
+        Returns:
+            DedupMatch: key of this FNOL's fingerprint and, for duplicates, the original
+            entry (result is None while the original is still being processed)
+        """
+        normalized = normalize_fnol(fnol)
+        key = exact_fingerprint(normalized)
+        now = time.time()
+        value = simhash(normalized)
+        identity = {field: v for field, v in preextract(fnol)["fields"].items() if field in self.identity_fields}
+
+        with self._lock:
+            self._evict(now)
+            self._stats["checks"] += 1
+
+            match = None
+            entry = self._entries.get(key)
+            if entry is not None and self._usable(entry, now):
+                self._stats["exact_hits"] += 1
+                match = DedupMatch(key, entry, 0)
+            elif self.max_distance:
+                candidates = set()
+                for band, band_value in enumerate(self._band_values(value)):
+                    candidates |= self._band_index[band].get(band_value, set())
+                best = None
+                for candidate_key in candidates:
+                    candidate = self._entries[candidate_key]
+                    distance = hamming(value, candidate.simhash)
+                    if distance > self.max_distance or not self._usable(candidate, now):
+                        continue
+                    if self._identity_conflict(identity, candidate.identity):
+                        self._stats["identity_vetoes"] += 1
+                        continue
+                    if best is None or distance < best[0]:
+                        best = (distance, candidate)
+                if best is not None:
+                    self._stats["near_hits"] += 1
+                    self._distances[best[0]] += 1
+                    match = DedupMatch(key, best[1], best[0])
+
+            if match is not None:
+                self._stats["reused_results" if match.original.result is not None else "linked_pending"] += 1
+                return match
+
+            if entry is not None:
+                self._remove(entry)
+            new_entry = DedupEntry(key, claim_id or identity.get("claim_id") or key, value, identity, now)
+            self._entries[key] = new_entry
+            for band, band_value in enumerate(self._band_values(value)):
+                self._band_index[band].setdefault(band_value, set()).add(key)
+            return DedupMatch(key)
+
+    def record(self, key: str, result: Dict) -> None:
+        """Attach the finished claim result to a pending fingerprint."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.result = result
+
+    def forget(self, key: str) -> None:
+        """Drop a fingerprint (e.g. its claim failed), so resubmissions are processed again."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._remove(entry)
+
+    def stats(self) -> Dict:
+        """
+        Counters plus the distance histogram of accepted near duplicates.
+
+        Returns:
+            Dict: {"entries", "max_distance", "checks", "exact_hits", "near_hits",
+            "identity_vetoes", "linked_pending", "reused_results", "evicted",
+            "duplicate_rate", "near_hit_distances"}
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["near_hit_distances"] = {str(d): n for d, n in enumerate(self._distances) if n}
+        stats["max_distance"] = self.max_distance
+        hits = stats["exact_hits"] + stats["near_hits"]
+        stats["duplicate_rate"] = round(hits / stats["checks"], 4) if stats["checks"] else 0.0
+        return stats
+
+    def export_stats(self, path: str) -> None:
+        """Write stats() as JSON"""
+        with open(path, "w") as f:
+            json.dump(self.stats(), f, indent=2)
+
+
+# Shared index used by the dedup nodes
+dedup_index = DedupIndex(
+    ttl=float(os.getenv("CLAIMS_DEDUP_TTL", 24 * 3600)),
+    max_distance=int(os.getenv("CLAIMS_DEDUP_MAX_DISTANCE", 3))
+)
@@ -1,16 +1,124 @@
 """Gate check functions for validation"""
 
 import json
-from typing import Dict
+from enum import IntEnum
+from typing import Any, Dict, Tuple, Union
 from .state import ClaimInformation, SeverityAssessment, ClaimRouting
 
+try:
+    import numpy as np
+except ImportError:  # numpy is optional: only the batch API needs it
+    np = None
 
-def gate1_validate_claims_info(claim_info_json: str) -> ClaimInformation:
+
+#================================#
+# ----- Cost Range Rules ----- #
+#================================#
+
+# Severity -> (min cost, max cost, min inclusive); the max is always inclusive
+COST_RULES: Dict[str, Tuple[int, int, bool]] = {
+    "Low": (100, 1000, True),
+    "Medium": (1000, 5000, False),
+    "High": (5000, 50000, False),
+}
+SEVERITIES = tuple(COST_RULES)
+
+
+class GateError(IntEnum):
+    """Per-row outcome of the cost range rules"""
+    OK = 0
+    UNKNOWN_SEVERITY = 1
+    INVALID_COST = 2
+    COST_BELOW_RANGE = 3
+    COST_ABOVE_RANGE = 4
+
+
+def cost_range_error(severity: str, cost: float) -> GateError:
+    """Check one (severity, cost) pair against COST_RULES."""
+    rule = COST_RULES.get(severity)
+    if rule is None:
+        return GateError.UNKNOWN_SEVERITY
+    if cost != cost:  # NaN
+        return GateError.INVALID_COST
+    min_cost, max_cost, min_inclusive = rule
+    if cost < min_cost or cost == min_cost and not min_inclusive:
+        return GateError.COST_BELOW_RANGE
+    if cost > max_cost:
+        return GateError.COST_ABOVE_RANGE
+    return GateError.OK
+
+
+def batch_cost_range_errors(severities: Any, costs: Any) -> "np.ndarray":
+    """
+    Gate 2 cost range rules over columnar arrays, for bulk re-audits.
+    
+    Evaluates COST_RULES with NumPy masks instead of one pydantic object and
+    dict lookup per row.
+    
+    Args:
+        severities: Severity labels ("Low"/"Medium"/"High"), or integer codes indexing SEVERITIES
+            (any array-like: list, NumPy array, pandas Series, pyarrow array)
+        costs: Estimated costs in USD (NaN for missing)
+    
+    Returns:
+        np.ndarray: uint8 GateError code per row
+    
+    Raises:
+        ImportError: If numpy is not installed
+        ValueError: If the arrays have different lengths
+    """
+    if np is None:
+        raise ImportError("Batch gate validation needs numpy (pip install numpy)")
+    severities = np.asarray(severities)
+    costs = np.asarray(costs, dtype=np.float64)
+    if severities.shape != costs.shape or severities.ndim != 1:
+        raise ValueError(f"Expected two 1-D arrays of the same length, got {severities.shape} and {costs.shape}")
+    
+    if severities.dtype.kind in "iu":
+        codes = severities.astype(np.int64)
+    else:
+        codes = np.full(len(severities), -1, dtype=np.int64)
+        for code, name in enumerate(SEVERITIES):
+            codes[severities == name] = code
+    known = (codes >= 0) & (codes < len(SEVERITIES))
+    codes = np.where(known, codes, 0)
+    
+    min_costs = np.array([rule[0] for rule in COST_RULES.values()], dtype=np.float64)[codes]
+    max_costs = np.array([rule[1] for rule in COST_RULES.values()], dtype=np.float64)[codes]
+    min_inclusive = np.array([rule[2] for rule in COST_RULES.values()])[codes]
+    
+    errors = np.zeros(len(costs), dtype=np.uint8)
+    # Later assignments win: same precedence as cost_range_error
+    errors[costs > max_costs] = GateError.COST_ABOVE_RANGE
+    errors[np.where(min_inclusive, costs < min_costs, costs <= min_costs)] = GateError.COST_BELOW_RANGE
+    errors[np.isnan(costs)] = GateError.INVALID_COST
+    errors[~known] = GateError.UNKNOWN_SEVERITY
+    return errors
+
+
+def validate_severity_frame(frame: Any, severity_column: str = "severity",
+                            cost_column: str = "est_cost") -> "np.ndarray":
+    """
+    batch_cost_range_errors over the columns of a claim results frame
+    (pandas DataFrame, pyarrow Table or dict of arrays).
+    
+    Returns:
+        np.ndarray: uint8 GateError code per row
+    """
+    return batch_cost_range_errors(frame[severity_column], frame[cost_column])
+
+
+#================================#
+# ----- Gate Functions ----- #
+#================================#
+
+
+def gate1_validate_claims_info(claim_info_json: Union[str, ClaimInformation]) -> ClaimInformation:
     """
     Gate 1: Validate extracted claim information.
     
     Args:
-        claim_info_json: JSON string with claim data
+        claim_info_json: JSON string with claim data, or an already parsed ClaimInformation
         
     Returns:
         Validated ClaimInformation object
@@ -18,6 +126,8 @@ def gate1_validate_claims_info(claim_info_json: str) -> ClaimInformation:
     Raises:
         ValueError: If validation fails
     """
+    if isinstance(claim_info_json, ClaimInformation):
+        return claim_info_json
     try:
         claim_dict = json.loads(claim_info_json)
         return ClaimInformation(**claim_dict)
@@ -25,7 +135,7 @@ def gate1_validate_claims_info(claim_info_json: str) -> ClaimInformation:
         raise ValueError(f"Invalid claim information format: {e}") from e
 
 
-def gate2_cost_range_ok(severity_json: str) -> SeverityAssessment:
+def gate2_cost_range_ok(severity_json: Union[str, SeverityAssessment]) -> SeverityAssessment:
     """
     Gate 2: Validate severity assessment and cost range.
     
@@ -35,7 +145,7 @@ def gate2_cost_range_ok(severity_json: str) -> SeverityAssessment:
     - High: $5,000-$50,000
     
     Args:
-        severity_json: JSON string with severity assessment
+        severity_json: JSON string with severity assessment, or an already parsed SeverityAssessment
         
     Returns:
         Validated SeverityAssessment object
@@ -44,31 +154,18 @@ def gate2_cost_range_ok(severity_json: str) -> SeverityAssessment:
         ValueError: If validation fails
     """
     try:
-        severity_dict = json.loads(severity_json)
-        validated = SeverityAssessment(**severity_dict)
-        
-        cost = validated.est_cost
-        severity = validated.severity
-        
-        # Validate cost ranges
-        cost_ranges = {
-            "Low": (100, 1000),
-            "Medium": (1000, 5000),
-            "High": (5000, 50000)
-        }
-        
-        min_cost, max_cost = cost_ranges[severity]
-        
-        if severity == "Low":
-            if not (min_cost <= cost <= max_cost):
-                raise ValueError(
-                    f"Cost ${cost} out of range for {severity} severity (${min_cost}-${max_cost})"
-                )
+        if isinstance(severity_json, SeverityAssessment):
+            validated = severity_json
         else:
-            if not (min_cost < cost <= max_cost):
-                raise ValueError(
-                    f"Cost ${cost} out of range for {severity} severity (${min_cost}-${max_cost})"
-                )
+            validated = SeverityAssessment(**json.loads(severity_json))
+        
+        error = cost_range_error(validated.severity, validated.est_cost)
+        if error != GateError.OK:
+            min_cost, max_cost, _ = COST_RULES[validated.severity]
+            raise ValueError(
+                f"Cost ${validated.est_cost} out of range for {validated.severity} severity "
+                f"(${min_cost}-${max_cost})"
+            )
         
         return validated
         
@@ -78,12 +175,12 @@ def gate2_cost_range_ok(severity_json: str) -> SeverityAssessment:
         raise ValueError(f"Invalid severity assessment format: {e}") from e
 
 
-def gate3_validate_routing(routing_json: str) -> ClaimRouting:
+def gate3_validate_routing(routing_json: Union[str, ClaimRouting]) -> ClaimRouting:
     """
     Gate 3: Validate claim routing decision.
     
     Args:
-        routing_json: JSON string with routing decision
+        routing_json: JSON string with routing decision, or an already parsed ClaimRouting
         
     Returns:
         Validated ClaimRouting object
@@ -91,6 +188,8 @@ def gate3_validate_routing(routing_json: str) -> ClaimRouting:
     Raises:
         ValueError: If validation fails
     """
+    if isinstance(routing_json, ClaimRouting):
+        return routing_json
     try:
         routing_dict = json.loads(routing_json)
         return ClaimRouting(**routing_dict)
@@ -0,0 +1,345 @@
+"""Per-node latency and token instrumentation for the claims graph"""
+
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds; le buckets of the duration and queue-wait histograms
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("claims_node_span", default=None)
+
+
+#================================#
+# ----- Node Spans ----- #
+#================================#
+
+class NodeSpan:
+    """Measurements for one execution of one graph node"""
+
+    __slots__ = ("node", "model", "trace_id", "span_id", "start", "end", "queue_wait",
+                 "prompt_tokens", "completion_tokens", "llm_calls", "retries", "status", "gate")
+
+    def __init__(self, node: str, model: str, trace_id: str, queue_wait: float):
+        self.node = node
+        self.model = model
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.start = time.time()
+        self.end = self.start
+        self.queue_wait = queue_wait
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.llm_calls = 0
+        self.retries = 0
+        self.status = "unknown"
+        self.gate = "passed"
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def record_usage(response) -> None:
+    """
+    Add the token usage of a chat completion to the node currently running.
+
+    Called by get_completion; a no-op outside an instrumented node.
+    """
+    span = _current_span.get()
+    if span is None:
+        return
+    span.llm_calls += 1
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        span.prompt_tokens += usage.prompt_tokens or 0
+        span.completion_tokens += usage.completion_tokens or 0
+
+
+def record_retry() -> None:
+    """Count an extra LLM request issued by the node currently running."""
+    span = _current_span.get()
+    if span is not None:
+        span.retries += 1
+
+
+def current_usage() -> Tuple[int, int]:
+    """(prompt, completion) tokens recorded so far by the node currently running."""
+    span = _current_span.get()
+    return (span.prompt_tokens, span.completion_tokens) if span is not None else (0, 0)
+
+
+def _gate_outcome(update: Dict) -> str:
+    """Classify a node update: passed, rejected (gate), error (API), shed (load) or fallback (fused)."""
+    status = update.get("status")
+    if status == "fused_fallback":
+        return "fallback"
+    if status != "failed":
+        return "passed"
+    errors = update.get("errors") or [""]
+    if "Load shed:" in errors[-1]:
+        return "shed"
+    return "error" if "OpenAI API error" in errors[-1] else "rejected"
+
+
+#================================#
+# ----- Exporters ----- #
+#================================#
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+class PrometheusExporter:
+    """
+    Aggregates node spans into Prometheus metrics and writes them in the text
+    exposition format (e.g. for the node_exporter textfile collector).
+
+    The file is rewritten atomically at most every flush_interval seconds and on exit.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._calls: Dict[Tuple, int] = {}
+        self._tokens: Dict[Tuple, int] = {}
+        self._retries: Dict[Tuple, int] = {}
+        self._duration: Dict[Tuple, List] = {}
+        self._queue_wait: Dict[Tuple, List] = {}
+        self._last_flush = 0.0
+
+    def _observe(self, histograms: Dict[Tuple, List], key: Tuple, value: float) -> None:
+        counts = histograms.setdefault(key, [0] * len(LATENCY_BUCKETS) + [0, 0.0])
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                counts[i] += 1
+        counts[-2] += 1
+        counts[-1] += value
+
+    def export(self, span: NodeSpan) -> None:
+        node_key = (span.node, span.model)
+        with self._lock:
+            call_key = (span.node, span.model, span.status, span.gate)
+            self._calls[call_key] = self._calls.get(call_key, 0) + 1
+            for kind, count in (("prompt", span.prompt_tokens), ("completion", span.completion_tokens)):
+                token_key = (span.node, span.model, kind)
+                self._tokens[token_key] = self._tokens.get(token_key, 0) + count
+            self._retries[node_key] = self._retries.get(node_key, 0) + span.retries
+            self._observe(self._duration, (span.node, span.model, span.status), span.duration)
+            self._observe(self._queue_wait, node_key, span.queue_wait)
+            due = span.end - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def _histogram_lines(self, name: str, histograms: Dict[Tuple, List], label_names: Tuple) -> List[str]:
+        lines = []
+        for key, counts in sorted(histograms.items()):
+            labels = dict(zip(label_names, key))
+            for bound, count in zip(LATENCY_BUCKETS, counts):
+                lines.append(f"{name}_bucket{_labels(**labels, le=str(bound))} {count}")
+            lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {counts[-2]}")
+            lines.append(f"{name}_count{_labels(**labels)} {counts[-2]}")
+            lines.append(f"{name}_sum{_labels(**labels)} {counts[-1]:.6f}")
+        return lines
+
+    def render(self) -> str:
+        """Current metrics in the Prometheus text exposition format"""
+        with self._lock:
+            lines = [
+                "# HELP claims_node_calls_total Graph node executions",
+                "# TYPE claims_node_calls_total counter",
+            ]
+            lines += [
+                f"claims_node_calls_total{_labels(node=node, model=model, status=status, gate=gate)} {count}"
+                for (node, model, status, gate), count in sorted(self._calls.items())
+            ]
+            lines += [
+                "# HELP claims_node_tokens_total LLM tokens used by graph nodes",
+                "# TYPE claims_node_tokens_total counter",
+            ]
+            lines += [
+                f"claims_node_tokens_total{_labels(node=node, model=model, kind=kind)} {count}"
+                for (node, model, kind), count in sorted(self._tokens.items())
+            ]
+            lines += [
+                "# HELP claims_node_retries_total Extra LLM requests issued by graph nodes",
+                "# TYPE claims_node_retries_total counter",
+            ]
+            lines += [
+                f"claims_node_retries_total{_labels(node=node, model=model)} {count}"
+                for (node, model), count in sorted(self._retries.items())
+            ]
+            lines += [
+                "# HELP claims_node_duration_seconds Wall time per graph node",
+                "# TYPE claims_node_duration_seconds histogram",
+            ]
+            lines += self._histogram_lines("claims_node_duration_seconds", self._duration, ("node", "model", "status"))
+            lines += [
+                "# HELP claims_node_queue_wait_seconds Time a claim waited before the node started",
+                "# TYPE claims_node_queue_wait_seconds histogram",
+            ]
+            lines += self._histogram_lines("claims_node_queue_wait_seconds", self._queue_wait, ("node", "model"))
+        for collector in _collectors:
+            lines += collector()
+        return "\n".join(lines) + "\n"
+
+    def flush(self) -> None:
+        """Rewrite the metrics file atomically"""
+        text = self.render()
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
+        self._last_flush = time.time()
+
+
+class SpanLogExporter:
+    """
+    Appends one OpenTelemetry-compatible JSON span per node execution (JSONL).
+
+    Spans of the same claim share a traceId; attributes follow the OTLP/JSON
+    key/value layout so the log can be replayed into a collector.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a")
+
+    def export(self, span: NodeSpan) -> None:
+        attributes = {
+            "claims.node": span.node,
+            "claims.model": span.model,
+            "claims.status": span.status,
+            "claims.gate": span.gate,
+            "claims.queue_wait_s": span.queue_wait,
+            "claims.llm_calls": span.llm_calls,
+            "claims.retries": span.retries,
+            "gen_ai.usage.input_tokens": span.prompt_tokens,
+            "gen_ai.usage.output_tokens": span.completion_tokens,
+        }
+        record = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.node,
+            "kind": "SPAN_KIND_INTERNAL",
+            "startTimeUnixNano": str(int(span.start * 1e9)),
+            "endTimeUnixNano": str(int(span.end * 1e9)),
+            "attributes": [
+                {"key": key, "value": {"intValue": str(value)} if isinstance(value, int)
+                    else {"doubleValue": value} if isinstance(value, float)
+                    else {"stringValue": value}}
+                for key, value in attributes.items()
+            ],
+            "status": {"code": "STATUS_CODE_ERROR" if span.status == "failed" else "STATUS_CODE_OK"},
+        }
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._file.flush()
+
+
+_exporters: List = []
+_collectors: List[Callable[[], List[str]]] = []
+
+
+def configure(prometheus_path: Optional[str] = None, span_log_path: Optional[str] = None) -> None:
+    """
+    Select where node measurements go (replaces any previous configuration).
+
+    Args:
+        prometheus_path: Prometheus text exposition file
+        span_log_path: OpenTelemetry-compatible JSONL span log
+    """
+    flush()
+    _exporters.clear()
+    if prometheus_path:
+        _exporters.append(PrometheusExporter(prometheus_path))
+    if span_log_path:
+        _exporters.append(SpanLogExporter(span_log_path))
+
+
+def add_exporter(exporter) -> None:
+    """
+    Register an extra span consumer (anything with export(span) and flush()),
+    e.g. a latency monitor; kept until the next configure().
+    """
+    _exporters.append(exporter)
+
+
+def add_collector(collector: Callable[[], List[str]]) -> None:
+    """
+    Register a function returning extra metric lines (text exposition format) that
+    PrometheusExporter appends on every render, e.g. the load controller gauges.
+    Collectors survive configure().
+    """
+    _collectors.append(collector)
+
+
+def flush() -> None:
+    """Write pending measurements of every exporter"""
+    for exporter in _exporters:
+        exporter.flush()
+
+
+atexit.register(flush)
+configure(os.getenv("CLAIMS_METRICS_FILE"), os.getenv("CLAIMS_SPAN_LOG"))
+
+
+#================================#
+# ----- Node Wrapper ----- #
+#================================#
+
+def instrument(node: str, func: Callable[[Dict], Dict]) -> Callable[[Dict], Dict]:
+    """
+    Wrap a graph node so every execution is measured and exported.
+
+    Captures wall time, queue wait (since the previous node finished, or since
+    state["enqueued_at"] for the first node), prompt/completion tokens from
+    response.usage, extra LLM requests and the gate outcome, labelled with the
+    model and the resulting claim status.
+
+    Args:
+        node: Node name used as the metric/span label
+        func: Node function
+
+    Returns:
+        Callable: Node function returning the same update plus timing fields
+    """
+    @functools.wraps(func)
+    def wrapper(state: Dict) -> Dict:
+        trace_id = state.get("trace_id") or uuid.uuid4().hex
+        started = time.time()
+        previous = state.get("last_node_end") or state.get("enqueued_at") or started
+        span = NodeSpan(node, state.get("model", "unknown"), trace_id, max(0.0, started - previous))
+        token = _current_span.set(span)
+        try:
+            update = func(state)
+        finally:
+            _current_span.reset(token)
+            span.end = time.time()
+
+        span.status = update.get("status", state.get("status", "unknown"))
+        span.gate = _gate_outcome(update)
+        for exporter in _exporters:
+            try:
+                exporter.export(span)
+            except OSError as e:
+                logger.warning(f"⚠️ Could not export metrics for {node}: {e}")
+        return {**update, "trace_id": trace_id, "last_node_end": span.end}
+
+    return wrapper
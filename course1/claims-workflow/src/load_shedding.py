@@ -0,0 +1,359 @@
+"""Adaptive LLM concurrency and load shedding when the provider slows down"""
+
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, List, Optional
+
+from .instrumentation import add_collector
+
+logger = logging.getLogger(__name__)
+
+# Lanes from most to least urgent (same names as the work queue lanes)
+LANES = ("urgent", "high", "normal", "low")
+
+# Pressure -> lanes that are shed instead of waiting for a slot, and deferred by the work queue
+SHED_LANES = {
+    "normal": (),
+    "saturated": ("low",),
+    "overloaded": ("normal", "low"),
+}
+PRESSURE_LEVELS = tuple(SHED_LANES)
+
+_current_lane: contextvars.ContextVar = contextvars.ContextVar("claims_lane", default="normal")
+
+
+class LoadShed(RuntimeError):
+    """An LLM call was refused to protect more urgent claims"""
+
+    def __init__(self, message: str, lane: str):
+        super().__init__(f"Load shed: {message}")
+        self.lane = lane
+
+
+def is_load_shed(errors: Optional[List[str]]) -> bool:
+    """True when a claim's last error is a shed LLM call (retry later instead of failing it)."""
+    return bool(errors) and "Load shed:" in errors[-1]
+
+
+@contextlib.contextmanager
+def claim_lane(lane: Optional[str]) -> Iterator[None]:
+    """Run the LLM calls made inside (e.g. one graph invoke) with this claim's lane."""
+    token = _current_lane.set(lane if lane in LANES else "normal")
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+def _quantile(ordered: List[float], q: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+#================================#
+# ----- Controller ----- #
+#================================#
+
+class LoadController:
+    """
+    AIMD concurrency limit for LLM calls, with lane-aware shedding.
+
+    Every get_completion call takes a slot. Once per adjust_interval the calls finished
+    since the last adjustment are checked: if their p95 latency is above target_latency
+    or their error rate above max_error_rate, the limit is multiplied by decrease;
+    otherwise, when callers were waiting for a slot, it grows by increase.
+
+    Pressure, from the rolling window of the last window seconds (plus waiting callers):
+        normal      latency and errors within target, nobody waiting
+        saturated   p95 above target, or callers waiting for a slot
+        overloaded  p95 above overload_factor * target, or error rate above max_error_rate
+
+    Under pressure, calls from the lanes in SHED_LANES fail fast with LoadShed instead
+    of queueing for a slot. More urgent lanes get freed slots first. The work queue
+    defers shed lanes (should_defer), so their claims do not start any LLM call.
+
+    When disabled, calls are only measured: no limit, no shedding, pressure stays visible.
+    """
+
+    def __init__(self, enabled: bool = False, initial_limit: int = 16, min_limit: int = 1, max_limit: int = 64,
+                 target_latency: float = 2.0, max_error_rate: float = 0.1, overload_factor: float = 2.0,
+                 window: float = 30.0, adjust_interval: float = 1.0, min_samples: int = 5,
+                 increase: float = 1.0, decrease: float = 0.7, max_wait: float = 30.0):
+        """
+        Args:
+            enabled: Enforce the limit and shed (otherwise only measure)
+            initial_limit: Concurrent LLM calls allowed at start
+            min_limit: Lowest limit after decreases
+            max_limit: Highest limit after increases
+            target_latency: Healthy p95 seconds per LLM call
+            max_error_rate: Error rate above which the limit decreases
+            overload_factor: p95 / target_latency that counts as overloaded
+            window: Seconds of calls kept for the latency and error metrics
+            adjust_interval: Seconds between limit adjustments
+            min_samples: Finished calls needed for an adjustment
+            increase: Additive increase of the limit
+            decrease: Multiplicative decrease factor of the limit
+            max_wait: Seconds a call waits for a slot before it is shed
+
+        Raises:
+            ValueError: If the limits or the decrease factor are inconsistent
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError(f"Expected 1 <= min_limit <= initial_limit <= max_limit, "
+                             f"got {min_limit}, {initial_limit}, {max_limit}")
+        if not 0 < decrease < 1:
+            raise ValueError(f"decrease must be between 0 and 1, got {decrease}")
+        self.enabled = enabled
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.max_error_rate = max_error_rate
+        self.overload_factor = overload_factor
+        self.window = window
+        self.adjust_interval = adjust_interval
+        self.min_samples = min_samples
+        self.increase = increase
+        self.decrease = decrease
+        self.max_wait = max_wait
+        self._cond = threading.Condition()
+        self.reset()
+
+    @classmethod
+    def from_env(cls) -> "LoadController":
+        """Controller configured from CLAIMS_LOAD_SHEDDING, CLAIMS_LLM_CONCURRENCY,
+        CLAIMS_LLM_MAX_CONCURRENCY and CLAIMS_LLM_TARGET_LATENCY"""
+        initial = int(os.getenv("CLAIMS_LLM_CONCURRENCY", 16))
+        return cls(
+            enabled=os.getenv("CLAIMS_LOAD_SHEDDING", "0").lower() in ("1", "true", "yes"),
+            initial_limit=initial,
+            max_limit=max(initial, int(os.getenv("CLAIMS_LLM_MAX_CONCURRENCY", 64))),
+            target_latency=float(os.getenv("CLAIMS_LLM_TARGET_LATENCY", 2.0)),
+        )
+
+    def reset(self) -> None:
+        """Back to the initial limit, with empty windows and zeroed counters"""
+        with self._cond:
+            self.limit = float(self.initial_limit)
+            self.in_flight = 0
+            self._waiting = dict.fromkeys(LANES, 0)
+            self._window: deque = deque()
+            self._since_adjust: List[tuple] = []
+            self._last_adjust = time.monotonic()
+            self._counters = {
+                "calls": 0, "errors": 0, "increases": 0, "decreases": 0,
+                "shed": dict.fromkeys(LANES, 0), "deferred": dict.fromkeys(LANES, 0),
+            }
+            self._cond.notify_all()
+
+    #----- Measurements -----#
+
+    def _prune(self, now: float) -> None:
+        while self._window and now - self._window[0][0] > self.window:
+            self._window.popleft()
+
+    def _window_stats(self, now: float) -> tuple:
+        """(p50, p95, error rate, samples) of the rolling window"""
+        self._prune(now)
+        if not self._window:
+            return None, None, 0.0, 0
+        ordered = sorted(latency for _, latency, _ in self._window)
+        errors = sum(1 for _, _, ok in self._window if not ok)
+        return _quantile(ordered, 0.5), _quantile(ordered, 0.95), errors / len(self._window), len(self._window)
+
+    def _pressure(self, now: float) -> str:
+        _, p95, error_rate, samples = self._window_stats(now)
+        if samples and (error_rate > self.max_error_rate or p95 > self.overload_factor * self.target_latency):
+            return "overloaded"
+        if samples and p95 > self.target_latency or any(self._waiting.values()):
+            return "saturated"
+        return "normal"
+
+    @property
+    def pressure(self) -> str:
+        """Current pressure level: normal, saturated or overloaded"""
+        with self._cond:
+            return self._pressure(time.monotonic())
+
+    @property
+    def saturated(self) -> bool:
+        """True when the controller is enforcing and pressure is above normal"""
+        return self.enabled and self.pressure != "normal"
+
+    def should_defer(self, lane: str) -> bool:
+        """True when claims of this lane should wait in the queue instead of starting now."""
+        if not self.enabled or lane not in SHED_LANES[self.pressure]:
+            return False
+        with self._cond:
+            self._counters["deferred"][lane] += 1
+        return True
+
+    #----- Slots -----#
+
+    def _first_waiting_lane(self) -> Optional[str]:
+        return next((lane for lane in LANES if self._waiting[lane]), None)
+
+    def _acquire(self, lane: str) -> None:
+        with self._cond:
+            if self.in_flight < int(self.limit) and self._first_waiting_lane() is None:
+                self.in_flight += 1
+                return
+            if lane in SHED_LANES[self._pressure(time.monotonic())]:
+                self._counters["shed"][lane] += 1
+                raise LoadShed(f"no LLM slot for a {lane} lane claim ({self.in_flight}/{int(self.limit)} in flight)",
+                               lane)
+            self._waiting[lane] += 1
+            deadline = time.monotonic() + self.max_wait
+            try:
+                # A freed slot goes to the most urgent waiting lane
+                while self.in_flight >= int(self.limit) or self._first_waiting_lane() != lane:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters["shed"][lane] += 1
+                        raise LoadShed(f"waited {self.max_wait:.0f}s for an LLM slot", lane)
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting[lane] -= 1
+                self._cond.notify_all()
+            self.in_flight += 1
+
+    def _release(self, latency: float, ok: bool) -> None:
+        now = time.monotonic()
+        with self._cond:
+            self.in_flight -= 1
+            self._counters["calls"] += 1
+            self._counters["errors"] += not ok
+            self._window.append((now, latency, ok))
+            self._since_adjust.append((latency, ok))
+            self._adjust(now)
+            self._cond.notify_all()
+
+    def _adjust(self, now: float) -> None:
+        if now - self._last_adjust < self.adjust_interval or len(self._since_adjust) < self.min_samples:
+            return
+        ordered = sorted(latency for latency, _ in self._since_adjust)
+        error_rate = sum(1 for _, ok in self._since_adjust if not ok) / len(self._since_adjust)
+        previous = int(self.limit)
+        if _quantile(ordered, 0.95) > self.target_latency or error_rate > self.max_error_rate:
+            self.limit = max(float(self.min_limit), self.limit * self.decrease)
+            self._counters["decreases"] += 1
+        elif any(self._waiting.values()) or self.in_flight >= int(self.limit) - 1:
+            self.limit = min(float(self.max_limit), self.limit + self.increase)
+            self._counters["increases"] += 1
+        if int(self.limit) != previous:
+            logger.info(f"🎚️ LLM concurrency limit {previous} → {int(self.limit)} "
+                        f"(p95 {_quantile(ordered, 0.95):.2f}s, errors {error_rate:.0%})")
+        self._since_adjust = []
+        self._last_adjust = now
+
+    @contextlib.contextmanager
+    def slot(self) -> Iterator[None]:
+        """
+        Hold an LLM call slot for the current claim lane (see claim_lane) and measure the call.
+
+        An exception escaping the block counts as an API error.
+
+        Raises:
+            LoadShed: If the lane is shed under the current pressure, or no slot freed up in max_wait
+        """
+        if self.enabled:
+            self._acquire(_current_lane.get())
+        else:
+            with self._cond:
+                self.in_flight += 1
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self._release(time.perf_counter() - start, ok)
+
+    #----- Metrics -----#
+
+    def stats(self) -> Dict:
+        """
+        Controller state and counters.
+
+        Returns:
+            Dict: {"enabled", "pressure", "limit", "in_flight", "waiting", "latency_p50_s",
+            "latency_p95_s", "error_rate", "window_samples", "calls", "errors", "increases",
+            "decreases", "shed", "deferred"}
+        """
+        with self._cond:
+            now = time.monotonic()
+            p50, p95, error_rate, samples = self._window_stats(now)
+            stats = {
+                "enabled": self.enabled,
+                "pressure": self._pressure(now),
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "waiting": dict(self._waiting),
+                "latency_p50_s": round(p50, 3) if p50 is not None else None,
+                "latency_p95_s": round(p95, 3) if p95 is not None else None,
+                "error_rate": round(error_rate, 4),
+                "window_samples": samples,
+            }
+            for key, value in self._counters.items():
+                stats[key] = dict(value) if isinstance(value, dict) else value
+        return stats
+
+    def export_stats(self, path: str) -> None:
+        """Write stats() as JSON"""
+        with open(path, "w") as f:
+            json.dump(self.stats(), f, indent=2)
+
+    def prometheus_lines(self) -> List[str]:
+        """Controller gauges and counters in the Prometheus text exposition format"""
+        stats = self.stats()
+        lines = [
+            "# HELP claims_llm_concurrency_limit Current AIMD limit of concurrent LLM calls",
+            "# TYPE claims_llm_concurrency_limit gauge",
+            f"claims_llm_concurrency_limit {stats['limit']}",
+            "# HELP claims_llm_in_flight LLM calls in progress",
+            "# TYPE claims_llm_in_flight gauge",
+            f"claims_llm_in_flight {stats['in_flight']}",
+            "# HELP claims_llm_waiting LLM calls waiting for a slot",
+            "# TYPE claims_llm_waiting gauge",
+        ]
+        lines += [f'claims_llm_waiting{{lane="{lane}"}} {count}' for lane, count in stats["waiting"].items()]
+        lines += [
+            "# HELP claims_llm_window_latency_seconds LLM call latency over the rolling window",
+            "# TYPE claims_llm_window_latency_seconds gauge",
+        ]
+        for quantile, key in (("0.5", "latency_p50_s"), ("0.95", "latency_p95_s")):
+            if stats[key] is not None:
+                lines.append(f'claims_llm_window_latency_seconds{{quantile="{quantile}"}} {stats[key]}')
+        lines += [
+            "# HELP claims_llm_window_error_rate Share of failed LLM calls over the rolling window",
+            "# TYPE claims_llm_window_error_rate gauge",
+            f"claims_llm_window_error_rate {stats['error_rate']}",
+            "# HELP claims_load_pressure Load level (0 normal, 1 saturated, 2 overloaded)",
+            "# TYPE claims_load_pressure gauge",
+            f"claims_load_pressure {PRESSURE_LEVELS.index(stats['pressure'])}",
+            "# HELP claims_llm_limit_changes_total AIMD adjustments of the concurrency limit",
+            "# TYPE claims_llm_limit_changes_total counter",
+            f'claims_llm_limit_changes_total{{direction="increase"}} {stats["increases"]}',
+            f'claims_llm_limit_changes_total{{direction="decrease"}} {stats["decreases"]}',
+            "# HELP claims_load_shed_total LLM calls refused by lane",
+            "# TYPE claims_load_shed_total counter",
+        ]
+        lines += [f'claims_load_shed_total{{lane="{lane}"}} {count}' for lane, count in stats["shed"].items()]
+        lines += [
+            "# HELP claims_load_deferred_total Claims deferred in the work queue by lane",
+            "# TYPE claims_load_deferred_total counter",
+        ]
+        lines += [f'claims_load_deferred_total{{lane="{lane}"}} {count}' for lane, count in stats["deferred"].items()]
+        return lines
+
+
+# Shared controller used by get_completion
+load_controller = LoadController.from_env()
+add_collector(load_controller.prometheus_lines)
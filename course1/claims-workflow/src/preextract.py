@@ -0,0 +1,199 @@
+"""Local FNOL header pre-extraction"""
+
+import re
+from bisect import bisect_right
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Type
+
+from pydantic import BaseModel, create_model
+
+from .state import ClaimInformation
+
+# Header label (lowercase, spaces collapsed) -> ClaimInformation field
+HEADER_FIELDS = {
+    "claim id": "claim_id",
+    "claim number": "claim_id",
+    "claim no": "claim_id",
+    "policy": "policy_number",
+    "policy number": "policy_number",
+    "policy no": "policy_number",
+    "customer": "claimant_name",
+    "claimant": "claimant_name",
+    "name": "claimant_name",
+    "date": "incident_date",
+    "incident date": "incident_date",
+    "date of loss": "incident_date",
+    "location": "location",
+    "incident type": "incident_type",
+    "damage": "damage_description",
+}
+
+# Labels common enough in narrative text ("Damage: the bumper...") that they only count
+# in the header block at the top of the FNOL
+GENERIC_LABELS = {"name", "date", "damage"}
+
+# Any "Label: value" line; the header block is the leading run of these (and blank lines)
+HEADER_LINE = re.compile(r"[ \t]*[A-Za-z][\w .'/()-]{0,40}?[ \t]*(?::|#)")
+
+_ISO_DATE = re.compile(r"(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})(?:[ T]\d{1,2}:\d{2}(?::\d{2})?)?")
+_NUMERIC_DATE = re.compile(r"(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})")
+_NAMED_MONTH_FORMATS = ("%B %d, %Y", "%b %d, %Y", "%B %d %Y", "%b %d %Y", "%d %B %Y", "%d %b %Y", "%d-%b-%Y")
+
+# One compiled pattern for every header line, e.g. "  Claim ID: C001"
+HEADER_PATTERN = re.compile(
+    r"^[ \t]*("
+    + "|".join(re.escape(label).replace(r"\ ", r"\s+") for label in sorted(HEADER_FIELDS, key=len, reverse=True))
+    + r")\.?[ \t]*(?::|#:?)[ \t]*(.*?)[ \t]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Kept on its own line so the MULTILINE anchors of HEADER_PATTERN stop at every FNOL boundary
+RECORD_SEPARATOR = "\n\x1e\n"
+
+
+def _normalize_label(label: str) -> str:
+    return re.sub(r"\s+", " ", label.lower())
+
+
+def _header_block_end(fnol: str) -> int:
+    """Offset where the leading block of "Label: value" lines ends."""
+    end = 0
+    for line in fnol.splitlines(keepends=True):
+        if line.strip() and not HEADER_LINE.match(line):
+            break
+        end += len(line)
+    return end
+
+
+def normalize_date(value: str) -> Optional[str]:
+    """
+    Normalize a header date to YYYY-MM-DD.
+
+    Accepts ISO-like dates (optionally with a time), named months ("May 1, 2024",
+    "1 May 2024") and day/month/year dates whose order is unambiguous.
+
+    Returns:
+        Optional[str]: The ISO date, or None when the value is not a date or could be
+        read either way (e.g. 03/04/2024), so the LLM reads it in context instead
+    """
+    value = value.strip()
+    match = _ISO_DATE.fullmatch(value)
+    if match:
+        year, month, day = (int(part) for part in match.groups())
+    elif (match := _NUMERIC_DATE.fullmatch(value)) is not None:
+        first, second, year = (int(part) for part in match.groups())
+        if first > 12 >= second:
+            day, month = first, second
+        elif second > 12 >= first:
+            month, day = first, second
+        elif first == second:
+            month = day = first
+        else:
+            return None
+    else:
+        for fmt in _NAMED_MONTH_FORMATS:
+            try:
+                return datetime.strptime(value, fmt).date().isoformat()
+            except ValueError:
+                continue
+        return None
+    try:
+        return date(year, month, day).isoformat()
+    except ValueError:
+        return None
+
+
+def preextract_batch(fnols: List[str]) -> List[Dict]:
+    """
+    Pre-extract header fields from a batch of FNOLs in one regex pass.
+
+    The FNOLs are joined with a record separator line and scanned once; every match is
+    mapped back to its FNOL by offset; a match that runs past the end of its FNOL is
+    dropped and the scan resumes at the next FNOL. Generic labels (GENERIC_LABELS) only
+    count in the FNOL's header block, and dates are normalized to YYYY-MM-DD; a date
+    that cannot be normalized stays in the residual text for the LLM.
+
+    Args:
+        fnols: Raw FNOL texts
+
+    Returns:
+        List[Dict]: Per FNOL {"fields": {ClaimInformation field: value},
+        "missing": [fields still needed], "residual": text without the parsed header lines}
+    """
+    blob = RECORD_SEPARATOR.join(fnols)
+    starts, offset = [], 0
+    for fnol in fnols:
+        starts.append(offset)
+        offset += len(fnol) + len(RECORD_SEPARATOR)
+
+    header_ends = [start + _header_block_end(fnol) for start, fnol in zip(starts, fnols)]
+    fields: List[Dict[str, str]] = [{} for _ in fnols]
+    consumed: List[List[tuple]] = [[] for _ in fnols]
+    position = 0
+    while (match := HEADER_PATTERN.search(blob, position)) is not None:
+        index = bisect_right(starts, match.start()) - 1
+        if match.end() > starts[index] + len(fnols[index]):
+            # A multi-word label split across the boundary: rescan from the next FNOL
+            position = starts[index + 1]
+            continue
+        position = max(match.end(), match.start() + 1)
+        label = _normalize_label(match.group(1))
+        if label in GENERIC_LABELS and match.start() >= header_ends[index]:
+            continue
+        field = HEADER_FIELDS[label]
+        value = match.group(2)
+        if value and field == "incident_date":
+            value = normalize_date(value)
+        if value and field not in fields[index]:
+            fields[index][field] = value
+            consumed[index].append((match.start() - starts[index], match.end() - starts[index]))
+
+    results = []
+    for fnol, found, spans in zip(fnols, fields, consumed):
+        residual, cursor = [], 0
+        for start, end in spans:
+            residual.append(fnol[cursor:start])
+            cursor = end
+        residual.append(fnol[cursor:])
+        results.append({
+            "fields": found,
+            "missing": [field for field in ClaimInformation.model_fields if field not in found],
+            "residual": re.sub(r"\n\s*\n+", "\n", "".join(residual)).strip(),
+        })
+    return results
+
+
+def preextract(fnol: str) -> Dict:
+    """
+    Pre-extract header fields from a single FNOL.
+
+    Returns:
+        Dict: Same structure as one element of preextract_batch()
+    """
+    return preextract_batch([fnol])[0]
+
+
+def partial_model(fields: List[str]) -> Type[BaseModel]:
+    """
+    Build a Pydantic model with only the given ClaimInformation fields.
+
+    Used as the structured-output schema when the LLM only has to fill the gaps.
+    """
+    return _partial_model(tuple(fields))
+
+
+@lru_cache(maxsize=None)
+def _partial_model(fields: tuple) -> Type[BaseModel]:
+    definitions = {
+        field: (info.annotation, info) for field, info in ClaimInformation.model_fields.items()
+        if field in fields
+    }
+    return create_model("PartialClaimInformation", **definitions)
+
+
+def describe_fields(fields: List[str]) -> str:
+    """Render the requested fields with their descriptions for the partial prompt."""
+    return "\n".join(
+        f'  "{field}": "{ClaimInformation.model_fields[field].description}"' for field in fields
+    )
@@ -19,6 +19,15 @@ Important:
 - Be precise and concise
 """
 
+PARTIAL_EXTRACTION_PROMPT = """You are a claims processing assistant. Some fields of this First Notice of Loss (FNOL) are already known.
+Return ONLY a JSON object with these remaining fields:
+{{
+{fields}
+}}
+
+If information is missing, use "Unknown" as the value.
+"""
+
 SEVERITY_ASSESSMENT_PROMPT = """You are a damage assessment specialist. Based on the claim information provided, assess the severity and estimate repair costs.
 
 Analyze the claim and return ONLY a JSON object with these fields:
@@ -69,3 +78,51 @@ Important:
 - Consider both severity and complexity
 - Provide clear reasoning for routing decision
 """
+
+FUSED_CLAIM_PROMPT = """You are a claims processing assistant. From the First Notice of Loss (FNOL), do three things at once:
+extract the claim information, assess the damage severity, and route the claim.
+
+Return ONLY a JSON object with these fields:
+{
+  "claim_info": {
+    "claim_id": "Unique identifier for the claim",
+    "policy_number": "Insurance policy number",
+    "claimant_name": "Name of the person filing the claim",
+    "incident_date": "Date when the incident occurred (YYYY-MM-DD format)",
+    "incident_type": "Type of incident (e.g., collision, theft, fire, water damage, vandalism)",
+    "damage_description": "Brief description of the damage",
+    "location": "Location where the incident occurred"
+  },
+  "severity": {
+    "severity": "Low | Medium | High",
+    "est_cost": <numeric value>,
+    "reasoning": "Brief explanation of your assessment"
+  },
+  "routing": {
+    "queue": "auto | manual | specialist",
+    "priority": "low | medium | high",
+    "reasoning": "Brief explanation of routing decision"
+  }
+}
+
+Extraction Guidelines:
+- If information is missing, use "Unknown" as the value
+
+Severity Guidelines (est_cost MUST fall inside the range of the chosen severity):
+- Low: Minor damage, cosmetic issues ($100-$1,000)
+- Medium: Moderate damage, functional impact ($1,000-$5,000)
+- High: Major damage, structural issues, total loss ($5,000-$50,000)
+
+Routing Guidelines:
+- auto: Low severity claims with clear damage and standard repairs
+- manual: Medium severity claims requiring adjuster review
+- specialist: High severity claims, complex damage, or special circumstances
+
+Priority Guidelines:
+- low: Minor claims, no time sensitivity
+- medium: Standard processing timeline
+- high: Urgent situations, safety concerns, or high-value claims
+
+Important:
+- Return ONLY valid JSON, no additional text
+"""
@@ -0,0 +1,248 @@
+"""Table-driven routing rules for claims"""
+
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from .instrumentation import add_collector
+from .state import ClaimInformation, SeverityAssessment, ClaimRouting
+
+
+#================================#
+# ----- Rule Table ----- #
+#================================#
+
+# Rules are evaluated top to bottom and the first match wins. Every condition in
+# "when" must hold. A rule marked "ambiguous" sends the claim to the LLM router.
+#
+# Supported conditions:
+#   severity:       list of severity levels
+#   min_cost:       est_cost >= value
+#   max_cost:       est_cost <= value
+#   incident_type:  incident type mentions any of these words
+#   mentions:       incident type or damage description mentions any of these words
+#   unknown_fields: any of these ClaimInformation fields is empty or "Unknown"
+ROUTING_RULES: List[Dict] = [
+    {
+        "name": "missing_information",
+        "description": "Key facts missing from the FNOL, needs judgement",
+        "when": {"unknown_fields": ["incident_type", "damage_description"]},
+        "ambiguous": True,
+    },
+    {
+        "name": "injury_or_safety",
+        "description": "Injury or safety concern",
+        "when": {"mentions": ["injur", "hospital", "ambulance", "airbag", "not drivable", "undrivable",
+                              "fatal", "fatality", "fatalities"]},
+        "queue": "specialist",
+        "priority": "high",
+    },
+    {
+        "name": "special_circumstances",
+        "description": "Theft, fire or flood need a specialist",
+        "when": {"incident_type": ["theft", "stolen", "fire", "flood", "fraud", "fraudulent"]},
+        "queue": "specialist",
+        "priority": "medium",
+    },
+    {
+        "name": "high_value",
+        "description": "High severity, high-value claim",
+        "when": {"severity": ["High"], "min_cost": 20000},
+        "queue": "specialist",
+        "priority": "high",
+    },
+    {
+        "name": "high_severity",
+        "description": "High severity claim",
+        "when": {"severity": ["High"]},
+        "queue": "specialist",
+        "priority": "medium",
+    },
+    {
+        "name": "medium_severity",
+        "description": "Medium severity claim, adjuster review",
+        "when": {"severity": ["Medium"]},
+        "queue": "manual",
+        "priority": "medium",
+    },
+    {
+        "name": "low_severity",
+        "description": "Low severity claim with standard repairs",
+        "when": {"severity": ["Low"], "max_cost": 1000},
+        "queue": "auto",
+        "priority": "low",
+    },
+]
+
+CONDITIONS = {"severity", "min_cost", "max_cost", "incident_type", "mentions", "unknown_fields"}
+
+# A negation in the same clause just before ("no injuries", "nobody was hurt") or just
+# after ("airbags did not deploy", "injuries: none") a keyword cancels that mention
+_NEGATION_BEFORE = re.compile(r"(?:\b(?:no|not|never|without|nobody|neither|nor|denie[sd])\b|n't)[^.;,!?\n]{0,25}$")
+_NEGATION_AFTER = re.compile(r"^\w*[^.;,!?\n]{0,20}?(?:\b(?:not|never|none)\b|n't)")
+
+
+@lru_cache(maxsize=None)
+def _keyword_pattern(words: tuple) -> "re.Pattern":
+    return re.compile(r"\b(?:" + "|".join(re.escape(word) for word in words) + r")(?:s|es|d|ed|y|ies|ing|ly|i[sz]ed)?\b")
+
+
+def mentions_any(text: str, words: Iterable[str]) -> bool:
+    """
+    True when text mentions any of the words without negating it.
+
+    Words match whole words, plus common suffixes so stems work ("injur" matches "injured"
+    and "injuries", not "uninjured"; "hospital" not "hospitality"). A mention negated
+    within its clause does not count.
+    """
+    text = text.lower()
+    for match in _keyword_pattern(tuple(words)).finditer(text):
+        if not (_NEGATION_BEFORE.search(text, 0, match.start()) or _NEGATION_AFTER.match(text[match.end():])):
+            return True
+    return False
+
+
+def _is_unknown(value: Optional[str]) -> bool:
+    return not value or value.strip().lower() in ("unknown", "n/a", "none")
+
+
+def _matches(when: Dict, claim_info: ClaimInformation, severity: SeverityAssessment) -> bool:
+    """Check every condition of a rule against one claim."""
+    incident_type = claim_info.incident_type.lower()
+    text = f"{incident_type} {claim_info.damage_description.lower()}"
+
+    if "severity" in when and severity.severity not in when["severity"]:
+        return False
+    if "min_cost" in when and severity.est_cost < when["min_cost"]:
+        return False
+    if "max_cost" in when and severity.est_cost > when["max_cost"]:
+        return False
+    if "incident_type" in when and not mentions_any(incident_type, when["incident_type"]):
+        return False
+    if "mentions" in when and not mentions_any(text, when["mentions"]):
+        return False
+    if "unknown_fields" in when and not any(
+        _is_unknown(getattr(claim_info, field)) for field in when["unknown_fields"]
+    ):
+        return False
+    return True
+
+
+#================================#
+# ----- Rule Engine ----- #
+#================================#
+
+class RuleDecision:
+    """Outcome of the rule engine for one claim"""
+
+    __slots__ = ("rule", "routing")
+
+    def __init__(self, rule: Optional[str], routing: Optional[ClaimRouting]):
+        self.rule = rule
+        self.routing = routing
+
+    @property
+    def ambiguous(self) -> bool:
+        """True when the claim must be routed by the LLM"""
+        return self.routing is None
+
+
+class RuleEngine:
+    """
+    Decides queue and priority locally from ClaimInformation + SeverityAssessment.
+
+    Keeps per-rule hit counts (thread-safe) so the number of LLM calls saved can be exported
+    (stats(), the work queue's GET /stats and the Prometheus metrics file).
+    """
+
+    def __init__(self, rules: Optional[List[Dict]] = None):
+        """
+        Args:
+            rules: Rule table (defaults to ROUTING_RULES)
+
+        Raises:
+            ValueError: If a rule uses an unknown condition or lacks a queue/priority
+        """
+        self.rules = rules if rules is not None else ROUTING_RULES
+        for rule in self.rules:
+            unknown = set(rule["when"]) - CONDITIONS
+            if unknown:
+                raise ValueError(f"Rule '{rule['name']}' uses unknown conditions: {sorted(unknown)}")
+            if not rule.get("ambiguous") and not ("queue" in rule and "priority" in rule):
+                raise ValueError(f"Rule '{rule['name']}' needs a queue and priority, or ambiguous=True")
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Zero all hit counters"""
+        with self._lock:
+            self._hits = {rule["name"]: 0 for rule in self.rules}
+            self._unmatched = 0
+
+    def evaluate(self, claim_info: ClaimInformation, severity: SeverityAssessment) -> RuleDecision:
+        """
+        Route a claim with the rule table.
+
+        Args:
+            claim_info: Validated claim information
+            severity: Validated severity assessment
+
+        Returns:
+            RuleDecision: The matching rule and routing; routing is None when the claim
+            is ambiguous (an ambiguous rule matched, or no rule matched)
+        """
+        for rule in self.rules:
+            if _matches(rule["when"], claim_info, severity):
+                with self._lock:
+                    self._hits[rule["name"]] += 1
+                if rule.get("ambiguous"):
+                    return RuleDecision(rule["name"], None)
+                routing = ClaimRouting(
+                    queue=rule["queue"],
+                    priority=rule["priority"],
+                    reasoning=f"Rule '{rule['name']}': {rule['description']}"
+                )
+                return RuleDecision(rule["name"], routing)
+        with self._lock:
+            self._unmatched += 1
+        return RuleDecision(None, None)
+
+    def stats(self) -> Dict:
+        """
+        Hit counts and the resulting split between local decisions and LLM calls.
+
+        Returns:
+            Dict: {"rules": {name: hits}, "unmatched", "decided_locally", "llm_escalations"}
+        """
+        with self._lock:
+            hits = dict(self._hits)
+            unmatched = self._unmatched
+        ambiguous = sum(hits[rule["name"]] for rule in self.rules if rule.get("ambiguous"))
+        return {
+            "rules": hits,
+            "unmatched": unmatched,
+            "decided_locally": sum(hits.values()) - ambiguous,
+            "llm_escalations": ambiguous + unmatched,
+        }
+
+    def prometheus_lines(self) -> List[str]:
+        """Rule hits and routing decisions in the text exposition format (a metrics collector)"""
+        stats = self.stats()
+        lines = [
+            "# HELP claims_routing_rule_hits_total Claims matched by each routing rule",
+            "# TYPE claims_routing_rule_hits_total counter",
+        ]
+        lines += [f'claims_routing_rule_hits_total{{rule="{name}"}} {hits}' for name, hits in stats["rules"].items()]
+        lines += [
+            "# HELP claims_routing_decisions_total Routing decisions made by the rules or escalated to the LLM",
+            "# TYPE claims_routing_decisions_total counter",
+            f'claims_routing_decisions_total{{decided_by="rules"}} {stats["decided_locally"]}',
+            f'claims_routing_decisions_total{{decided_by="llm"}} {stats["llm_escalations"]}',
+        ]
+        return lines
+
+
+# Shared engine used by the routing node
+routing_engine = RuleEngine()
+add_collector(routing_engine.prometheus_lines)
@@ -31,6 +31,13 @@ class ClaimRouting(BaseModel):
     reasoning: str = Field(..., description="Explanation of routing decision")
 
 
+class FusedClaimAssessment(BaseModel):
+    """Extraction, severity and routing returned by a single LLM call"""
+    claim_info: ClaimInformation = Field(..., description="Structured claim information")
+    severity: SeverityAssessment = Field(..., description="Damage severity assessment")
+    routing: ClaimRouting = Field(..., description="Routing decision")
+
+
 # TypedDict for LangGraph state
 class ClaimState(TypedDict, total=False):
     """State for claims processing workflow"""
@@ -41,3 +48,9 @@ class ClaimState(TypedDict, total=False):
     routing: Optional[ClaimRouting]  # Routing decision
     errors: list[str]  # List of errors encountered
     status: str  # Current workflow status
+    trace_id: str  # Groups the node spans of one claim (instrumentation)
+    enqueued_at: float  # Unix time the claim was submitted, for queue wait
+    last_node_end: float  # Unix time the previous node finished
+    dedup_key: str  # Fingerprint of the FNOL in the dedup index
+    duplicate_of: Optional[str]  # Claim id of the original when this FNOL is a duplicate
+    claim_id: str  # Id the claim was submitted under (work queue / checkpoint thread), if any
@@ -1,9 +1,20 @@
 """Utility functions"""
 
+import json
+import logging
 import os
-from typing import List, Dict, Optional
-from openai import OpenAI
+import re
+from typing import Any, List, Dict, Optional, Type, TypeVar, Union
+from openai import BadRequestError, OpenAI
 from dotenv import load_dotenv
+from pydantic import BaseModel, ValidationError
+
+from .instrumentation import record_retry, record_usage
+from .load_shedding import LoadShed, load_controller
+
+logger = logging.getLogger(__name__)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
 
 # Load environment variables
 load_dotenv()
@@ -14,6 +25,109 @@ client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 # Default model
 DEFAULT_MODEL = os.getenv("MODEL", "gpt-4.1-nano")
 
+# Models that rejected a json_schema response_format; they get the local extractor instead
+_NO_STRUCTURED_OUTPUTS = set()
+
+# Wording of 400s that reject the json_schema response_format itself (other 400s are re-raised)
+_STRUCTURED_OUTPUT_MARKERS = ("response_format", "json_schema", "structured output")
+
+_FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+_TRAILING_COMMA_PATTERN = re.compile(r",\s*([}\]])")
+
+
+#================================#
+# ----- Structured Outputs ----- #
+#================================#
+
+def _make_strict(node: Any) -> None:
+    """Apply the strict-mode rules in place: every property required, no extra properties."""
+    if isinstance(node, dict):
+        if "properties" in node:
+            node["additionalProperties"] = False
+            node["required"] = list(node["properties"])
+        for value in node.values():
+            _make_strict(value)
+    elif isinstance(node, list):
+        for value in node:
+            _make_strict(value)
+
+
+def response_format_for(response_model: Type[BaseModel]) -> Dict:
+    """
+    Build a json_schema response_format for a Pydantic model.
+    
+    Args:
+        response_model: Pydantic model the response must match
+        
+    Returns:
+        Dict: response_format payload for chat.completions.create
+    """
+    schema = response_model.model_json_schema()
+    _make_strict(schema)
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": response_model.__name__, "schema": schema, "strict": True}
+    }
+
+
+def extract_json(text: str) -> str:
+    """
+    Pull the first JSON object out of free-form LLM output.
+    
+    Tolerates markdown fences, prose before/after the object, trailing comments
+    and trailing commas.
+    
+    Args:
+        text: Raw completion text
+        
+    Returns:
+        str: The JSON object, re-serialized
+        
+    Raises:
+        ValueError: If no JSON object can be found
+    """
+    if not text:
+        raise ValueError("Empty response, expected a JSON object")
+    fenced = _FENCE_PATTERN.search(text)
+    candidates = [fenced.group(1), text] if fenced else [text]
+    decoder = json.JSONDecoder()
+    for candidate in candidates:
+        for cleaned in (candidate, _TRAILING_COMMA_PATTERN.sub(r"\1", candidate)):
+            start = cleaned.find("{")
+            while start != -1:
+                try:
+                    obj, _ = decoder.raw_decode(cleaned, start)
+                    return json.dumps(obj)
+                except json.JSONDecodeError:
+                    start = cleaned.find("{", start + 1)
+    raise ValueError(f"No JSON object found in response: {text[:100]!r}")
+
+
+def parse_response(text: str, response_model: Type[ModelT]) -> ModelT:
+    """
+    Validate completion text against a Pydantic model using the tolerant extractor.
+    
+    Raises:
+        ValueError: If no JSON object is found or it does not match the model
+    """
+    try:
+        return response_model.model_validate_json(extract_json(text))
+    except ValidationError as e:
+        raise ValueError(f"Response does not match {response_model.__name__}: {e}") from e
+
+
+def rejects_structured_outputs(error: BadRequestError) -> bool:
+    """
+    True when a 400 is about the response_format or its schema (the model does not
+    support structured outputs), rather than the request itself (context length,
+    content policy, ...).
+    """
+    param = getattr(error, "param", None) or ""
+    if param.startswith("response_format"):
+        return True
+    text = " ".join(str(part) for part in (getattr(error, "code", None), error)).lower()
+    return any(marker in text for marker in _STRUCTURED_OUTPUT_MARKERS)
+
 
 def get_completion(
     messages: Optional[List[Dict[str, str]]] = None,
@@ -21,11 +135,16 @@ def get_completion(
     user_prompt: Optional[str] = None,
     model: Optional[str] = None,
     temperature: float = 0,
-    max_tokens: int = 500
-) -> str:
+    max_tokens: int = 500,
+    response_model: Optional[Type[ModelT]] = None
+) -> Union[str, ModelT]:
     """
     Get completion from OpenAI API.
     
+    With a response_model the request uses JSON-schema structured outputs, so the model
+    can only answer with a matching object. Models that do not support them fall back to
+    a plain completion parsed by the tolerant local JSON extractor.
+    
     Args:
         messages: List of message dicts with 'role' and 'content'
         system_prompt: Optional system message to prepend
@@ -33,13 +152,15 @@ def get_completion(
         model: Model to use (defaults to env var MODEL)
         temperature: Sampling temperature
         max_tokens: Maximum tokens to generate
+        response_model: Optional Pydantic model to parse the response into
         
     Returns:
-        str: The completion text
+        str: The completion text, or an instance of response_model if given
         
     Raises:
-        ValueError: If no messages provided
+        ValueError: If no messages provided, or the response does not match response_model
         RuntimeError: If API call fails
+        LoadShed: If the load controller refused the call (a RuntimeError)
     """
     messages_list = list(messages) if messages else []
     
@@ -51,13 +172,40 @@ def get_completion(
     if not messages_list:
         raise ValueError("Must provide messages, system_prompt, or user_prompt")
     
+    model = model or DEFAULT_MODEL
+    request = {
+        "model": model,
+        "messages": messages_list,
+        "temperature": temperature,
+        "max_tokens": max_tokens
+    }
+    
     try:
-        response = client.chat.completions.create(
-            model=model or DEFAULT_MODEL,
-            messages=messages_list,
-            temperature=temperature,
-            max_tokens=max_tokens
-        )
-        return response.choices[0].message.content
+        # Adaptive concurrency limit; may shed the call when the provider is slow (see load_shedding)
+        with load_controller.slot():
+            if response_model is not None and model not in _NO_STRUCTURED_OUTPUTS:
+                try:
+                    response = client.chat.completions.create(
+                        **request, response_format=response_format_for(response_model)
+                    )
+                except BadRequestError as e:
+                    if not rejects_structured_outputs(e):
+                        raise
+                    logger.warning(f"⚠️ {model} rejected structured outputs, using local JSON extraction: {e}")
+                    _NO_STRUCTURED_OUTPUTS.add(model)
+                    record_retry()
+                    response = client.chat.completions.create(**request)
+            else:
+                response = client.chat.completions.create(**request)
+    except LoadShed:
+        raise
     except Exception as e:
-        raise RuntimeError(f"OpenAI API error: {e}") from e
\ No newline at end of file
+        raise RuntimeError(f"OpenAI API error: {e}") from e
+    
+    record_usage(response)
+    message = response.choices[0].message
+    if response_model is None:
+        return message.content
+    if getattr(message, "refusal", None):
+        raise ValueError(f"Model refused to answer: {message.refusal}")
+    return parse_response(message.content, response_model)
@@ -0,0 +1,616 @@
+"""
+Priority-aware claims work queue and worker pool.
+
+Claims are queued in SQLite with a priority lane and processed by a pool of workers
+running the compiled graph. A claim is processed in two legs: intake → assess_severity,
+then (after re-scoring its lane from the severity) route_claim → end, so severe claims
+overtake routine ones for the rest of the pipeline. Leases expire after a visibility
+timeout, so claims of crashed workers are picked up again and resumed from their checkpoint.
+With --load-shedding, LLM calls go through the adaptive concurrency limit of src.load_shedding:
+under load, claims in the shed lanes are deferred in the queue instead of competing for slots.
+
+Usage:
+    python -m src.work_queue --db claims_queue.db --workers 8 --port 8800
+    python -m src.work_queue --workers 32 --load-shedding --target-latency 2
+    curl -X POST localhost:8800/claims -d '{"fnol": "Claim ID: C001 ..."}'
+    curl localhost:8800/claims/C001
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional
+
+from langgraph.types import StateSnapshot
+from pydantic import BaseModel
+
+from src.agents.claims_processor import build_graph
+from src.cascade import cascade_policy
+from src.checkpoint import SQLiteCheckpointSaver, claim_config, resume_claim
+from src.instrumentation import add_exporter
+from src.load_shedding import claim_lane, is_load_shed, load_controller
+from src.preextract import preextract
+from src.rules import ROUTING_RULES, mentions_any, routing_engine
+from src.state import SeverityAssessment
+from src.utils import DEFAULT_MODEL
+
+logger = logging.getLogger(__name__)
+
+# Lane name -> priority (lower runs first)
+LANES = {"urgent": 0, "high": 1, "normal": 2, "low": 3}
+
+# Keywords for the intake lane, taken from the routing rule table
+_RULES = {rule["name"]: rule for rule in ROUTING_RULES}
+HIGH_PRIORITY_WORDS = tuple(_RULES["injury_or_safety"]["when"]["mentions"]) + tuple(
+    _RULES["special_circumstances"]["when"]["incident_type"]
+)
+LOW_PRIORITY_WORDS = ("windshield", "chip", "scratch", "scuff", "keyed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS claims (
+    claim_id TEXT PRIMARY KEY,
+    fnol TEXT NOT NULL,
+    model TEXT NOT NULL,
+    lane TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    stage TEXT NOT NULL DEFAULT 'intake',
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    visible_at REAL NOT NULL,
+    lease_owner TEXT,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS claims_ready ON claims (status, priority, enqueued_at);
+"""
+
+
+class Backpressure(Exception):
+    """Intake refused because the queue is full for the current LLM latency"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+#================================#
+# ----- Priority ----- #
+#================================#
+
+def initial_lane(fnol: str) -> str:
+    """Intake lane from the FNOL text alone (before any LLM call)."""
+    if mentions_any(fnol, HIGH_PRIORITY_WORDS):
+        return "high"
+    if mentions_any(fnol, LOW_PRIORITY_WORDS):
+        return "low"
+    return "normal"
+
+
+def lane_after_severity(severity: SeverityAssessment, current: str) -> str:
+    """
+    Re-score a claim's lane once its severity is known.
+
+    High severity goes to "urgent" when expensive or when it already was a safety case,
+    otherwise to "high"; Medium to "normal"; Low to "low".
+    """
+    if severity.severity == "High":
+        return "urgent" if severity.est_cost >= 20000 or current == "high" else "high"
+    if severity.severity == "Medium":
+        return "normal"
+    return "low"
+
+
+#================================#
+# ----- Latency Monitor ----- #
+#================================#
+
+class LatencyMonitor:
+    """
+    Exponentially weighted average of the LLM latency seen by graph nodes.
+
+    Registered as an instrumentation exporter, so every node span with LLM calls
+    updates it (seconds per call).
+    """
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self.latency: Optional[float] = None
+
+    def export(self, span) -> None:
+        if not span.llm_calls:
+            return
+        per_call = span.duration / span.llm_calls
+        with self._lock:
+            self.latency = per_call if self.latency is None else (
+                self.alpha * per_call + (1 - self.alpha) * self.latency
+            )
+
+    def flush(self) -> None:
+        pass
+
+
+#================================#
+# ----- Claims Queue ----- #
+#================================#
+
+class ClaimsQueue:
+    """
+    SQLite-backed claims queue with priority lanes, leases and backpressure.
+
+    Ready claims are served by priority lane, then age; a claim gains one lane for
+    every aging_seconds it waits, so low lanes are never starved. A lease hides a
+    claim for visibility_timeout seconds; if the worker does not finish or renew it
+    in time, the claim becomes visible again (up to max_attempts).
+
+    Backpressure: intake is refused once the number of queued claims exceeds
+    max_depth scaled down by observed LLM latency / target_latency.
+    """
+
+    def __init__(self, path: str = "claims_queue.db", visibility_timeout: float = 120.0,
+                 max_attempts: int = 3, aging_seconds: float = 300.0, max_depth: int = 1000,
+                 target_latency: float = 2.0, monitor: Optional[LatencyMonitor] = None):
+        """
+        Args:
+            path: SQLite database file
+            visibility_timeout: Seconds a leased claim stays hidden
+            max_attempts: Leases per claim before it is marked dead
+            aging_seconds: Wait that promotes a queued claim by one lane
+            max_depth: Queued claims accepted at or below target LLM latency
+            target_latency: LLM seconds per call considered healthy
+            monitor: Latency source for backpressure (none = depth limit only)
+        """
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.aging_seconds = aging_seconds
+        self.max_depth = max_depth
+        self.target_latency = target_latency
+        self.monitor = monitor
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    #----- Intake -----#
+
+    def depth_limit(self) -> int:
+        """Queued claims currently accepted, given the observed LLM latency."""
+        latency = self.monitor.latency if self.monitor else None
+        if not latency or latency <= self.target_latency:
+            return self.max_depth
+        return max(1, int(self.max_depth * self.target_latency / latency))
+
+    def enqueue(self, fnol: str, model: Optional[str] = None, claim_id: Optional[str] = None,
+                lane: Optional[str] = None) -> Dict:
+        """
+        Add a claim to the queue.
+
+        Args:
+            fnol: FNOL text
+            model: LLM model (defaults to env var MODEL)
+            claim_id: Claim id (defaults to the FNOL's Claim ID header, else a random id)
+            lane: Priority lane (defaults to initial_lane(fnol))
+
+        Returns:
+            Dict: {"claim_id", "lane", "status"}; an already known claim id is not queued twice
+
+        Raises:
+            Backpressure: If the queue is over its current depth limit
+            ValueError: If lane is unknown
+        """
+        lane = lane or initial_lane(fnol)
+        if lane not in LANES:
+            raise ValueError(f"Unknown lane '{lane}', expected one of {list(LANES)}")
+        claim_id = claim_id or preextract(fnol)["fields"].get("claim_id") or uuid.uuid4().hex[:12]
+        now = time.time()
+
+        existing = self.get(claim_id, fields=("lane", "status"))
+        if existing is not None:
+            return {"claim_id": claim_id, **existing}
+
+        with self._lock:
+            queued = self.conn.execute("SELECT COUNT(*) FROM claims WHERE status = 'queued'").fetchone()[0]
+            limit = self.depth_limit()
+            if queued >= limit:
+                latency = self.monitor.latency if self.monitor else None
+                retry_after = (latency or self.target_latency) * max(1, queued - limit + 1)
+                raise Backpressure(f"Queue full ({queued} queued, limit {limit})", retry_after)
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO claims (claim_id, fnol, model, lane, priority, enqueued_at, visible_at, "
+                "updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (claim_id, fnol, model or DEFAULT_MODEL, lane, LANES[lane], now, now, now)
+            )
+        if not cursor.rowcount:
+            return {"claim_id": claim_id, **self.get(claim_id, fields=("lane", "status"))}
+        return {"claim_id": claim_id, "lane": lane, "status": "queued"}
+
+    #----- Leases -----#
+
+    def lease(self, worker_id: str) -> Optional[Dict]:
+        """
+        Lease the most urgent visible claim.
+
+        Returns:
+            Dict: The claim row, or None when nothing is ready
+        """
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Expired leases of crashed workers that used up their attempts are dead
+                self.conn.execute(
+                    "UPDATE claims SET status = 'dead', error = 'Lease expired too many times', updated_at = ? "
+                    "WHERE status = 'leased' AND visible_at <= ? AND attempts >= ?",
+                    (now, now, self.max_attempts)
+                )
+                row = self.conn.execute(
+                    "SELECT claim_id, fnol, model, lane, stage, attempts FROM claims "
+                    "WHERE status IN ('queued', 'leased') AND visible_at <= ? "
+                    "ORDER BY priority - (? - enqueued_at) / ?, enqueued_at LIMIT 1",
+                    (now, now, self.aging_seconds)
+                ).fetchone()
+                if row is None:
+                    self.conn.execute("COMMIT")
+                    return None
+                self.conn.execute(
+                    "UPDATE claims SET status = 'leased', lease_owner = ?, attempts = attempts + 1, "
+                    "visible_at = ?, updated_at = ? WHERE claim_id = ?",
+                    (worker_id, now + self.visibility_timeout, now, row[0])
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        claim_id, fnol, model, lane, stage, attempts = row
+        return {"claim_id": claim_id, "fnol": fnol, "model": model, "lane": lane,
+                "stage": stage, "attempts": attempts + 1}
+
+    def _update_leased(self, claim_id: str, worker_id: str, assignments: str, params: tuple) -> bool:
+        with self._lock:
+            cursor = self.conn.execute(
+                f"UPDATE claims SET {assignments}, updated_at = ? "
+                "WHERE claim_id = ? AND status = 'leased' AND lease_owner = ?",
+                params + (time.time(), claim_id, worker_id)
+            )
+        return cursor.rowcount == 1
+
+    def requeue(self, claim_id: str, worker_id: str, stage: str, lane: str) -> bool:
+        """Release a leased claim for its next leg, in a (possibly new) lane. Attempts restart."""
+        return self._update_leased(
+            claim_id, worker_id,
+            "status = 'queued', stage = ?, lane = ?, priority = ?, attempts = 0, lease_owner = NULL, visible_at = ?",
+            (stage, lane, LANES[lane], time.time())
+        )
+
+    def defer(self, claim_id: str, worker_id: str, delay: float) -> bool:
+        """Put a leased claim back, hidden for delay seconds, without using up an attempt."""
+        return self._update_leased(
+            claim_id, worker_id,
+            "status = 'queued', attempts = MAX(attempts - 1, 0), lease_owner = NULL, visible_at = ?",
+            (time.time() + delay,)
+        )
+
+    def complete(self, claim_id: str, worker_id: str, status: str, result: Dict) -> bool:
+        """Finish a leased claim ("done" or "failed") and store its final state."""
+        return self._update_leased(
+            claim_id, worker_id, "status = ?, result = ?, error = ?, lease_owner = NULL",
+            (status, json.dumps(result), "; ".join(result.get("errors") or []) or None)
+        )
+
+    def renew(self, claim_id: str, worker_id: str) -> bool:
+        """Extend a lease by another visibility timeout."""
+        return self._update_leased(claim_id, worker_id, "visible_at = ?",
+                                   (time.time() + self.visibility_timeout,))
+
+    #----- Inspection -----#
+
+    def get(self, claim_id: str, fields: tuple = ("lane", "stage", "status", "attempts", "enqueued_at",
+                                                  "updated_at", "result", "error")) -> Optional[Dict]:
+        """Current row of a claim (result decoded), or None."""
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT {', '.join(fields)} FROM claims WHERE claim_id = ?", (claim_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        claim = dict(zip(fields, row))
+        if claim.get("result"):
+            claim["result"] = json.loads(claim["result"])
+        return claim
+
+    def stats(self) -> Dict:
+        """
+        Queue depth per status and lane, plus backpressure state.
+
+        Returns:
+            Dict: {"status": {status: n}, "queued_by_lane": {lane: n}, "depth_limit", "llm_latency_s"}
+        """
+        with self._lock:
+            by_status = dict(self.conn.execute("SELECT status, COUNT(*) FROM claims GROUP BY status").fetchall())
+            by_lane = dict(self.conn.execute(
+                "SELECT lane, COUNT(*) FROM claims WHERE status = 'queued' GROUP BY lane"
+            ).fetchall())
+        latency = self.monitor.latency if self.monitor else None
+        return {
+            "status": by_status,
+            "queued_by_lane": {lane: by_lane.get(lane, 0) for lane in LANES},
+            "depth_limit": self.depth_limit(),
+            "llm_latency_s": round(latency, 3) if latency is not None else None,
+        }
+
+
+#================================#
+# ----- Worker Pool ----- #
+#================================#
+
+def _jsonable(values: Dict) -> Dict:
+    return {key: value.model_dump() if isinstance(value, BaseModel) else value for key, value in values.items()}
+
+
+class WorkerPool:
+    """
+    Worker threads that lease claims and run them through the compiled graph.
+
+    The graph is compiled with a SQLiteCheckpointSaver and interrupt_after=["assess_severity"]:
+    after the severity leg the claim is re-scored and re-queued, and the next lease resumes
+    it from the checkpoint. A claim leased again after a crash also resumes from its last
+    checkpoint instead of starting over. While a leg runs, its lease is renewed every
+    heartbeat_interval seconds, so a leg slower than the visibility timeout is not leased
+    to a second worker.
+
+    LLM calls run in the claim's lane (see src.load_shedding). Claims of the lanes the
+    load controller sheds are deferred for defer_delay seconds before they start, and a
+    claim whose LLM call was shed mid-run is deferred and later retried from the node
+    that was shed, instead of being marked failed.
+    """
+
+    def __init__(self, queue: ClaimsQueue, workers: int = 4, checkpoint_path: Optional[str] = None,
+                 fused: bool = False, dedup: bool = False, poll_interval: float = 0.2, defer_delay: float = 5.0,
+                 heartbeat_interval: Optional[float] = None):
+        """
+        Args:
+            queue: Claims queue to serve
+            workers: Number of worker threads
+            checkpoint_path: Checkpoint database (defaults to "<queue db>.checkpoints")
+            fused: Use the fused single-call graph
+            dedup: Run the graph with the dedup nodes
+            poll_interval: Sleep when the queue is empty
+            defer_delay: Seconds a claim deferred under LLM load stays hidden
+            heartbeat_interval: Seconds between lease renewals (defaults to a third of the
+                queue's visibility timeout)
+        """
+        self.queue = queue
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.defer_delay = defer_delay
+        self.heartbeat_interval = heartbeat_interval or queue.visibility_timeout / 3
+        self.checkpointer = SQLiteCheckpointSaver(checkpoint_path or f"{queue.path}.checkpoints")
+        self.app = build_graph(fused=fused, dedup=dedup).compile(
+            checkpointer=self.checkpointer, interrupt_after=["assess_severity"]
+        )
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.processed = 0
+
+    @contextlib.contextmanager
+    def _heartbeat(self, claim_id: str, worker_id: str) -> Iterator[None]:
+        """Renew the claim's lease in the background until the block exits."""
+        done = threading.Event()
+
+        def beat() -> None:
+            while not done.wait(self.heartbeat_interval):
+                if not self.queue.renew(claim_id, worker_id):
+                    logger.warning(f"⚠️ Could not renew the lease on claim {claim_id}")
+                    return
+
+        thread = threading.Thread(target=beat, name=f"claims-heartbeat-{claim_id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+
+    def _run_leg(self, claim: Dict) -> StateSnapshot:
+        """Run the graph for the claim's next leg and return the snapshot it stopped at."""
+        config = claim_config(claim["claim_id"])
+        snapshot = self.app.get_state(config)
+        with claim_lane(claim["lane"]):
+            if not snapshot.values:
+                self.app.invoke(
+                    {"fnol": claim["fnol"], "model": claim["model"], "errors": [], "status": "processing",
+                     "claim_id": claim["claim_id"]},
+                    config
+                )
+            elif snapshot.next:
+                self.app.invoke(None, config)
+            elif snapshot.values.get("status") == "failed" and is_load_shed(snapshot.values.get("errors")):
+                resume_claim(self.app, claim["claim_id"])
+            snapshot = self.app.get_state(config)
+            if snapshot.next and snapshot.next != ("route_claim",):
+                # The severity interrupt also pauses failed claims (e.g. before dedup_record): finish the run
+                self.app.invoke(None, config)
+                snapshot = self.app.get_state(config)
+        return snapshot
+
+    def process(self, claim: Dict, worker_id: str) -> None:
+        """Run one leg of a leased claim and record the outcome in the queue."""
+        if load_controller.should_defer(claim["lane"]):
+            self.queue.defer(claim["claim_id"], worker_id, self.defer_delay)
+            return
+
+        with self._heartbeat(claim["claim_id"], worker_id):
+            snapshot = self._run_leg(claim)
+        values = snapshot.values
+
+        if values.get("status") == "failed" and is_load_shed(values.get("errors")):
+            logger.info(f"⏳ Claim {claim['claim_id']} shed under LLM load, deferred {self.defer_delay:.0f}s")
+            self.queue.defer(claim["claim_id"], worker_id, self.defer_delay)
+            return
+
+        if values.get("status") == "duplicate":
+            # Linked to an original still in progress: start over once it has a result (reused),
+            # or has failed (processed again), instead of completing the claim without one
+            logger.info(f"🔗 Claim {claim['claim_id']} waits for original {values['duplicate_of']}, "
+                        f"deferred {self.defer_delay:.0f}s")
+            self.checkpointer.delete_thread(claim["claim_id"])
+            self.queue.defer(claim["claim_id"], worker_id, self.defer_delay)
+            return
+
+        if snapshot.next == ("route_claim",) and values.get("severity"):
+            lane = lane_after_severity(values["severity"], claim["lane"])
+            if lane != claim["lane"]:
+                logger.info(f"🔀 Claim {claim['claim_id']} re-scored {claim['lane']} → {lane}")
+            self.queue.requeue(claim["claim_id"], worker_id, stage="routing", lane=lane)
+            return
+
+        status = "failed" if values.get("status") == "failed" or snapshot.next else "done"
+        if self.queue.complete(claim["claim_id"], worker_id, status, _jsonable(values)):
+            self.checkpointer.delete_thread(claim["claim_id"])
+            self.processed += 1
+        else:
+            logger.warning(f"⚠️ Lost the lease on claim {claim['claim_id']}, result discarded")
+
+    def _run(self, worker_id: str) -> None:
+        while not self._stop.is_set():
+            claim = self.queue.lease(worker_id)
+            if claim is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            try:
+                self.process(claim, worker_id)
+            except Exception as e:
+                # Leave the lease to expire: the claim is retried from its checkpoint
+                logger.error(f"❌ Worker {worker_id} failed on claim {claim['claim_id']}: {e}")
+
+    def start(self) -> None:
+        """Start the worker threads."""
+        for number in range(self.workers):
+            worker_id = f"{uuid.uuid4().hex[:6]}-{number}"
+            thread = threading.Thread(target=self._run, args=(worker_id,), name=f"claims-worker-{number}",
+                                      daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """Stop after the current claims and flush the checkpoints."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self.checkpointer.close()
+
+
+#================================#
+# ----- HTTP Intake ----- #
+#================================#
+
+class IntakeHandler(BaseHTTPRequestHandler):
+    """
+    Minimal HTTP front end, a local stand-in for the LangGraph server runs:
+        POST /claims {"fnol", "model"?, "claim_id"?, "lane"?} → 202, or 429 + Retry-After
+        GET  /claims/<claim_id>                              → claim row
+        GET  /stats                                          → queue, load, routing rule and cascade stats
+    """
+
+    server_version = "ClaimsQueue/1.0"
+
+    def _send_json(self, status: int, body: Dict, headers: Optional[Dict] = None) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/") != "/claims":
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            claim = self.server.queue.enqueue(
+                payload["fnol"], payload.get("model"), payload.get("claim_id"), payload.get("lane")
+            )
+        except Backpressure as e:
+            self._send_json(429, {"error": str(e)}, {"Retry-After": str(max(1, round(e.retry_after)))})
+        except (KeyError, ValueError) as e:
+            self._send_json(400, {"error": f"Invalid claim: {e}"})
+        else:
+            self._send_json(202, claim)
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/") == "/stats":
+            self._send_json(200, {**self.server.queue.stats(), "load": load_controller.stats(),
+                                  "routing_rules": routing_engine.stats(), "cascade": cascade_policy.report()})
+        elif self.path.startswith("/claims/"):
+            claim = self.server.queue.get(self.path[len("/claims/"):])
+            self._send_json(200, claim) if claim else self._send_json(404, {"error": "Unknown claim"})
+        else:
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format % args)
+
+
+def serve(queue: ClaimsQueue, host: str = "127.0.0.1", port: int = 8800) -> ThreadingHTTPServer:
+    """Create the intake HTTP server (call serve_forever() on it)."""
+    server = ThreadingHTTPServer((host, port), IntakeHandler)
+    server.queue = queue
+    return server
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Claims work queue with a worker pool")
+    parser.add_argument("--db", default="claims_queue.db", help="Queue database")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--fused", action="store_true", help="Use the fused single-call graph")
+    parser.add_argument("--dedup", action="store_true", help="Answer resubmitted FNOLs from earlier results")
+    parser.add_argument("--visibility-timeout", type=float, default=120.0)
+    parser.add_argument("--max-depth", type=int, default=1000, help="Queued claims accepted at healthy latency")
+    parser.add_argument("--target-latency", type=float, default=2.0, help="Healthy LLM seconds per call")
+    parser.add_argument("--load-shedding", action="store_true",
+                        help="Adapt LLM concurrency to latency and shed low lanes under load")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    load_controller.target_latency = args.target_latency
+    load_controller.enabled = load_controller.enabled or args.load_shedding
+    monitor = LatencyMonitor()
+    add_exporter(monitor)
+    queue = ClaimsQueue(args.db, visibility_timeout=args.visibility_timeout, max_depth=args.max_depth,
+                        target_latency=args.target_latency, monitor=monitor)
+    pool = WorkerPool(queue, workers=args.workers, fused=args.fused, dedup=args.dedup)
+    pool.start()
+    server = serve(queue, args.host, args.port)
+    logger.info(f"📥 Claims queue on http://{args.host}:{args.port} with {args.workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.stop()
+        queue.close()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
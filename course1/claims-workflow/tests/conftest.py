@@ -0,0 +1,37 @@
+"""Shared setup for the unit tests (no API calls are made)"""
+
+import os
+
+import pytest
+
+# src.utils builds the OpenAI client at import time
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+
+@pytest.fixture
+def mock_llm(monkeypatch):
+    """
+    Start the in-process mock OpenAI server and point src.utils at it.
+
+    Call the fixture with gate_error_rate (share of out-of-range severity answers) or with
+    a responder of its own (payload -> JSON text, None for the default answer).
+    """
+    from openai import OpenAI
+
+    from src import utils
+    from src.benchmark import FakeClaimsLLM
+    from src.dedup import dedup_index
+    from mock_openai_server import MockConfig, start_server
+
+    def start(gate_error_rate: float = 0.0, responder=None):
+        server = start_server(MockConfig(latency_dist="fixed", latency=0.0,
+                                         responder=responder or FakeClaimsLLM(gate_error_rate), seed=0))
+        servers.append(server)
+        monkeypatch.setattr(utils, "client", OpenAI(base_url=server.base_url, api_key="test", max_retries=0))
+        return server
+
+    servers = []
+    dedup_index.clear()
+    yield start
+    for server in servers:
+        server.shutdown()
@@ -0,0 +1,55 @@
+"""Tests for the benchmark generator and latency statistics"""
+
+from collections import Counter
+
+import pytest
+
+from src.agents.claims_processor import build_graph
+from src.benchmark import generate_fnols, latency_summary, percentile, run_level
+
+
+@pytest.mark.parametrize("pct, expected", [(0, 1), (10, 1), (50, 5), (90, 9), (95, 10), (99, 10), (100, 10)])
+def test_percentile_is_nearest_rank(pct, expected):
+    assert percentile(list(range(10, 0, -1)), pct) == expected
+
+
+def test_percentile_of_nothing():
+    assert percentile([], 50) is None
+    assert percentile([0.3], 99) == 0.3
+
+
+def test_latency_summary_in_milliseconds():
+    summary = latency_summary([0.1, 0.2, 0.3, 0.4])
+    assert summary == {"count": 4, "p50_ms": 200.0, "p95_ms": 400.0, "p99_ms": 400.0, "mean_ms": 250.0}
+    assert latency_summary([]) == {"count": 0}
+
+
+def test_generated_fnols_are_reproducible_and_follow_the_mix():
+    fnols = generate_fnols(400, severity_mix={"Low": 0.75, "High": 0.25}, seed=3)
+    assert fnols == generate_fnols(400, severity_mix={"Low": 0.75, "High": 0.25}, seed=3)
+    assert fnols != generate_fnols(400, severity_mix={"Low": 0.75, "High": 0.25}, seed=4)
+    severities = Counter(item["severity"] for item in fnols)
+    assert set(severities) == {"Low", "High"}
+    assert 0.65 < severities["Low"] / len(fnols) < 0.85
+    assert all(item["fnol"].startswith(f"Claim ID: {item['id']}\n") for item in fnols)
+
+
+def test_duplicates_point_to_an_earlier_claim():
+    fnols = generate_fnols(200, seed=1, duplicate_rate=0.2)
+    ids = [item["id"] for item in fnols]
+    duplicates = [item for item in fnols if "duplicate_of" in item]
+    assert 20 < len(duplicates) < 60
+    for item in duplicates:
+        assert ids.index(item["duplicate_of"]) < ids.index(item["id"])
+        assert item["fnol"].startswith("CLAIM ID:")
+
+
+def test_run_level_counts_every_claim(mock_llm):
+    mock_llm()
+    fnols = generate_fnols(6, seed=2)
+    result = run_level(build_graph().compile(), fnols, concurrency=3, model="gpt-4.1-nano")
+
+    assert result["claims"] == 6 and result["completed"] == 6 and result["failed"] == 0
+    assert result["latency"]["end_to_end"]["count"] == 6
+    assert result["latency"]["assess_severity"]["count"] == 6
+    assert result["gate_failure_rate"]["assess_severity"] == 0.0
@@ -0,0 +1,38 @@
+"""Tests for the per-node model cascade"""
+
+import pytest
+
+from src.cascade import CASCADE_MODEL, CascadePolicy, cascade_policy
+from src.instrumentation import PrometheusExporter
+
+
+def gate(model: str) -> str:
+    if model == "gpt-4.1-nano":
+        raise ValueError("Cost out of range")
+    return model
+
+
+def test_escalates_on_gate_rejection_and_reports_tiers():
+    policy = CascadePolicy({"assess_severity": ["gpt-4.1-nano", "gpt-4o-mini"]})
+    assert policy.run("assess_severity", CASCADE_MODEL, gate) == "gpt-4o-mini"
+
+    tiers = policy.report()["assess_severity"]["tiers"]
+    assert [(tier["model"], tier["resolved"], tier["rejected"]) for tier in tiers] == [
+        ("gpt-4.1-nano", 0, 1), ("gpt-4o-mini", 1, 0),
+    ]
+    assert ('claims_cascade_attempts_total{node="assess_severity",tier="0",model="gpt-4.1-nano",'
+            'outcome="rejected"} 1') in policy.prometheus_lines()
+
+
+def test_single_model_is_not_escalated():
+    policy = CascadePolicy()
+    with pytest.raises(ValueError):
+        policy.run("route_claim", "gpt-4.1-nano", gate)
+    assert policy.report()["route_claim"]["unresolved"] == 1
+
+
+def test_shared_policy_is_in_the_metrics_file(tmp_path):
+    cascade_policy.reset_stats()
+    cascade_policy.run("extract_claim", CASCADE_MODEL, gate)
+    rendered = PrometheusExporter(str(tmp_path / "metrics.prom")).render()
+    assert 'claims_cascade_unresolved_total{node="extract_claim"} 0' in rendered
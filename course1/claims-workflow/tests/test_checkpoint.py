@@ -0,0 +1,108 @@
+"""Tests for the SQLite checkpointer and per-claim resume"""
+
+import json
+from collections import Counter
+
+import pytest
+
+from src.agents.claims_processor import build_graph
+from src.benchmark import COST_RANGES, FakeClaimsLLM, generate_fnols
+from src.checkpoint import SQLiteCheckpointSaver, claim_config, failed_node, process_claim_durable, resume_claim
+
+FNOL = generate_fnols(1, severity_mix={"Medium": 1.0}, seed=2)[0]["fnol"]
+
+
+class CountingLLM(FakeClaimsLLM):
+    """Fake claims LLM that counts calls per stage and can fail the first severity answers"""
+
+    def __init__(self, failing_severity: int = 0):
+        super().__init__(0.0)
+        self.calls = Counter()
+        self.failing_severity = failing_severity
+
+    def __call__(self, payload):
+        system = next((m["content"] for m in payload["messages"] if m["role"] == "system"), "")
+        stage = next((name for name, prefix in self.stages if system.startswith(prefix)), None)
+        self.calls[stage] += 1
+        if stage == "severity" and self.failing_severity:
+            self.failing_severity -= 1
+            return json.dumps({"severity": "Medium", "est_cost": COST_RANGES["High"][1], "reasoning": "Guess"})
+        return super().__call__(payload)
+
+
+@pytest.fixture
+def saver(tmp_path):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.db"), batch_size=1000, flush_interval=60)
+    yield saver
+    saver.close()
+
+
+def test_failed_node_is_the_first_missing_stage():
+    assert failed_node({}) == "extract_claim"
+    assert failed_node({"claim_info": object()}) == "assess_severity"
+    assert failed_node({"claim_info": object(), "severity": object()}) == "route_claim"
+    assert failed_node({"claim_info": object(), "severity": object(), "routing": object()}) is None
+
+
+def test_saver_buffers_rows_and_flushes_before_reads(tmp_path, saver, mock_llm):
+    mock_llm()
+    app = build_graph().compile(checkpointer=saver)
+    app.invoke({"fnol": FNOL, "model": "gpt-4.1-nano", "errors": [], "status": "processing"}, claim_config("C1"))
+    assert saver._buffered_rows > 0
+
+    assert saver.get_tuple(claim_config("C1")).checkpoint["channel_values"]["status"] == "completed"
+    assert saver._buffered_rows == 0
+    history = list(saver.list(claim_config("C1")))
+    assert len(history) > 3
+    assert [item.config["configurable"]["checkpoint_id"] for item in history] == sorted(
+        (item.config["configurable"]["checkpoint_id"] for item in history), reverse=True)
+    assert len(list(saver.list(claim_config("C1"), limit=2))) == 2
+
+    saver.close()
+    with SQLiteCheckpointSaver(str(tmp_path / "checkpoints.db")) as reopened:
+        assert reopened.get_tuple(claim_config("C1")) is not None
+        reopened.delete_thread("C1")
+        assert reopened.get_tuple(claim_config("C1")) is None
+        assert list(reopened.list(claim_config("C1"))) == []
+
+
+def test_resume_after_a_crash_reruns_only_the_pending_nodes(saver, mock_llm):
+    llm = CountingLLM()
+    mock_llm(responder=llm)
+    crashed = build_graph().compile(checkpointer=saver, interrupt_after=["extract_claim"])
+    crashed.invoke({"fnol": FNOL, "model": "gpt-4.1-nano", "errors": [], "status": "processing"}, claim_config("C2"))
+    extract_calls = llm.calls["extract"] + llm.calls["partial"]
+
+    final = resume_claim(build_graph().compile(checkpointer=saver), "C2")
+    assert final["status"] == "completed" and final["routing"].queue == "manual"
+    assert llm.calls["extract"] + llm.calls["partial"] == extract_calls
+    assert llm.calls["severity"] == 1
+
+
+def test_resume_of_a_failed_node_keeps_earlier_stages_and_clears_errors(saver, mock_llm):
+    llm = CountingLLM(failing_severity=1)
+    mock_llm(responder=llm)
+    app = build_graph().compile(checkpointer=saver)
+    failed = process_claim_durable(app, "C3", FNOL)
+    assert failed["status"] == "failed" and failed["errors"][0].startswith("Severity error")
+    extract_calls = llm.calls["extract"] + llm.calls["partial"]
+
+    final = resume_claim(app, "C3")
+    assert final["status"] == "completed"
+    assert final["errors"] == []
+    assert final["claim_info"] == failed["claim_info"]
+    assert llm.calls["extract"] + llm.calls["partial"] == extract_calls
+    assert llm.calls["severity"] == 2
+
+
+def test_completed_claim_is_a_no_op(saver, mock_llm):
+    llm = CountingLLM()
+    mock_llm(responder=llm)
+    app = build_graph().compile(checkpointer=saver)
+    first = process_claim_durable(app, "C4", FNOL)
+    calls = sum(llm.calls.values())
+
+    assert process_claim_durable(app, "C4", FNOL) == first
+    assert resume_claim(app, "C4") == first
+    assert resume_claim(app, "unknown") is None
+    assert sum(llm.calls.values()) == calls
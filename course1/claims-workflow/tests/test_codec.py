@@ -0,0 +1,77 @@
+"""Tests for the compact checkpoint codec"""
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from src.checkpoint import SQLiteCheckpointSaver
+from src.codec import CODEC_TYPE, ClaimStateSerializer, MemoryTextStore, text_key
+from src.state import ClaimInformation, ClaimRouting, SeverityAssessment
+
+FNOL = "Claim ID: C000001\nCustomer: Ana Diaz\nPolicy: POL-123456\n" + "Rear-ended at a red light. " * 10
+
+STATE = {
+    "fnol": FNOL,
+    "model": "gpt-4.1-nano",
+    "claim_info": ClaimInformation(
+        claim_id="C000001", policy_number="POL-123456", claimant_name="Ana Diaz", incident_date="2024-05-01",
+        incident_type="collision", damage_description="Rear bumper dented", location="Madrid",
+    ),
+    "severity": SeverityAssessment(severity="Low", est_cost=450.0, reasoning="Minor damage"),
+    "routing": ClaimRouting(queue="auto", priority="low", reasoning="Low severity claim"),
+    "errors": ["Severity error: Cost out of range", "Routing error: timeout", "Load shed: low lane"],
+    "status": "completed",
+    "enqueued_at": 1715000000.5,
+    "duplicate_of": None,
+}
+
+
+def roundtrip(serde: ClaimStateSerializer, value):
+    data = serde.dumps_typed(value)
+    return data, serde.loads_typed(data)
+
+
+def test_state_roundtrip():
+    serde = ClaimStateSerializer()
+    data, loaded = roundtrip(serde, STATE)
+    assert data[0] == CODEC_TYPE
+    assert loaded == STATE
+    assert isinstance(loaded["severity"], SeverityAssessment)
+
+
+def test_fnol_and_errors_are_stored_once():
+    store = MemoryTextStore()
+    serde = ClaimStateSerializer(text_store=store)
+    first, _ = roundtrip(serde, STATE)
+    size = store.size_bytes()
+    again, _ = roundtrip(serde, dict(STATE))
+    assert again == first
+    assert store.size_bytes() == size
+    assert store.get_text(text_key(FNOL)) == FNOL
+    assert FNOL.encode() not in first[1]
+
+
+def test_long_channel_string_is_stored_by_reference():
+    serde = ClaimStateSerializer(ref_min_length=16)
+    data, loaded = roundtrip(serde, FNOL)
+    assert data[0] == CODEC_TYPE and loaded == FNOL
+    assert serde.dumps_typed("short")[0] != CODEC_TYPE
+
+
+def test_other_values_use_the_default_serializer():
+    serde = ClaimStateSerializer()
+    for value in ({"source": "loop", "step": 3}, {}, 42, None, {"fnol": FNOL, "unknown_field": 1}):
+        data, loaded = roundtrip(serde, value)
+        assert data[0] != CODEC_TYPE
+        assert loaded == value
+
+
+def test_default_rows_still_load():
+    data = JsonPlusSerializer().dumps_typed({"status": "done"})
+    assert ClaimStateSerializer().loads_typed(data) == {"status": "done"}
+
+
+def test_sqlite_saver_is_the_text_store(tmp_path):
+    with SQLiteCheckpointSaver(str(tmp_path / "checkpoints.db"), compact=True) as saver:
+        data = saver.serde.dumps_typed(STATE)
+        saver.flush()
+        assert saver.serde.loads_typed(data) == STATE
+        assert saver.get_text(text_key(FNOL)) == FNOL
@@ -0,0 +1,76 @@
+"""Tests for near-duplicate FNOL detection"""
+
+import pytest
+
+from src.benchmark import generate_fnols
+from src.dedup import DedupIndex, hamming, normalize_fnol, simhash
+
+FNOL = "Claim ID: C000001\nCustomer: Ana Diaz\nPolicy: POL-123456\nIncident: Rear-ended at a red light, bumper dented."
+
+
+def test_normalized_text_ignores_formatting():
+    assert normalize_fnol("Claim ID:  C1\n\nCUSTOMER: Ana") == normalize_fnol("claim id: c1 customer: ana")
+
+
+def test_exact_resubmission_reuses_the_recorded_result():
+    index = DedupIndex()
+    first = index.check(FNOL)
+    assert not first.duplicate
+    index.record(first.key, {"status": "completed"})
+
+    again = index.check(FNOL.upper().replace(": ", ":  "))
+    assert again.duplicate and again.distance == 0
+    assert again.original.result == {"status": "completed"}
+
+
+def test_near_duplicate_with_other_claim_id_is_vetoed():
+    index = DedupIndex(max_distance=15)
+    index.check(FNOL)
+    other = index.check(FNOL.replace("C000001", "C000002"))
+    assert not other.duplicate
+    assert index.stats()["identity_vetoes"] >= 1
+
+
+def test_duplicates_point_at_the_original_claim_id():
+    index = DedupIndex()
+    index.check(FNOL, claim_id="queue-42")
+    assert index.check(FNOL).original.claim_id == "queue-42"
+    other = DedupIndex()
+    other.check(FNOL)
+    assert other.check(FNOL).original.claim_id == "C000001"
+
+
+def test_forget_lets_a_failed_claim_be_processed_again():
+    index = DedupIndex()
+    index.forget(index.check(FNOL).key)
+    assert not index.check(FNOL).duplicate
+
+
+def test_invalid_max_distance():
+    with pytest.raises(ValueError):
+        DedupIndex(max_distance=16)
+
+
+def test_simhash_of_identical_texts_matches():
+    assert hamming(simhash(normalize_fnol(FNOL)), simhash(normalize_fnol(FNOL))) == 0
+
+
+def test_default_index_merges_no_distinct_generated_claims():
+    index = DedupIndex()
+    assert not any(index.check(item["fnol"]).duplicate for item in generate_fnols(3000, seed=1))
+
+
+def test_default_index_finds_generated_resubmissions():
+    index = DedupIndex()
+    keys, chains = {}, {}
+    found = 0
+    for item in generate_fnols(500, seed=2, duplicate_rate=0.1):
+        # A resubmission may copy an earlier resubmission; any submission of the chain is a valid match
+        chains[item["id"]] = chains.get(item.get("duplicate_of"), set()) | {item["id"]}
+        match = index.check(item["fnol"])
+        if match.duplicate:
+            assert keys[match.original.key] in chains[item["id"]]
+            found += 1
+        else:
+            keys[match.key] = item["id"]
+    assert found > 0
@@ -0,0 +1,51 @@
+"""Tests for the gate cost range rules"""
+
+import math
+import random
+
+import pytest
+
+from src.gates import (
+    SEVERITIES, GateError, batch_cost_range_errors, cost_range_error, gate2_cost_range_ok,
+)
+
+np = pytest.importorskip("numpy")
+
+# Every range boundary, a step either side of it, and invalid costs
+EDGE_COSTS = sorted({edge + step for edge in (0, 100, 1000, 5000, 50000) for step in (-0.01, 0, 0.01)}) + [
+    -1.0, math.nan, math.inf,
+]
+
+
+def test_batch_matches_scalar_on_every_boundary():
+    severities = [severity for severity in (*SEVERITIES, "Critical", "") for _ in EDGE_COSTS]
+    costs = EDGE_COSTS * (len(SEVERITIES) + 2)
+    expected = [cost_range_error(severity, cost) for severity, cost in zip(severities, costs)]
+    assert batch_cost_range_errors(severities, costs).tolist() == expected
+
+
+def test_batch_matches_scalar_on_random_rows():
+    rng = random.Random(0)
+    severities = [rng.choice((*SEVERITIES, "Unknown")) for _ in range(5000)]
+    costs = [rng.choice((rng.uniform(0, 60000), float(rng.choice((100, 1000, 5000, 50000))), math.nan))
+             for _ in range(5000)]
+    expected = [cost_range_error(severity, cost) for severity, cost in zip(severities, costs)]
+    assert batch_cost_range_errors(np.array(severities), np.array(costs)).tolist() == expected
+
+
+def test_batch_accepts_severity_codes():
+    codes = np.array([0, 1, 2, 3, -1])
+    errors = batch_cost_range_errors(codes, [500.0, 500.0, 10000.0, 500.0, 500.0])
+    assert errors.tolist() == [GateError.OK, GateError.COST_BELOW_RANGE, GateError.OK,
+                               GateError.UNKNOWN_SEVERITY, GateError.UNKNOWN_SEVERITY]
+
+
+def test_batch_rejects_mismatched_lengths():
+    with pytest.raises(ValueError):
+        batch_cost_range_errors(["Low", "High"], [500.0])
+
+
+def test_gate2_uses_the_same_rules():
+    assert gate2_cost_range_ok('{"severity": "Low", "est_cost": 100, "reasoning": "chip"}').est_cost == 100
+    with pytest.raises(ValueError):
+        gate2_cost_range_ok('{"severity": "Medium", "est_cost": 1000, "reasoning": "dent"}')
@@ -0,0 +1,78 @@
+"""Graph-level tests of the claims workflow against the mock LLM"""
+
+import json
+import re
+from collections import Counter
+
+from src.agents.claims_processor import build_graph
+from src.benchmark import FakeClaimsLLM, generate_fnols
+
+
+def run(graph, fnol: str, model: str = "gpt-4.1-nano") -> dict:
+    return graph.compile().invoke({"fnol": fnol, "model": model, "errors": [], "status": "processing"})
+
+
+def low_claim() -> str:
+    return generate_fnols(1, severity_mix={"Low": 1.0}, seed=5)[0]["fnol"]
+
+
+class StageLLM(FakeClaimsLLM):
+    """Fake claims LLM that counts calls per stage and lets a test rewrite the fused answer"""
+
+    def __init__(self, rewrite_fused=None):
+        super().__init__(0.0)
+        self.calls = Counter()
+        self.rewrite_fused = rewrite_fused
+
+    def __call__(self, payload):
+        system = next((m["content"] for m in payload["messages"] if m["role"] == "system"), "")
+        stage = next((name for name, prefix in self.stages if system.startswith(prefix)), None)
+        self.calls[stage] += 1
+        answer = super().__call__(payload)
+        if stage == "fused" and self.rewrite_fused:
+            return self.rewrite_fused(json.loads(answer))
+        return answer
+
+
+def test_fused_fallback_keeps_accepted_parts(mock_llm):
+    def out_of_range_severity(answer):
+        answer["severity"] = {"severity": "Low", "est_cost": 5000.0, "reasoning": "Guess"}
+        return json.dumps(answer)
+
+    llm = StageLLM(out_of_range_severity)
+    mock_llm(responder=llm)
+    final = run(build_graph(fused=True), low_claim())
+
+    assert final["status"] == "completed"
+    assert final["severity"].severity == "Low" and final["severity"].est_cost < 1000
+    assert final["claim_info"].claim_id == re.search(r"Claim ID: (\S+)", low_claim()).group(1)
+    # Resumes at assess_severity: claim_info comes from the fused call, routing from the rules
+    assert llm.calls == Counter({"fused": 1, "severity": 1})
+
+
+def test_failed_fused_call_runs_the_three_stage_graph(mock_llm):
+    llm = StageLLM(lambda answer: "not json")
+    mock_llm(responder=llm)
+    final, staged = run(build_graph(fused=True), low_claim()), run(build_graph(), low_claim())
+
+    assert final["status"] == "completed"
+    assert final["claim_info"] == staged["claim_info"]
+    assert final["routing"].queue == staged["routing"].queue
+    assert llm.calls["fused"] == 1
+    assert llm.calls["severity"] == 2
+
+
+def test_fused_graph_routes_with_the_rule_table(mock_llm):
+    fake = FakeClaimsLLM(0.0)
+
+    def wrong_fused_routing(payload):
+        answer = json.loads(fake(payload) or "{}")
+        if "routing" in answer:
+            answer["routing"] = {"queue": "specialist", "priority": "high", "reasoning": "LLM guess"}
+        return json.dumps(answer)
+
+    mock_llm(responder=wrong_fused_routing)
+    fused, staged = run(build_graph(fused=True), low_claim()), run(build_graph(), low_claim())
+    assert fused["status"] == staged["status"] == "completed"
+    assert fused["routing"].queue == staged["routing"].queue == "auto"
+    assert "low_severity" in fused["routing"].reasoning
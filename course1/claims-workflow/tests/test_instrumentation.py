@@ -0,0 +1,136 @@
+"""Tests for the node instrumentation and its exporters"""
+
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src import instrumentation
+from src.instrumentation import (
+    NodeSpan, PrometheusExporter, SpanLogExporter, current_usage, instrument, record_retry, record_usage,
+)
+
+
+class SpanCollector:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def flush(self):
+        pass
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    collector = SpanCollector()
+    monkeypatch.setattr(instrumentation, "_exporters", [collector])
+    return collector.spans
+
+
+def usage(prompt: int, completion: int) -> SimpleNamespace:
+    return SimpleNamespace(usage=SimpleNamespace(prompt_tokens=prompt, completion_tokens=completion))
+
+
+def span(node="assess_severity", status="completed", gate="passed", duration=0.2, queue_wait=0.03) -> NodeSpan:
+    result = NodeSpan(node, "gpt-4.1-nano", "trace-1", queue_wait)
+    result.end = result.start + duration
+    result.status, result.gate = status, gate
+    result.prompt_tokens, result.completion_tokens, result.llm_calls = 120, 30, 1
+    return result
+
+
+#================================#
+# ----- Node Wrapper ----- #
+#================================#
+
+def test_tokens_and_retries_are_captured_per_node(spans):
+    def node(state):
+        record_usage(usage(100, 20))
+        record_retry()
+        record_usage(usage(90, 25))
+        assert current_usage() == (190, 45)
+        return {"status": "processing"}
+
+    update = instrument("extract_claim", node)({"model": "gpt-4.1-nano", "trace_id": "abc"})
+
+    assert update["status"] == "processing" and update["trace_id"] == "abc"
+    (measured,) = spans
+    assert (measured.prompt_tokens, measured.completion_tokens) == (190, 45)
+    assert (measured.llm_calls, measured.retries) == (2, 1)
+    assert (measured.node, measured.model, measured.trace_id) == ("extract_claim", "gpt-4.1-nano", "abc")
+    # Outside a node the helpers are no-ops
+    record_usage(usage(1, 1))
+    assert current_usage() == (0, 0)
+
+
+def test_queue_wait_runs_from_enqueue_then_from_the_previous_node(spans):
+    first = instrument("extract_claim", lambda state: {"status": "processing"})
+    second = instrument("assess_severity", lambda state: {"status": "failed", "errors": ["Severity gate"]})
+
+    update = first({"model": "m", "enqueued_at": time.time() - 2.0})
+    second({"model": "m", **update, "last_node_end": update["last_node_end"] - 0.5})
+
+    assert 2.0 <= spans[0].queue_wait < 2.5
+    assert 0.5 <= spans[1].queue_wait < 1.0
+    assert spans[1].trace_id == spans[0].trace_id
+    assert (spans[1].status, spans[1].gate) == ("failed", "rejected")
+
+
+def test_exporter_errors_do_not_fail_the_node(monkeypatch):
+    class BrokenExporter(SpanCollector):
+        def export(self, span):
+            raise OSError("disk full")
+
+    monkeypatch.setattr(instrumentation, "_exporters", [BrokenExporter()])
+    assert instrument("route_claim", lambda state: {"status": "completed"})({})["status"] == "completed"
+
+
+#================================#
+# ----- Exporters ----- #
+#================================#
+
+def test_prometheus_text_format(tmp_path, monkeypatch):
+    monkeypatch.setattr(instrumentation, "_collectors", [lambda: ["claims_extra_gauge 1"]])
+    exporter = PrometheusExporter(str(tmp_path / "claims.prom"), flush_interval=3600)
+    exporter.export(span(duration=0.2))
+    exporter.export(span(status="failed", gate="rejected", duration=0.02))
+    exporter.flush()
+    lines = (tmp_path / "claims.prom").read_text().splitlines()
+
+    assert "# TYPE claims_node_calls_total counter" in lines
+    assert "# TYPE claims_node_duration_seconds histogram" in lines
+    labels = 'node="assess_severity",model="gpt-4.1-nano"'
+    assert f'claims_node_calls_total{{{labels},status="completed",gate="passed"}} 1' in lines
+    assert f'claims_node_calls_total{{{labels},status="failed",gate="rejected"}} 1' in lines
+    assert f'claims_node_tokens_total{{{labels},kind="prompt"}} 240' in lines
+    assert f'claims_node_tokens_total{{{labels},kind="completion"}} 60' in lines
+    # Buckets are cumulative: 0.2s falls in le=0.25, 0.02s in le=0.025
+    completed = f'claims_node_duration_seconds_bucket{{{labels},status="completed"'
+    assert f'{completed},le="0.1"}} 0' in lines and f'{completed},le="0.25"}} 1' in lines
+    assert f'{completed},le="+Inf"}} 1' in lines
+    assert f'claims_node_queue_wait_seconds_bucket{{{labels},le="0.05"}} 2' in lines
+    assert f'claims_node_queue_wait_seconds_count{{{labels}}} 2' in lines
+    assert f'claims_node_queue_wait_seconds_sum{{{labels}}} 0.060000' in lines
+    assert lines[-1] == "claims_extra_gauge 1"
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_span_log_is_otlp_json(tmp_path):
+    exporter = SpanLogExporter(str(tmp_path / "spans.jsonl"))
+    exporter.export(span())
+    exporter.export(span(node="route_claim", status="failed", gate="error"))
+    records = [json.loads(line) for line in (tmp_path / "spans.jsonl").read_text().splitlines()]
+
+    first, second = records
+    assert first["traceId"] == second["traceId"] == "trace-1"
+    assert first["name"] == "assess_severity" and first["kind"] == "SPAN_KIND_INTERNAL"
+    assert int(first["endTimeUnixNano"]) - int(first["startTimeUnixNano"]) == pytest.approx(0.2e9, rel=1e-3)
+    attributes = {item["key"]: item["value"] for item in first["attributes"]}
+    assert attributes["gen_ai.usage.input_tokens"] == {"intValue": "120"}
+    assert attributes["claims.queue_wait_s"] == {"doubleValue": 0.03}
+    assert attributes["claims.gate"] == {"stringValue": "passed"}
+    assert first["status"]["code"] == "STATUS_CODE_OK"
+    assert second["status"]["code"] == "STATUS_CODE_ERROR"
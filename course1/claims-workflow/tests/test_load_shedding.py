@@ -0,0 +1,74 @@
+"""Tests for lane-aware load shedding of LLM calls"""
+
+import threading
+import time
+
+import pytest
+
+from src.instrumentation import _gate_outcome
+from src.load_shedding import LoadController, LoadShed, claim_lane
+
+
+@pytest.fixture
+def controller():
+    return LoadController(enabled=True, initial_limit=1, max_limit=1, max_wait=5.0)
+
+
+def hold_slot(controller: LoadController, lane: str = "urgent"):
+    """Take the only slot in a thread; returns the event that releases it."""
+    taken, release = threading.Event(), threading.Event()
+
+    def worker():
+        with claim_lane(lane), controller.slot():
+            taken.set()
+            release.wait(5)
+
+    threading.Thread(target=worker, daemon=True).start()
+    taken.wait(5)
+    return release
+
+
+def wait_for_slot(controller: LoadController, lane: str) -> threading.Thread:
+    """Start a call that queues for the slot; returns once it is waiting."""
+    def call():
+        with claim_lane(lane), controller.slot():
+            pass
+
+    waiter = threading.Thread(target=call, daemon=True)
+    waiter.start()
+    while not controller.stats()["waiting"][lane]:
+        time.sleep(0.001)
+    return waiter
+
+
+def test_low_lane_call_is_shed_while_higher_lanes_wait(controller):
+    release = hold_slot(controller)
+    waiter = wait_for_slot(controller, "high")
+    assert controller.pressure == "saturated"
+
+    with pytest.raises(LoadShed) as shed, claim_lane("low"), controller.slot():
+        pass
+    assert shed.value.lane == "low"
+    assert controller.stats()["shed"]["low"] == 1
+
+    release.set()
+    waiter.join(5)
+    assert not waiter.is_alive()
+    assert controller.stats()["calls"] == 2
+
+
+def test_shed_lanes_are_deferred_only_under_pressure(controller):
+    assert not controller.should_defer("low")
+    release = hold_slot(controller)
+    waiter = wait_for_slot(controller, "high")
+    assert controller.should_defer("low") and not controller.should_defer("normal")
+    assert controller.stats()["deferred"]["low"] == 1
+    release.set()
+    waiter.join(5)
+
+
+def test_shed_calls_have_their_own_outcome_label():
+    assert _gate_outcome({"status": "failed", "errors": ["Severity error: Load shed: no LLM slot"]}) == "shed"
+    assert _gate_outcome({"status": "failed", "errors": ["Severity error: Cost out of range"]}) == "rejected"
+    assert _gate_outcome({"status": "failed", "errors": ["Routing error: OpenAI API error: 500"]}) == "error"
+    assert _gate_outcome({"status": "severity_assessed"}) == "passed"
@@ -0,0 +1,98 @@
+"""Tests for the load-test client's stream parsing and report statistics"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from load_test import build_report, iter_sse, percentile, run_claim, summarize
+
+
+class FakeResponse:
+    def __init__(self, lines=(), body=None):
+        self.lines, self.body = list(lines), body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+    def iter_lines(self, decode_unicode=False):
+        return iter(self.lines)
+
+
+class FakeSession:
+    """Answers the thread creation and the run stream of one claim."""
+
+    def __init__(self, stream_lines):
+        self.stream_lines = stream_lines
+
+    def post(self, url, json=None, stream=False, timeout=None):
+        if url.endswith("/threads"):
+            return FakeResponse(body={"thread_id": "t-1"})
+        return FakeResponse(self.stream_lines)
+
+
+def test_iter_sse_groups_multiline_data_per_event():
+    lines = ["event: metadata", 'data: {"run_id": "r"}', "", ": keep-alive", "",
+             "event: values", 'data: {"a":', "data: 1}", "", 'data: {"b": 2}']
+    assert list(iter_sse(FakeResponse(lines))) == [
+        ("metadata", '{"run_id": "r"}'), ("values", '{"a":\n1}'), ("message", '{"b": 2}'),
+    ]
+
+
+def test_run_claim_times_the_stream_and_reports_workflow_errors():
+    lines = ["event: metadata", 'data: {"run_id": "r"}', "",
+             "event: values", f"data: {json.dumps({'status': 'processing'})}", "",
+             "event: values", f"data: {json.dumps({'status': 'failed', 'errors': ['Severity gate: cost']})}", ""]
+    result = run_claim(FakeSession(lines), "http://server", "claims_processor", "FNOL", "m", timeout=5)
+
+    assert result["status"] == "failed"
+    assert result["error"] == "workflow error: Severity gate: cost"
+    assert 0 <= result["thread_created"] <= result["run_started"] <= result["first_values"] <= result["end_to_end"]
+
+
+@pytest.mark.parametrize("pct, expected", [(10, 1), (50, 5), (90, 9), (99, 10)])
+def test_percentile_is_nearest_rank(pct, expected):
+    assert percentile(list(range(1, 11)), pct) == expected
+
+
+def test_summarize_histogram_buckets():
+    summary = summarize([0.05, 0.1, 0.3, 0.3, 70.0])
+    assert summary["count"] == 5
+    assert summary["p50_ms"] == 300.0 and summary["max_ms"] == 70000.0
+    histogram = summary["histogram"]
+    assert histogram["0-0.1s"] == 1 and histogram["0.1-0.25s"] == 1 and histogram["0.25-0.5s"] == 2
+    assert histogram[">=60s"] == 1
+    assert sum(histogram.values()) == 5
+    assert summarize([]) == {"count": 0}
+
+
+def test_report_separates_errors_and_server_queueing():
+    args = SimpleNamespace(url="http://server", assistant="claims_processor", model="m", mode="closed",
+                           users=2, rps=None, arrivals=None, duration=10, requests=None, seed=0)
+    results = [
+        {"error": None, "status": "completed", "thread_created": 0.1, "run_started": 0.4,
+         "first_event": 0.4, "first_values": 0.5, "end_to_end": 2.0, "client_lag": 0.0},
+        {"error": None, "status": "completed", "thread_created": 0.2, "run_started": 0.3,
+         "first_event": 0.3, "first_values": 0.4, "end_to_end": 1.0, "client_lag": 0.0},
+        {"error": "ReadTimeout: timed out", "status": None, "thread_created": 0.1, "end_to_end": 5.0,
+         "client_lag": 0.0},
+    ]
+    report = build_report(args, results, wall_time=4.0)
+
+    totals = report["totals"]
+    assert (totals["runs"], totals["ok"], totals["errors"]) == (3, 2, 1)
+    assert totals["errors_by_type"] == {"ReadTimeout": 1} and totals["statuses"] == {"completed": 2}
+    assert totals["throughput_rps"] == 0.5
+    assert report["latency"]["end_to_end"]["count"] == 2
+    assert report["latency"]["thread_create"]["count"] == 3
+    assert report["latency"]["server_queueing"]["p99_ms"] == 300.0
+    assert report["config"]["users"] == 2 and report["config"]["rps"] is None
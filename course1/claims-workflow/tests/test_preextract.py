@@ -0,0 +1,72 @@
+"""Tests for the local FNOL header pre-extraction"""
+
+import pytest
+
+from src.preextract import normalize_date, preextract, preextract_batch
+
+
+def test_single_fnol_headers_and_residual():
+    result = preextract("Claim ID: C001\nPolicy Number: P-1\nCustomer: Ana Diaz\nRear-ended at a light.")
+    assert result["fields"] == {"claim_id": "C001", "policy_number": "P-1", "claimant_name": "Ana Diaz"}
+    assert "claim_id" not in result["missing"]
+    assert result["residual"] == "Rear-ended at a light."
+
+
+def test_batch_values_do_not_bleed_across_fnols():
+    results = preextract_batch([
+        "Claim ID: C001\nLocation: Main St",
+        "Claim ID: C002\nPolicy: P-2\nHit a pole.",
+    ])
+    assert results[0]["fields"] == {"claim_id": "C001", "location": "Main St"}
+    assert results[1]["fields"] == {"claim_id": "C002", "policy_number": "P-2"}
+    assert results[1]["residual"] == "Hit a pole."
+
+
+def test_batch_label_split_across_boundary_is_ignored():
+    results = preextract_batch(["Incident", "Date: 2024-05-01\nHail damage."])
+    assert results[0]["fields"] == {}
+    assert results[1]["fields"] == {"incident_date": "2024-05-01"}
+
+
+def test_batch_matches_single_fnol_results():
+    fnols = [
+        "Claim ID: C00%d\nCustomer: Name %d\nDate: 2024-01-0%d\nDamage: dent" % (i, i, i) for i in range(1, 6)
+    ]
+    assert preextract_batch(fnols) == [preextract(fnol) for fnol in fnols]
+
+
+def test_generic_labels_only_count_in_the_header_block():
+    fnol = ("Claim ID: C001\nVehicle: Seat Ibiza\nName: Ana Diaz\nDate: 2024-05-01\n"
+            "The other driver stopped.\nName: John, he said\nDamage: none to his car\nDate: unknown")
+    result = preextract(fnol)
+    assert result["fields"] == {"claim_id": "C001", "claimant_name": "Ana Diaz", "incident_date": "2024-05-01"}
+    assert "damage_description" in result["missing"]
+    assert "Damage: none to his car" in result["residual"]
+
+    narrative = preextract("Rear-ended on the ring road.\nDamage: rear bumper\nDate of loss: 2024-05-01")
+    assert narrative["fields"] == {"incident_date": "2024-05-01"}
+
+
+def test_dates_are_normalized_or_left_to_the_llm():
+    result = preextract("Claim ID: C001\nIncident Date: May 3, 2024\nHail.")
+    assert result["fields"]["incident_date"] == "2024-05-03"
+
+    ambiguous = preextract("Claim ID: C001\nDate of loss: 03/04/2024\nHail.")
+    assert "incident_date" in ambiguous["missing"]
+    assert "03/04/2024" in ambiguous["residual"]
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2024-05-01", "2024-05-01"),
+    ("2024/5/1 14:30", "2024-05-01"),
+    ("1 May 2024", "2024-05-01"),
+    ("Sep 9, 2024", "2024-09-09"),
+    ("25/12/2024", "2024-12-25"),
+    ("12/25/2024", "2024-12-25"),
+    ("05/05/2024", "2024-05-05"),
+    ("03/04/2024", None),
+    ("2024-02-31", None),
+    ("last Tuesday", None),
+])
+def test_normalize_date(value, expected):
+    assert normalize_date(value) == expected
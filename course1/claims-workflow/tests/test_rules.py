@@ -0,0 +1,65 @@
+"""Tests for the routing rule engine"""
+
+import pytest
+
+from src.instrumentation import PrometheusExporter
+from src.rules import RuleEngine, mentions_any, routing_engine
+from src.state import ClaimInformation, SeverityAssessment
+from src.work_queue import initial_lane
+
+CLAIM = ClaimInformation(
+    claim_id="C000001", policy_number="POL-123456", claimant_name="Ana Diaz", incident_date="2024-05-01",
+    incident_type="collision", damage_description="Rear bumper dented", location="Madrid",
+)
+
+
+def test_rules_decide_locally_and_count_hits():
+    engine = RuleEngine()
+    decision = engine.evaluate(CLAIM, SeverityAssessment(severity="Low", est_cost=400.0, reasoning="Minor"))
+    assert decision.rule == "low_severity" and decision.routing.queue == "auto"
+
+    unknown = CLAIM.model_copy(update={"incident_type": "Unknown", "damage_description": ""})
+    assert engine.evaluate(unknown, SeverityAssessment(severity="Low", est_cost=400.0, reasoning="Minor")).ambiguous
+
+    stats = engine.stats()
+    assert stats["decided_locally"] == 1 and stats["llm_escalations"] == 1
+    assert 'claims_routing_decisions_total{decided_by="llm"} 1' in engine.prometheus_lines()
+
+
+def test_shared_engine_is_in_the_metrics_file(tmp_path):
+    routing_engine.reset_stats()
+    routing_engine.evaluate(CLAIM, SeverityAssessment(severity="Medium", est_cost=2000.0, reasoning="Dent"))
+    rendered = PrometheusExporter(str(tmp_path / "metrics.prom")).render()
+    assert 'claims_routing_rule_hits_total{rule="medium_severity"} 1' in rendered
+
+
+@pytest.mark.parametrize("damage", [
+    "Rear-ended at low speed, no injuries, airbags did not deploy",
+    "No injuries reported. Bumper cracked",
+    "Nobody was injured; scratched door",
+    "Driver uninjured, airbags didn't deploy",
+    "Injuries: none. Dent in the hospitality van door",
+])
+def test_negated_safety_mentions_do_not_escalate(damage):
+    claim = CLAIM.model_copy(update={"damage_description": damage})
+    decision = RuleEngine().evaluate(claim, SeverityAssessment(severity="Low", est_cost=300.0, reasoning="Minor"))
+    assert decision.rule == "low_severity" and decision.routing.queue == "auto"
+    assert initial_lane(f"Incident: collision\n{damage}") != "high"
+
+
+@pytest.mark.parametrize("damage", [
+    "Airbags deployed, driver not injured",
+    "Passenger injured, no ambulance needed",
+    "Vehicle is not drivable after the crash",
+    "Driver hospitalized overnight",
+])
+def test_safety_mentions_escalate(damage):
+    claim = CLAIM.model_copy(update={"damage_description": damage})
+    decision = RuleEngine().evaluate(claim, SeverityAssessment(severity="Low", est_cost=300.0, reasoning="Minor"))
+    assert decision.rule == "injury_or_safety" and decision.routing.queue == "specialist"
+    assert initial_lane(damage) == "high"
+
+
+def test_keywords_match_whole_words():
+    assert mentions_any("House fire in the garage", ["fire"])
+    assert not mentions_any("Campfire smoke stained the paint", ["fire"])
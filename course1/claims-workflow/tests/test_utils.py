@@ -0,0 +1,67 @@
+"""Tests for the completion helper's structured-output fallback"""
+
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import BadRequestError
+from pydantic import BaseModel
+
+from src import utils
+
+
+class Answer(BaseModel):
+    value: int
+
+
+def bad_request(message: str, param=None, code=None) -> BadRequestError:
+    response = httpx.Response(400, request=httpx.Request("POST", "http://test/v1/chat/completions"))
+    return BadRequestError(message, response=response, body={"message": message, "param": param, "code": code})
+
+
+class FakeCompletions:
+    def __init__(self, error: BadRequestError):
+        self.error = error
+        self.calls = []
+
+    def create(self, **request):
+        self.calls.append(request)
+        if "response_format" in request:
+            raise self.error
+        message = SimpleNamespace(content='{"value": 1}', refusal=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+@pytest.fixture
+def completions(monkeypatch):
+    def install(error):
+        fake = FakeCompletions(error)
+        monkeypatch.setattr(utils, "client", SimpleNamespace(chat=SimpleNamespace(completions=fake)))
+        monkeypatch.setattr(utils, "_NO_STRUCTURED_OUTPUTS", set())
+        return fake
+    return install
+
+
+def test_schema_rejection_falls_back_to_local_extraction(completions):
+    fake = completions(bad_request("Invalid schema for response_format 'Answer'", param="response_format"))
+    assert utils.get_completion(user_prompt="q", model="m", response_model=Answer) == Answer(value=1)
+    assert "m" in utils._NO_STRUCTURED_OUTPUTS
+    assert len(fake.calls) == 2
+
+
+def test_other_bad_requests_are_raised_and_keep_structured_outputs(completions):
+    completions(bad_request("This model's maximum context length is 8192 tokens", code="context_length_exceeded"))
+    with pytest.raises(RuntimeError, match="maximum context length"):
+        utils.get_completion(user_prompt="q", model="m", response_model=Answer)
+    assert "m" not in utils._NO_STRUCTURED_OUTPUTS
+
+
+@pytest.mark.parametrize("error, expected", [
+    (bad_request("bad", param="response_format.json_schema"), True),
+    (bad_request("'json_schema' is not supported with this model."), True),
+    (bad_request("Your request was rejected by the content filter", code="content_filter"), False),
+    (bad_request("Invalid schema for function 'lookup': 'type' is required",
+                 param="tools[0].function.parameters"), False),
+])
+def test_rejects_structured_outputs(error, expected):
+    assert utils.rejects_structured_outputs(error) is expected
@@ -0,0 +1,156 @@
+"""Tests for the claims work queue leases and the worker pool legs"""
+
+import time
+
+import pytest
+
+from src.benchmark import generate_fnols
+from src.work_queue import Backpressure, ClaimsQueue, WorkerPool
+
+FNOL = "Claim ID: C001\nCustomer: Ana Diaz\nIncident: Rear-ended at a light, bumper dented."
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = ClaimsQueue(str(tmp_path / "queue.db"), visibility_timeout=0.2, max_attempts=2)
+    yield queue
+    queue.close()
+
+
+def test_lease_serves_most_urgent_lane_first(queue):
+    queue.enqueue(FNOL, claim_id="low", lane="low")
+    queue.enqueue(FNOL, claim_id="urgent", lane="urgent")
+    assert queue.lease("w1")["claim_id"] == "urgent"
+    assert queue.lease("w1")["claim_id"] == "low"
+    assert queue.lease("w1") is None
+
+
+def test_enqueue_is_idempotent_per_claim_id(queue):
+    queue.enqueue(FNOL, claim_id="C001")
+    assert queue.enqueue(FNOL, claim_id="C001")["status"] == "queued"
+    assert queue.stats()["status"] == {"queued": 1}
+
+
+def test_backpressure_over_depth_limit(tmp_path):
+    queue = ClaimsQueue(str(tmp_path / "queue.db"), max_depth=1)
+    queue.enqueue(FNOL, claim_id="a")
+    with pytest.raises(Backpressure):
+        queue.enqueue(FNOL, claim_id="b")
+    queue.close()
+
+
+def test_expired_lease_is_leased_again_then_dead(queue):
+    queue.enqueue(FNOL, claim_id="C001")
+    assert queue.lease("w1")["attempts"] == 1
+    assert queue.lease("w2") is None
+    time.sleep(0.25)
+    assert queue.lease("w2")["attempts"] == 2
+    # The first worker lost its lease
+    assert not queue.complete("C001", "w1", "done", {})
+    time.sleep(0.25)
+    assert queue.lease("w3") is None
+    assert queue.get("C001")["status"] == "dead"
+
+
+def test_requeue_changes_lane_and_restarts_attempts(queue):
+    queue.enqueue(FNOL, claim_id="C001", lane="normal")
+    queue.lease("w1")
+    assert queue.requeue("C001", "w1", stage="routing", lane="high")
+    claim = queue.lease("w1")
+    assert (claim["lane"], claim["stage"], claim["attempts"]) == ("high", "routing", 1)
+
+
+def test_defer_hides_claim_without_using_an_attempt(queue):
+    queue.enqueue(FNOL, claim_id="C001")
+    queue.lease("w1")
+    assert queue.defer("C001", "w1", delay=0.1)
+    assert queue.lease("w1") is None
+    time.sleep(0.15)
+    assert queue.lease("w1")["attempts"] == 1
+
+
+def test_renew_only_by_lease_owner(queue):
+    queue.enqueue(FNOL, claim_id="C001")
+    queue.lease("w1")
+    assert not queue.renew("C001", "w2")
+    time.sleep(0.15)
+    assert queue.renew("C001", "w1")
+    time.sleep(0.15)
+    assert queue.lease("w2") is None
+
+
+#================================#
+# ----- Worker Pool ----- #
+#================================#
+
+def _process_until_settled(pool, queue, claim_id):
+    for _ in range(5):
+        claim = queue.lease("w1")
+        if claim is None:
+            break
+        pool.process(claim, "w1")
+    return queue.get(claim_id)
+
+
+@pytest.mark.parametrize("dedup", [False, True])
+def test_claim_runs_both_legs_to_done(queue, mock_llm, dedup):
+    mock_llm(gate_error_rate=0.0)
+    pool = WorkerPool(queue, dedup=dedup)
+    item = generate_fnols(1, seed=3)[0]
+    queue.enqueue(item["fnol"], claim_id=item["id"])
+    claim = queue.lease("w1")
+    pool.process(claim, "w1")
+    assert queue.get(item["id"])["stage"] == "routing"
+    row = _process_until_settled(pool, queue, item["id"])
+    pool.checkpointer.close()
+    assert row["status"] == "done"
+    assert row["result"]["routing"]["queue"] in ("auto", "manual", "specialist")
+
+
+@pytest.mark.parametrize("dedup", [False, True])
+def test_failed_severity_leg_completes_as_failed(queue, mock_llm, dedup):
+    mock_llm(gate_error_rate=1.0)
+    pool = WorkerPool(queue, dedup=dedup)
+    item = generate_fnols(1, seed=3)[0]
+    queue.enqueue(item["fnol"], claim_id=item["id"])
+    pool.process(queue.lease("w1"), "w1")
+    row = queue.get(item["id"])
+    pool.checkpointer.close()
+    assert row["status"] == "failed"
+    assert row["attempts"] == 1
+    assert "Severity error" in row["error"]
+
+
+def test_duplicate_of_a_claim_in_progress_waits_for_its_result(queue, mock_llm):
+    mock_llm(gate_error_rate=0.0)
+    pool = WorkerPool(queue, dedup=True, defer_delay=0.0)
+    item = generate_fnols(1, seed=3)[0]
+    queue.enqueue(item["fnol"], claim_id="original")
+    pool.process(queue.lease("w1"), "w1")
+    assert queue.get("original")["stage"] == "routing"
+
+    queue.enqueue(item["fnol"], claim_id="resubmitted")
+    pool.process(queue.lease("w1"), "w1")
+    row = queue.get("resubmitted")
+    assert row["status"] == "queued" and row["attempts"] == 0
+
+    for _ in range(6):
+        claim = queue.lease("w1")
+        if claim is None:
+            break
+        pool.process(claim, "w1")
+    pool.checkpointer.close()
+    original, duplicate = queue.get("original"), queue.get("resubmitted")
+    assert original["status"] == duplicate["status"] == "done"
+    assert duplicate["result"]["duplicate_of"] == "original"
+    assert duplicate["result"]["routing"] == original["result"]["routing"]
+
+
+def test_heartbeat_keeps_a_slow_leg_leased(queue):
+    pool = WorkerPool(queue, heartbeat_interval=0.05)
+    queue.enqueue(FNOL, claim_id="C001")
+    queue.lease("w1")
+    with pool._heartbeat("C001", "w1"):
+        time.sleep(0.5)
+        assert queue.lease("w2") is None
+    pool.checkpointer.close()
@@ -1,6 +1,7 @@
 # Import the OpenAI class for interfacing with OpenAI's API
 # This provides access to chat completions, embeddings, and other AI capabilities
 from openai import OpenAI
+import os
 import numpy as np
 import pandas as pd
 import re
@@ -143,26 +144,20 @@ class KnowledgeAugmentedPromptAgent:
         # Store the API key for OpenAI authentication
         self.openai_api_key = openai_api_key
 
-    def respond(self, input_text):
+    def build_system_prompt(self):
         """
-        Generate a response using the OpenAI API, grounded in provided knowledge.
-
-        Parameters:
-        input_text (str): The user's input query
+        Build the knowledge-grounded system prompt sent with every request.
 
         Returns:
-        str: The LLM's response based exclusively on the provided knowledge
+        str: The system prompt combining persona, knowledge and instructions
         """
-        # Create OpenAI client using the stored API key
-        client = OpenAI(api_key=self.openai_api_key)
-
         # CHAIN OF THOUGHT ENHANCEMENT: The system prompt implements a structured reasoning process:
         # 1. Read the question carefully
         # 2. Search the provided knowledge for relevant information
         # 3. Think step-by-step about how to answer using ONLY that knowledge
         # 4. Structure the answer clearly and cite the knowledge
         # 5. Do NOT use the model's own pre-trained knowledge
-        system_prompt = (
+        return (
             f"You are a {self.persona} knowledge-based assistant. Forget all previous context.\n\n"
             f"IMPORTANT: Use only the following knowledge to answer, do not use your own knowledge:\n\n"
             f"{self.knowledge}\n\n"
@@ -174,6 +169,21 @@ class KnowledgeAugmentedPromptAgent:
             f"- Answer the prompt based on this knowledge, not your own."
         )
 
+    def respond(self, input_text):
+        """
+        Generate a response using the OpenAI API, grounded in provided knowledge.
+
+        Parameters:
+        input_text (str): The user's input query
+
+        Returns:
+        str: The LLM's response based exclusively on the provided knowledge
+        """
+        # Create OpenAI client using the stored API key
+        client = OpenAI(api_key=self.openai_api_key)
+
+        system_prompt = self.build_system_prompt()
+
         # Call the OpenAI API with knowledge-grounded system prompt and user query
         response = client.chat.completions.create(
             model="gpt-3.5-turbo",
@@ -220,7 +230,7 @@ class RAGKnowledgePromptAgent:
         Returns:
         list: The embedding vector.
         """
-        client = OpenAI(base_url="https://openai.vocareum.com/v1", api_key=self.openai_api_key)
+        client = OpenAI(base_url=os.getenv("OPENAI_BASE_URL", "https://openai.vocareum.com/v1"), api_key=self.openai_api_key)
         response = client.embeddings.create(
             model="text-embedding-3-large",
             input=text,
@@ -313,7 +323,7 @@ class RAGKnowledgePromptAgent:
 
         best_chunk = df.loc[df['similarity'].idxmax(), 'text']
 
-        client = OpenAI(base_url="https://openai.vocareum.com/v1", api_key=self.openai_api_key)
+        client = OpenAI(base_url=os.getenv("OPENAI_BASE_URL", "https://openai.vocareum.com/v1"), api_key=self.openai_api_key)
         response = client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
@@ -358,6 +368,59 @@ class EvaluationAgent:
         self.worker_agent = worker_agent
         self.max_interactions = max_interactions
 
+    def build_eval_prompt(self, response_from_worker):
+        """
+        Build the prompt that asks the evaluator to judge a worker response.
+
+        Parameters:
+        response_from_worker (str): The worker agent's answer
+
+        Returns:
+        str: The evaluation prompt
+        """
+        return (
+            f"Think step-by-step: Compare each part of the following answer against the criteria.\n\n"
+            f"Answer: {response_from_worker}\n\n"
+            f"Criteria: {self.evaluation_criteria}\n\n"
+            f"Check if ALL criteria are met. Identify specific issues if any.\n"
+            f"Respond with 'Yes' or 'No' at the start, followed by the reason why it does or doesn't meet the criteria."
+        )
+
+    def build_instruction_prompt(self, evaluation):
+        """
+        Build the prompt that turns a negative evaluation into correction instructions.
+
+        Parameters:
+        evaluation (str): The evaluator's verdict
+
+        Returns:
+        str: The instruction prompt
+        """
+        return (
+            f"Identify the problems in the evaluation below, think about how to fix them, "
+            f"and provide concrete, actionable steps to correct the issues.\n\n"
+            f"Evaluation: {evaluation}"
+        )
+
+    def build_refinement_prompt(self, initial_prompt, response_from_worker, instructions):
+        """
+        Build the prompt that sends correction instructions back to the worker agent.
+
+        Parameters:
+        initial_prompt (str): The original user query
+        response_from_worker (str): The rejected answer
+        instructions (str): Correction instructions from the evaluator
+
+        Returns:
+        str: The refinement prompt for the next iteration
+        """
+        return (
+            f"The original prompt was: {initial_prompt}\n"
+            f"The response to that prompt was: {response_from_worker}\n"
+            f"It has been evaluated as incorrect.\n"
+            f"Make only these corrections, do not alter content validity: {instructions}"
+        )
+
     def evaluate(self, initial_prompt):
         """
         Execute the iterative refinement loop: generate → evaluate → refine → repeat.
@@ -393,13 +456,7 @@ class EvaluationAgent:
             # STEP 2: EVALUATION - Check response against criteria
             print(" Step 2: Evaluator agent judges the response")
             # CHAIN OF THOUGHT ENHANCEMENT: Evaluator thinks step-by-step about each criterion
-            eval_prompt = (
-                f"Think step-by-step: Compare each part of the following answer against the criteria.\n\n"
-                f"Answer: {response_from_worker}\n\n"
-                f"Criteria: {self.evaluation_criteria}\n\n"
-                f"Check if ALL criteria are met. Identify specific issues if any.\n"
-                f"Respond with 'Yes' or 'No' at the start, followed by the reason why it does or doesn't meet the criteria."
-            )
+            eval_prompt = self.build_eval_prompt(response_from_worker)
             response = client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[
@@ -425,11 +482,7 @@ class EvaluationAgent:
                 # STEP 4: CORRECTION GENERATION - Create specific fix instructions
                 print(" Step 4: Generate instructions to correct the response")
                 # CHAIN OF THOUGHT ENHANCEMENT: Think about problems → identify fixes → provide concrete steps
-                instruction_prompt = (
-                    f"Identify the problems in the evaluation below, think about how to fix them, "
-                    f"and provide concrete, actionable steps to correct the issues.\n\n"
-                    f"Evaluation: {evaluation}"
-                )
+                instruction_prompt = self.build_instruction_prompt(evaluation)
                 response = client.chat.completions.create(
                     model="gpt-3.5-turbo",
                     messages=[
@@ -443,12 +496,7 @@ class EvaluationAgent:
 
                 # STEP 5: FEEDBACK LOOP - Construct refinement prompt for worker agent
                 print(" Step 5: Send feedback to worker agent for refinement")
-                prompt_to_evaluate = (
-                    f"The original prompt was: {initial_prompt}\n"
-                    f"The response to that prompt was: {response_from_worker}\n"
-                    f"It has been evaluated as incorrect.\n"
-                    f"Make only these corrections, do not alter content validity: {instructions}"
-                )
+                prompt_to_evaluate = self.build_refinement_prompt(initial_prompt, response_from_worker, instructions)
 
         # If max iterations reached without approval, return best attempt with warning
         print(f"\n⚠️ Max iterations ({self.max_interactions}) reached without full approval.")
@@ -601,33 +649,19 @@ class ActionPlanningAgent:
         # Store knowledge that defines the workflow hierarchy and available steps
         self.knowledge = knowledge
 
-    def extract_steps_from_prompt(self, prompt):
+    def build_system_prompt(self):
         """
-        Analyze a high-level request and extract the sequential steps needed to accomplish it.
-
-        CHAIN OF THOUGHT ENHANCEMENT: The system prompt guides the LLM through structured reasoning:
-        1. Analyze the request to identify the end goal
-        2. Consult the knowledge hierarchy to understand available workflow stages
-        3. Determine which stages are required to reach the goal
-        4. List only the steps that exist in the knowledge base
-        5. Return steps in logical execution order
-
-        Parameters:
-        prompt (str): A high-level request or goal (e.g., "What would the development tasks be?")
+        Build the action planning system prompt.
 
         Returns:
-        list: Sequential list of workflow steps extracted from the prompt
+        str: The system prompt grounding step extraction in the workflow knowledge
         """
-        # STEP 1: Create OpenAI client
-        client = OpenAI(api_key=self.openai_api_key)
-
-        # STEP 2: Construct system prompt with COT reasoning instructions
         # This prompt combines:
         # - Role definition (action planning agent)
         # - Task instruction (extract steps from user prompt)
         # - Knowledge grounding (use only provided knowledge)
         # - COT reasoning (analyze step-by-step, consult hierarchy, determine stages)
-        system_prompt = (
+        return (
             f"You are an action planning agent. Using your knowledge, you extract from the user prompt "
             f"the steps requested to complete the action the user is asking for.\n\n"
             f"REASONING PROCESS:\n"
@@ -641,6 +675,29 @@ class ActionPlanningAgent:
             f"This is your knowledge:\n{self.knowledge}"
         )
 
+    def extract_steps_from_prompt(self, prompt):
+        """
+        Analyze a high-level request and extract the sequential steps needed to accomplish it.
+
+        CHAIN OF THOUGHT ENHANCEMENT: The system prompt guides the LLM through structured reasoning:
+        1. Analyze the request to identify the end goal
+        2. Consult the knowledge hierarchy to understand available workflow stages
+        3. Determine which stages are required to reach the goal
+        4. List only the steps that exist in the knowledge base
+        5. Return steps in logical execution order
+
+        Parameters:
+        prompt (str): A high-level request or goal (e.g., "What would the development tasks be?")
+
+        Returns:
+        list: Sequential list of workflow steps extracted from the prompt
+        """
+        # STEP 1: Create OpenAI client
+        client = OpenAI(api_key=self.openai_api_key)
+
+        # STEP 2: Construct system prompt with COT reasoning instructions
+        system_prompt = self.build_system_prompt()
+
         # STEP 3: Call OpenAI API with action planning instructions
         response = client.chat.completions.create(
             model="gpt-3.5-turbo",
@@ -10,6 +10,7 @@
 # - KnowledgeAugmentedPromptAgent: Generates grounded responses using domain knowledge
 # - EvaluationAgent: Validates and refines outputs through iterative feedback
 # - RoutingAgent: Semantically routes queries to appropriate specialized teams
+import argparse
 import sys
 import os
 from pathlib import Path
@@ -28,6 +29,20 @@ from workflow_agents.base_agents import (
 
 from dotenv import load_dotenv
 
+# DRY RUN: project tokens, cost and latency of this workflow without making any API call
+from cost_estimator import WorkflowEstimator, load_latency_profile, print_report
+
+# Local typed parser: turns each team's free-text output into UserStory / Feature / Task records
+from artifacts import (
+    parse_user_stories,
+    parse_features,
+    parse_tasks,
+    validate_tasks,
+    critical_path,
+    to_jsonl,
+    to_csv
+)
+
 # SECURE CREDENTIAL MANAGEMENT: Load API key from environment variables
 # BEST PRACTICE: Never hard-code API keys in source code. Use .env files for local development
 # and proper secrets management in production environments.
@@ -37,6 +52,16 @@ dotenv_path = Path(__file__).parent.parent / '.env'
 load_dotenv(dotenv_path=dotenv_path)
 openai_api_key = os.getenv("OPENAI_API_KEY")
 
+# Command-line options: --dry-run only builds and measures prompts, so it needs no real API key
+cli_parser = argparse.ArgumentParser(description="Agentic workflow for product development planning")
+cli_parser.add_argument("--dry-run", action="store_true",
+                        help="Estimate tokens, cost and latency per team without calling the API")
+cli_parser.add_argument("--latency-profile", help="JSON file with recorded latency profiles per model")
+cli_parser.add_argument("--runs", type=int, default=1, help="Number of runs in the planned batch (dry run)")
+cli_args = cli_parser.parse_args()
+if cli_args.dry_run and not openai_api_key:
+    openai_api_key = "dry-run"
+
 # Validate that the API key was successfully loaded
 if not openai_api_key:
     raise ValueError(
@@ -369,6 +394,9 @@ print("✓ Development Engineer Evaluation Agent initialized")
 # WHY THIS MATTERS: This decouples routing logic from evaluation logic, creating clean
 # separation of concerns and making the system more maintainable and testable.
 
+# Final validated output of each team, keyed by team name, for local parsing after the run
+team_outputs = {}
+
 def product_manager_support_function(query):
     """
     Product Manager team support function.
@@ -400,6 +428,7 @@ def product_manager_support_function(query):
     print(f"[Step 2/2] Validation complete after {result['iterations']} iteration(s)")
     print("="*80 + "\n")
 
+    team_outputs["Product Manager"] = result['final_response']
     return result['final_response']
 
 
@@ -434,6 +463,7 @@ def program_manager_support_function(query):
     print(f"[Step 2/2] Validation complete after {result['iterations']} iteration(s)")
     print("="*80 + "\n")
 
+    team_outputs["Program Manager"] = result['final_response']
     return result['final_response']
 
 
@@ -468,6 +498,7 @@ def development_engineer_support_function(query):
     print(f"[Step 2/2] Validation complete after {result['iterations']} iteration(s)")
     print("="*80 + "\n")
 
+    team_outputs["Development Engineer"] = result['final_response']
     return result['final_response']
 
 
@@ -521,17 +552,43 @@ routing_agent = RoutingAgent(
 print("✓ Routing Agent initialized with 3 specialized teams")
 
 
+# Workflow Prompt
+# ****
+# IMPORTANT: This prompt should trigger the workflow to generate Stories → Features → Tasks
+workflow_prompt = "Create a complete development plan for this product, including user stories, product features, and development tasks."
+# ****
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# DRY RUN (OPTIONAL)
+# ═══════════════════════════════════════════════════════════════════════════════
+# With --dry-run, every prompt the workflow would send is built with the agents' own prompt
+# builders and measured locally. The plan is assumed to be the 3 steps described in
+# knowledge_action_planning, and each team is modeled with its best case (approved on the
+# first iteration) and worst case (max_interactions rejected iterations).
+if cli_args.dry_run:
+    if cli_args.latency_profile:
+        latency_profile, output_tokens = load_latency_profile(cli_args.latency_profile)
+    else:
+        latency_profile, output_tokens = None, None
+    estimator = WorkflowEstimator(latency_profile=latency_profile, output_tokens=output_tokens)
+    expected_steps = [
+        ("Generate user stories from the product specification",
+         "Product Manager", product_manager_evaluation_agent),
+        ("Organize user stories into product features",
+         "Program Manager", program_manager_evaluation_agent),
+        ("Create development tasks from the features and stories",
+         "Development Engineer", development_engineer_evaluation_agent),
+    ]
+    report = estimator.estimate(action_planning_agent, workflow_prompt, routing_agent, expected_steps)
+    print_report(report, runs=cli_args.runs)
+    sys.exit(0)
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # WORKFLOW EXECUTION
 # ═══════════════════════════════════════════════════════════════════════════════
 # Run the workflow
 
 print("\n*** Workflow execution started ***\n")
-# Workflow Prompt
-# ****
-# IMPORTANT: This prompt should trigger the workflow to generate Stories → Features → Tasks
-workflow_prompt = "Create a complete development plan for this product, including user stories, product features, and development tasks."
-# ****
 print(f"Task to complete in this workflow, workflow prompt = {workflow_prompt}")
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -618,6 +675,40 @@ print("="*80 + "\n")
 final_output = completed_steps[-1]["result"]
 print(final_output)
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# PHASE 5: TYPED ARTIFACTS (LOCAL, ZERO LLM CALLS)
+# ═══════════════════════════════════════════════════════════════════════════════
+# Parse each team's output into typed records so the plan can be validated, counted and
+# exported without asking the LLM again. The dependency graph gives the critical path.
+
+print("\n" + "="*80)
+print("TYPED ARTIFACTS")
+print("="*80)
+
+unparsed_stories = []
+user_stories = parse_user_stories(team_outputs.get("Product Manager", ""), unparsed=unparsed_stories)
+features = parse_features(team_outputs.get("Program Manager", ""))
+tasks = parse_tasks(team_outputs.get("Development Engineer", ""))
+print(f"\n✓ Parsed {len(user_stories)} user stories, {len(features)} features, {len(tasks)} tasks")
+if unparsed_stories:
+    print(f"⚠️ {len(unparsed_stories)} story-like line(s) not in the 'As a ..., I want ... so that ...' format:")
+    for line in unparsed_stories:
+        print(f"   - {line}")
+
+task_problems = validate_tasks(tasks)
+if task_problems:
+    print(f"⚠️ {len(task_problems)} task validation problem(s):")
+    for problem in task_problems:
+        print(f"   - {problem}")
+else:
+    print("✓ All tasks have the required fields and a valid dependency graph")
+    path, total_days = critical_path(tasks)
+    print(f"✓ Critical path: {' -> '.join(path)} ({total_days:g} working days)")
+
+to_jsonl(user_stories + features + tasks, "workflow_artifacts.jsonl")
+to_csv(tasks, "workflow_tasks.csv")
+print("✓ Artifacts exported to workflow_artifacts.jsonl and workflow_tasks.csv")
+
 print("\n" + "="*80)
 print("END OF WORKFLOW")
 print("="*80)
\ No newline at end of file
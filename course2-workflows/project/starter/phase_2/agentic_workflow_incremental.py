@@ -0,0 +1,179 @@
+"""
+Incremental Agentic Workflow - Regenerate Only What a Spec Change Affects
+Stories, features and tasks are cached with their provenance in an ArtifactStore.
+On a new spec revision only the changed sections (and the artifacts derived from them)
+are sent back to the LLM; everything else is reused from the store.
+
+Usage:
+    python agentic_workflow_incremental.py
+    python agentic_workflow_incremental.py --spec Product-Spec-Email-Router.txt --store workflow_artifacts.json
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Add phase_1 to Python path for imports
+phase_1_path = Path(__file__).parent.parent / 'phase_1'
+sys.path.insert(0, str(phase_1_path))
+
+from workflow_agents.base_agents import KnowledgeAugmentedPromptAgent
+
+from artifact_store import ArtifactStore, IncrementalWorkflow
+
+# Load environment variables
+dotenv_path = Path(__file__).parent.parent / '.env'
+load_dotenv(dotenv_path=dotenv_path)
+openai_api_key = os.getenv("OPENAI_API_KEY")
+
+if not openai_api_key:
+    raise ValueError("OPENAI_API_KEY not found")
+
+# ================================================================
+# TEAM PROMPTS
+# ================================================================
+# Same three teams as agentic_workflow.py, but every prompt only receives the slice of
+# context it needs (one spec section, or only the affected stories/features) and must
+# cite ids so the provenance can be recorded.
+
+persona_pm = "You are a Product Manager responsible for defining user stories."
+
+knowledge_pm = """Generate user stories ONLY for the product specification section below.
+
+OUTPUT FORMAT (use this numbered list format):
+1. As a [Persona], I want [capability] so that [benefit]
+2. As a [Persona], I want [capability] so that [benefit]
+
+Write 0-3 stories. If the section contains no product requirement, reply with NONE.
+
+SPEC SECTION {section_id} - {title}:
+{text}"""
+
+persona_pgm = "You are a Program Manager responsible for defining product features."
+
+knowledge_pgm = """Organize the user stories below into cohesive product features.
+
+OUTPUT FORMAT for each feature:
+Feature Name: [Clear title]
+Related Stories: [Comma-separated story ids, e.g. US-2.1-1, US-3-2]
+Description: [2-3 sentences explaining what it does]
+Key Functionality:
+- [Capability 1]
+- [Capability 2]
+User Benefit: [1-2 sentences on value to users]
+
+Every story id must appear in exactly one feature.
+
+USER STORIES:
+{stories}"""
+
+persona_dev = "You are a Development Engineer responsible for defining development tasks."
+
+knowledge_dev = """Create development tasks for the features below.
+
+TASK FORMAT (use this for EACH task):
+Task ID: TASK-001
+Task Title: [Action-oriented title]
+Related Feature: [Feature id, e.g. F-001]
+Related User Story: [Story ids, e.g. US-2.1-1]
+Description: [2-4 sentences with technical details]
+Acceptance Criteria:
+  - [Criterion 1]
+  - [Criterion 2]
+Estimated Effort: [e.g., "3 days"]
+Dependencies: [Task IDs from this list or "None"]
+
+FEATURES:
+{features}
+
+USER STORIES:
+{stories}"""
+
+
+def format_items(items):
+    """Render an id -> text mapping as an id-tagged list the LLM can cite."""
+    return "\n\n".join(f"[{item_id}]\n{text}" for item_id, text in items.items())
+
+
+def generate_stories(section_id, title, text):
+    """Product Manager call for a single spec section."""
+    print(f"  [Product Manager] section {section_id} - {title}")
+    agent = KnowledgeAugmentedPromptAgent(
+        openai_api_key=openai_api_key,
+        persona=persona_pm,
+        knowledge=knowledge_pm.format(section_id=section_id, title=title, text=text)
+    )
+    return agent.respond("Generate user stories for this section")
+
+
+def generate_features(stories):
+    """Program Manager call for the stories whose grouping is stale."""
+    print(f"  [Program Manager] grouping {len(stories)} stories")
+    agent = KnowledgeAugmentedPromptAgent(
+        openai_api_key=openai_api_key,
+        persona=persona_pgm,
+        knowledge=knowledge_pgm.format(stories=format_items(stories))
+    )
+    return agent.respond("Organize these user stories into features")
+
+
+def generate_tasks(features, stories):
+    """Development Engineer call for the regenerated features only."""
+    print(f"  [Development Engineer] tasks for {len(features)} features")
+    agent = KnowledgeAugmentedPromptAgent(
+        openai_api_key=openai_api_key,
+        persona=persona_dev,
+        knowledge=knowledge_dev.format(features=format_items(features), stories=format_items(stories))
+    )
+    return agent.respond("Create development tasks for these features")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental agentic workflow for product specs")
+    parser.add_argument("--spec", default="Product-Spec-Email-Router.txt", help="Product specification file")
+    parser.add_argument("--store", default="workflow_artifacts.json", help="Artifact store (JSON)")
+    args = parser.parse_args()
+
+    with open(args.spec, "r", encoding="utf-8") as f:
+        product_spec = f.read()
+    print(f"✓ Product specification loaded ({len(product_spec)} characters)")
+
+    store = ArtifactStore(args.store)
+    print(f"✓ Artifact store: {args.store} ({len(store.stories)} stories, "
+          f"{len(store.features)} features, {len(store.tasks)} tasks cached)\n")
+
+    workflow = IncrementalWorkflow(store, generate_stories, generate_features, generate_tasks)
+    report = workflow.run(product_spec)
+
+    diff = report["diff"]
+    print("\n" + "="*80)
+    print("INCREMENTAL WORKFLOW COMPLETE")
+    print("="*80)
+    print(f"Sections: {len(diff['added'])} added, {len(diff['changed'])} changed, "
+          f"{len(diff['removed'])} removed, {len(diff['unchanged'])} unchanged")
+    for kind in ("stories", "features", "tasks"):
+        print(f"  {kind:<9} regenerated: {len(report['regenerated'][kind]):>3}   "
+              f"reused: {report['reused'][kind]:>3}")
+    print(f"LLM calls made: {report['llm_calls']}")
+
+    for task_id, dependencies in report["dropped_dependencies"].items():
+        print(f"⚠️ {task_id}: dropped dependencies on removed tasks {', '.join(dependencies)}")
+    if report["orphaned_stories"]:
+        print(f"⚠️ Stories in no feature: {', '.join(report['orphaned_stories'])}")
+    if report["problems"]:
+        print(f"⚠️ {len(report['problems'])} task validation problem(s):")
+        for problem in report["problems"]:
+            print(f"   - {problem}")
+
+    print("\n" + "="*80)
+    print("DEVELOPMENT TASKS")
+    print("="*80 + "\n")
+    for task_id, task in store.tasks.items():
+        print(task["text"])
+        print()
+
+
+if __name__ == "__main__":
+    main()
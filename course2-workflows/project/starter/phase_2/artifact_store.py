@@ -0,0 +1,366 @@
+# artifact_store.py
+
+# EDUCATIONAL NOTE: The full agentic workflow regenerates every user story, feature and task
+# from the complete product spec on each run. Product specs, however, are edited a few
+# paragraphs at a time. This module keeps the generated artifacts on disk together with their
+# PROVENANCE (which spec sections a story came from, which stories a feature groups, which
+# features/stories a task implements) so a new spec revision only regenerates what changed.
+# WHY THIS WORKS: Provenance turns "did the spec change?" into a graph question. A changed
+# section dirties its stories, dirty stories dirty their features, and dirty features dirty
+# their tasks. Everything else is served from the cache without any LLM call.
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from artifacts import (
+    FEATURE_BLOCK_PATTERN, TASK_BLOCK_PATTERN, Task, parse_tasks, parse_user_stories, split_blocks, validate_tasks,
+)
+
+# Headings in the product spec look like "1.2 Problem Statement" or "3. Functional Requirements"
+SECTION_HEADING_PATTERN = re.compile(r"^(\d+(?:\.\d+)*)\.?\s+([A-Z][^\n]*)$")
+STORY_ID_PATTERN = re.compile(r"US-[\d.]+-\d+")
+FEATURE_ID_PATTERN = re.compile(r"F-\d{3}")
+TASK_ID_PATTERN = re.compile(r"TASK-\d{3}")
+
+PREAMBLE_SECTION_ID = "0"
+
+
+def section_hash(text):
+    """
+    Fingerprint a spec section, ignoring whitespace-only edits.
+
+    Parameters:
+    text (str): Section body
+
+    Returns:
+    str: Short SHA-256 hex digest of the normalized text
+    """
+    normalized = re.sub(r"\s+", " ", text).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def split_spec_sections(spec_text):
+    """
+    Split a product specification into its numbered sections.
+
+    Text before the first numbered heading is kept as section "0". Headings without a body
+    of their own (e.g. "2. Product Overview" followed directly by "2.1 ...") are dropped,
+    because they cannot produce any user story.
+
+    Parameters:
+    spec_text (str): Full product specification
+
+    Returns:
+    dict: Maps section id -> {"title", "text", "hash"}, in document order
+    """
+    sections = {}
+    current_id, current_title, current_lines = PREAMBLE_SECTION_ID, "Preamble", []
+
+    def flush():
+        body = "\n".join(current_lines).strip()
+        if body:
+            sections[current_id] = {
+                "title": current_title,
+                "text": body,
+                "hash": section_hash(body),
+            }
+
+    for line in spec_text.splitlines():
+        match = SECTION_HEADING_PATTERN.match(line.strip())
+        if match:
+            flush()
+            current_id, current_title, current_lines = match.group(1), match.group(2).strip(), []
+        else:
+            current_lines.append(line)
+    flush()
+
+    return sections
+
+
+def diff_sections(old_hashes, new_sections):
+    """
+    Compare stored section hashes against a new spec revision.
+
+    Parameters:
+    old_hashes (dict): Maps section id -> hash from the previous run
+    new_sections (dict): Output of split_spec_sections() for the new revision
+
+    Returns:
+    dict: Lists of section ids under "added", "removed", "changed" and "unchanged"
+    """
+    diff = {"added": [], "removed": [], "changed": [], "unchanged": []}
+    for section_id, section in new_sections.items():
+        if section_id not in old_hashes:
+            diff["added"].append(section_id)
+        elif old_hashes[section_id] != section["hash"]:
+            diff["changed"].append(section_id)
+        else:
+            diff["unchanged"].append(section_id)
+    diff["removed"] = [section_id for section_id in old_hashes if section_id not in new_sections]
+    return diff
+
+
+class ArtifactStore:
+    """
+    JSON-backed store of generated artifacts and their provenance.
+
+    Layout of the file:
+        sections: section id -> hash of the spec revision the artifacts were built from
+        stories:  story id   -> {"text", "sections"}
+        features: feature id -> {"text", "stories"}
+        tasks:    task id    -> {"text", "features", "stories", "dependencies"}
+        counters: next free feature / task number, so ids are never reused
+    """
+
+    def __init__(self, path):
+        """
+        Load the store from disk, or start empty if the file does not exist yet.
+
+        Parameters:
+        path (str | Path): Location of the JSON store
+        """
+        self.path = Path(path)
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        else:
+            data = {}
+        self.sections = data.get("sections", {})
+        self.stories = data.get("stories", {})
+        self.features = data.get("features", {})
+        self.tasks = data.get("tasks", {})
+        self.counters = data.get("counters", {"feature": 1, "task": 1})
+
+    def save(self):
+        """Write the store atomically (temp file + rename) so a crash never corrupts it."""
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "sections": self.sections,
+                "stories": self.stories,
+                "features": self.features,
+                "tasks": self.tasks,
+                "counters": self.counters,
+            }, f, indent=2)
+        tmp_path.replace(self.path)
+
+    def next_id(self, kind, prefix):
+        """
+        Allocate the next feature or task id.
+
+        Parameters:
+        kind (str): "feature" or "task"
+        prefix (str): Id prefix ("F" or "TASK")
+
+        Returns:
+        str: A new, never-used id such as "F-004"
+        """
+        number = self.counters[kind]
+        self.counters[kind] = number + 1
+        return f"{prefix}-{number:03d}"
+
+
+class IncrementalWorkflow:
+    """
+    Regenerates only the artifacts affected by a spec change.
+
+    The three generator callables are injected so the store stays independent of any agent class:
+        generate_stories(section_id, title, text) -> str
+        generate_features(stories: dict) -> str          (stories: story id -> text)
+        generate_tasks(features: dict, stories: dict) -> str
+    Feature responses must cite story ids ("Related Stories: US-2.1-1, ...") and task responses
+    must cite feature ids ("Related Feature: F-001") - that is what records the provenance.
+    """
+
+    def __init__(self, store, generate_stories, generate_features, generate_tasks):
+        """
+        Initialize the workflow with a store and the team generator callables.
+
+        Parameters:
+        store (ArtifactStore): Cached artifacts from previous runs
+        generate_stories (callable): Product Manager call for one spec section
+        generate_features (callable): Program Manager call for a set of stories
+        generate_tasks (callable): Development Engineer call for a set of features
+        """
+        self.store = store
+        self.generate_stories = generate_stories
+        self.generate_features = generate_features
+        self.generate_tasks = generate_tasks
+        self.llm_calls = 0
+
+    def run(self, spec_text):
+        """
+        Bring the store up to date with a spec revision.
+
+        Parameters:
+        spec_text (str): Full text of the new spec revision
+
+        Returns:
+        dict: Report with the section diff, regenerated/reused artifact ids and LLM calls made
+        """
+        self.llm_calls = 0
+        sections = split_spec_sections(spec_text)
+        diff = diff_sections(self.store.sections, sections)
+        dirty_sections = set(diff["added"] + diff["changed"] + diff["removed"])
+
+        # STEP 1: Stories - drop the ones from dirty sections, regenerate per changed/added section
+        stale_stories = {
+            story_id for story_id, story in self.store.stories.items()
+            if dirty_sections.intersection(story["sections"])
+        }
+        for story_id in stale_stories:
+            del self.store.stories[story_id]
+
+        new_stories = {}
+        for section_id in diff["added"] + diff["changed"]:
+            section = sections[section_id]
+            self.llm_calls += 1
+            response = self.generate_stories(section_id, section["title"], section["text"])
+            for number, story in enumerate(parse_user_stories(response), 1):
+                new_stories[f"US-{section_id}-{number}"] = {"text": story.text, "sections": [section_id]}
+        self.store.stories.update(new_stories)
+
+        # STEP 2: Features - a feature is dirty when it groups any stale story
+        dirty_features = {
+            feature_id for feature_id, feature in self.store.features.items()
+            if stale_stories.intersection(feature["stories"])
+        }
+        regroup = set(new_stories)
+        for feature_id in dirty_features:
+            regroup.update(story_id for story_id in self.store.features[feature_id]["stories"]
+                           if story_id in self.store.stories)
+            del self.store.features[feature_id]
+
+        new_features = {}
+        if regroup:
+            self.llm_calls += 1
+            response = self.generate_features(
+                {story_id: self.store.stories[story_id]["text"] for story_id in sorted(regroup)}
+            )
+            for block in split_blocks(response, FEATURE_BLOCK_PATTERN):
+                linked = [story_id for story_id in dict.fromkeys(STORY_ID_PATTERN.findall(block))
+                          if story_id in regroup]
+                new_features[self.store.next_id("feature", "F")] = {"text": block, "stories": linked}
+        self.store.features.update(new_features)
+
+        # STEP 3: Tasks - a task is dirty when it implements a dirty feature or a stale story
+        dirty_tasks = {
+            task_id for task_id, task in self.store.tasks.items()
+            if dirty_features.intersection(task["features"]) or stale_stories.intersection(task["stories"])
+        }
+        for task_id in dirty_tasks:
+            del self.store.tasks[task_id]
+
+        new_tasks = {}
+        if new_features:
+            story_ids = {story_id for feature in new_features.values() for story_id in feature["stories"]}
+            self.llm_calls += 1
+            response = self.generate_tasks(
+                {feature_id: feature["text"] for feature_id, feature in new_features.items()},
+                {story_id: self.store.stories[story_id]["text"] for story_id in sorted(story_ids)},
+            )
+            new_tasks = self._renumber_tasks(split_blocks(response, TASK_BLOCK_PATTERN), new_features)
+        self.store.tasks.update(new_tasks)
+
+        # STEP 4: Kept artifacts may still point at the ones just replaced
+        checks = self.check_references()
+
+        self.store.sections = {section_id: section["hash"] for section_id, section in sections.items()}
+        self.store.save()
+
+        return {
+            "diff": diff,
+            "regenerated": {
+                "stories": sorted(new_stories),
+                "features": sorted(new_features),
+                "tasks": sorted(new_tasks),
+            },
+            "reused": {
+                "stories": len(self.store.stories) - len(new_stories),
+                "features": len(self.store.features) - len(new_features),
+                "tasks": len(self.store.tasks) - len(new_tasks),
+            },
+            "llm_calls": self.llm_calls,
+            **checks,
+        }
+
+    def check_references(self):
+        """
+        Drop task dependencies on tasks that no longer exist, flag orphaned stories and validate the tasks.
+
+        Regenerated tasks get new ids, so a kept task can still depend on a deleted one; and the
+        Program Manager can leave a story out of every feature. Dropped dependencies are also
+        removed from the task text. Orphaned stories are only reported: they have no feature to
+        attach tasks to until the next regrouping.
+
+        Returns:
+        dict: "dropped_dependencies" (task id -> removed ids), "orphaned_stories" (story ids)
+        and "problems" (artifacts.validate_tasks() output for the whole store)
+        """
+        dropped = {}
+        for task_id, task in self.store.tasks.items():
+            stale = [dependency for dependency in task["dependencies"] if dependency not in self.store.tasks]
+            if stale:
+                dropped[task_id] = stale
+                task["dependencies"] = [dep for dep in task["dependencies"] if dep not in stale]
+                line = f"Dependencies: {', '.join(task['dependencies']) or 'None'}"
+                task["text"] = re.sub(r"Dependencies:.*", lambda _: line, task["text"], count=1, flags=re.IGNORECASE)
+
+        grouped = {story_id for feature in self.store.features.values() for story_id in feature["stories"]}
+        orphaned = [story_id for story_id in self.store.stories if story_id not in grouped]
+
+        records = []
+        for task_id, task in self.store.tasks.items():
+            record = next(iter(parse_tasks(task["text"])), None) or Task(task_id, "")
+            # The store's ids and edges are authoritative, not the numbering the LLM wrote
+            record.id, record.dependencies = task_id, task["dependencies"]
+            records.append(record)
+
+        return {"dropped_dependencies": dropped, "orphaned_stories": orphaned, "problems": validate_tasks(records)}
+
+    def _renumber_tasks(self, blocks, features):
+        """
+        Give freshly generated tasks store-wide ids and rewrite their dependency references.
+
+        The LLM numbers tasks TASK-001, TASK-002, ... in every response, so the local ids
+        collide with tasks kept from earlier runs. Dependencies that point to a task of the
+        same response are rewritten; references to unknown ids are dropped.
+
+        Parameters:
+        blocks (list): Task blocks from split_blocks()
+        features (dict): The features these tasks were generated for
+
+        Returns:
+        dict: New task id -> task record
+        """
+        local_ids = []
+        for block in blocks:
+            match = TASK_ID_PATTERN.search(block)
+            local_ids.append(match.group(0) if match else None)
+        id_map = {local_id: self.store.next_id("task", "TASK") for local_id in local_ids if local_id}
+
+        tasks = {}
+        for local_id, block in zip(local_ids, blocks):
+            task_id = id_map.get(local_id) or self.store.next_id("task", "TASK")
+            dependencies_line = re.search(r"Dependencies:(.*)", block, re.IGNORECASE)
+            dependencies = []
+            if dependencies_line:
+                dependencies = [id_map[dep] for dep in TASK_ID_PATTERN.findall(dependencies_line.group(1))
+                                if dep in id_map and dep != local_id]
+            block = TASK_ID_PATTERN.sub(lambda m: id_map.get(m.group(0), m.group(0)), block)
+            linked_features = [feature_id for feature_id in dict.fromkeys(FEATURE_ID_PATTERN.findall(block))
+                               if feature_id in features]
+            linked_stories = [story_id for story_id in dict.fromkeys(STORY_ID_PATTERN.findall(block))
+                              if story_id in self.store.stories]
+            if not linked_features:
+                # No explicit reference: the task belongs to every feature that covers its stories
+                linked_features = [feature_id for feature_id, feature in features.items()
+                                   if set(feature["stories"]).intersection(linked_stories)] or list(features)
+            tasks[task_id] = {
+                "text": block,
+                "features": linked_features,
+                "stories": linked_stories,
+                "dependencies": dependencies,
+            }
+        return tasks
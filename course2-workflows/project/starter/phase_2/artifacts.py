@@ -0,0 +1,474 @@
+# artifacts.py
+
+# EDUCATIONAL NOTE: The agentic workflow passes FREE TEXT between teams. That is fine for an LLM,
+# but nothing downstream can count, validate or index the artifacts without another LLM call.
+# This module is a fast, purely local parser that turns the Product Manager, Program Manager and
+# Development Engineer outputs into compact typed records (UserStory / Feature / Task).
+# WHY __slots__: Records have a fixed set of fields, so __slots__ drops the per-instance __dict__.
+# That keeps thousands of parsed artifacts small in memory and makes typos in attribute names fail
+# loudly instead of silently creating new attributes.
+# KEY BENEFIT: Once tasks carry ids, effort and dependency edges, dependency-graph checks and the
+# critical path of the plan are plain graph algorithms - zero LLM calls.
+import csv
+import json
+import re
+
+STORY_PATTERN = re.compile(
+    r"^\s*(?:\d+[\.\)]|[-*])?\s*(As an? (.+?),?\s+I want (?:to )?(.+?)(?:,)?\s+so that (.+?))\.?\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+# Any line opening like a story; the ones STORY_PATTERN rejects are reported, not dropped silently
+STORY_CANDIDATE_PATTERN = re.compile(r"^\s*(?:\d+[\.\)]|[-*])?\s*(As an? .*?)\s*$", re.IGNORECASE | re.MULTILINE)
+# A feature starts at "Feature Name:"; a task at "Task ID:" or at a bare "TASK-001" line
+FEATURE_BLOCK_PATTERN = re.compile(r"^[#*\s]*Feature Name:", re.IGNORECASE | re.MULTILINE)
+TASK_BLOCK_PATTERN = re.compile(r"^[#*\s]*(?:Task ID:|TASK-\d+[*\s]*$)", re.IGNORECASE | re.MULTILINE)
+# Ordinal headers such as "Feature 2:" or "### Task 3" between blocks carry no content
+ORDINAL_HEADER_PATTERN = re.compile(r"^[\s#*]*(?:Feature|Task|Story)\s+\d+\W*$", re.IGNORECASE)
+LABEL_PATTERN = re.compile(r"^[\s#*_-]*([A-Za-z][A-Za-z ]+?)[*_]*:[*_]*\s*(.*)$")
+TASK_ID_PATTERN = re.compile(r"TASK-\d+")
+BULLET_PATTERN = re.compile(r"^\s*(?:[-*•]|\d+[\.\)])\s+")
+EFFORT_PATTERN = re.compile(
+    r"(\d+(?:\.\d+)?)(?:\s*(?:-|–|to)\s*(\d+(?:\.\d+)?))?\s*(hours?|hrs?|days?|weeks?|sprints?)",
+    re.IGNORECASE,
+)
+
+# Conversion of effort units into working days (8-hour days, 5-day weeks, 2-week sprints)
+EFFORT_UNIT_DAYS = {"hour": 1 / 8, "hr": 1 / 8, "day": 1, "week": 5, "sprint": 10}
+
+FEATURE_LABELS = {
+    "feature name": "name",
+    "related stories": "stories",
+    "description": "description",
+    "key functionality": "functionality",
+    "user benefit": "user_benefit",
+}
+TASK_LABELS = {
+    "task id": "id",
+    "task title": "title",
+    "related feature": "feature",
+    "related user story": "related_story",
+    "related user stories": "related_story",
+    "description": "description",
+    "acceptance criteria": "acceptance_criteria",
+    "estimated effort": "effort",
+    "dependencies": "dependencies",
+}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RECORDS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class Record:
+    """Base class for artifact records: equality, repr and dict export driven by __slots__."""
+
+    __slots__ = ()
+    kind = "record"
+
+    def to_dict(self):
+        """
+        Convert the record into a plain dictionary.
+
+        Returns:
+        dict: Field name -> value, plus the record "type"
+        """
+        data = {"type": self.kind}
+        data.update({name: getattr(self, name) for name in self.__slots__})
+        return data
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({getattr(self, 'id', '')!r})"
+
+
+class UserStory(Record):
+    """A user story: As a [persona], I want [capability] so that [benefit]."""
+
+    __slots__ = ("id", "persona", "capability", "benefit", "text")
+    kind = "user_story"
+
+    def __init__(self, id, persona, capability, benefit, text):
+        self.id = id
+        self.persona = persona
+        self.capability = capability
+        self.benefit = benefit
+        self.text = text
+
+
+class Feature(Record):
+    """A product feature grouping related user stories."""
+
+    __slots__ = ("id", "name", "description", "functionality", "user_benefit", "stories")
+    kind = "feature"
+
+    def __init__(self, id, name, description="", functionality=None, user_benefit="", stories=None):
+        self.id = id
+        self.name = name
+        self.description = description
+        self.functionality = functionality or []
+        self.user_benefit = user_benefit
+        self.stories = stories or []
+
+
+class Task(Record):
+    """A development task with effort (in working days) and dependency edges."""
+
+    __slots__ = ("id", "title", "feature", "related_story", "description", "acceptance_criteria",
+                 "effort", "effort_days", "dependencies")
+    kind = "task"
+
+    def __init__(self, id, title, feature="", related_story="", description="", acceptance_criteria=None,
+                 effort="", effort_days=None, dependencies=None):
+        self.id = id
+        self.title = title
+        self.feature = feature
+        self.related_story = related_story
+        self.description = description
+        self.acceptance_criteria = acceptance_criteria or []
+        self.effort = effort
+        self.effort_days = effort_days
+        self.dependencies = dependencies or []
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PARSERS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def split_blocks(text, block_pattern):
+    """
+    Split an LLM response into blocks that each start at a line matching block_pattern.
+
+    Parameters:
+    text (str): Raw LLM output
+    block_pattern (re.Pattern): Multiline pattern matching the first line of every block
+
+    Returns:
+    list: Block strings, each starting at a matched line
+    """
+    starts = [match.start() for match in block_pattern.finditer(text)]
+    return [text[start:end].strip() for start, end in zip(starts, starts[1:] + [len(text)])]
+
+
+def parse_labeled_block(block, labels):
+    """
+    Read "Label: value" lines of a block into fields; unlabeled lines continue the previous field.
+
+    Parameters:
+    block (str): One feature or task block
+    labels (dict): Lower-case label -> field name
+
+    Returns:
+    dict: Field name -> list of raw lines
+    """
+    fields = {}
+    current = None
+    for line in block.splitlines():
+        if ORDINAL_HEADER_PATTERN.match(line):
+            continue
+        match = LABEL_PATTERN.match(line)
+        label = match.group(1).strip().lower() if match else None
+        if label in labels:
+            current = labels[label]
+            fields[current] = [match.group(2).strip()] if match.group(2).strip() else []
+        elif current is not None and line.strip():
+            fields[current].append(line.strip())
+    return fields
+
+
+def parse_effort_days(effort):
+    """
+    Convert an effort estimate such as "2-3 days" or "1 week" into working days.
+
+    Ranges use their upper bound, which is the safer value for scheduling.
+
+    Parameters:
+    effort (str): Free-text effort estimate
+
+    Returns:
+    float | None: Effort in working days, or None if no duration was found
+    """
+    match = EFFORT_PATTERN.search(effort or "")
+    if not match:
+        return None
+    amount = float(match.group(2) or match.group(1))
+    unit = match.group(3).lower().rstrip("s")
+    return amount * EFFORT_UNIT_DAYS.get(unit, 1)
+
+
+def find_unparsed_stories(text):
+    """
+    Find lines that open like a user story ("As a ...") but do not match STORY_PATTERN.
+
+    Parameters:
+    text (str): Raw LLM output
+
+    Returns:
+    list: The story-like lines parse_user_stories skips
+    """
+    return [
+        match.group(1) for match in STORY_CANDIDATE_PATTERN.finditer(text)
+        if not STORY_PATTERN.match(match.group(0))
+    ]
+
+
+def parse_user_stories(text, id_prefix="US", unparsed=None):
+    """
+    Parse a Product Manager response into UserStory records.
+
+    Parameters:
+    text (str): Raw LLM output
+    id_prefix (str): Prefix of the generated story ids
+    unparsed (list | None): If given, story-like lines that could not be parsed are appended to it
+
+    Returns:
+    list: UserStory records numbered in output order
+    """
+    if unparsed is not None:
+        unparsed.extend(find_unparsed_stories(text))
+    return [
+        UserStory(f"{id_prefix}-{number:03d}", persona.strip(), capability.strip(), benefit.strip(), sentence.strip())
+        for number, (sentence, persona, capability, benefit) in enumerate(STORY_PATTERN.findall(text), 1)
+    ]
+
+
+def parse_features(text):
+    """
+    Parse a Program Manager response into Feature records.
+
+    Parameters:
+    text (str): Raw LLM output
+
+    Returns:
+    list: Feature records with ids F-001, F-002, ...
+    """
+    features = []
+    for number, block in enumerate(split_blocks(text, FEATURE_BLOCK_PATTERN), 1):
+        fields = parse_labeled_block(block, FEATURE_LABELS)
+        features.append(Feature(
+            id=f"F-{number:03d}",
+            name=" ".join(fields.get("name", [])),
+            description=" ".join(fields.get("description", [])),
+            functionality=[BULLET_PATTERN.sub("", line) for line in fields.get("functionality", [])],
+            user_benefit=" ".join(fields.get("user_benefit", [])),
+            stories=[story.strip() for story in ",".join(fields.get("stories", [])).split(",") if story.strip()],
+        ))
+    return features
+
+
+def parse_tasks(text):
+    """
+    Parse a Development Engineer response into Task records.
+
+    Parameters:
+    text (str): Raw LLM output
+
+    Returns:
+    list: Task records; tasks without an explicit id get TASK-<position>
+    """
+    tasks = []
+    for number, block in enumerate(split_blocks(text, TASK_BLOCK_PATTERN), 1):
+        fields = parse_labeled_block(block, TASK_LABELS)
+        task_id = TASK_ID_PATTERN.search(" ".join(fields.get("id", [])) or block.splitlines()[0])
+        effort = " ".join(fields.get("effort", []))
+        tasks.append(Task(
+            id=task_id.group(0) if task_id else f"TASK-{number:03d}",
+            title=" ".join(fields.get("title", [])),
+            feature=" ".join(fields.get("feature", [])),
+            related_story=" ".join(fields.get("related_story", [])),
+            description=" ".join(fields.get("description", [])),
+            acceptance_criteria=[BULLET_PATTERN.sub("", line) for line in fields.get("acceptance_criteria", [])],
+            effort=effort,
+            effort_days=parse_effort_days(effort),
+            dependencies=list(dict.fromkeys(TASK_ID_PATTERN.findall(" ".join(fields.get("dependencies", []))))),
+        ))
+    return tasks
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EXPORT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def to_jsonl(records, path):
+    """
+    Write records as JSON lines (one record per line).
+
+    Parameters:
+    records (iterable): UserStory / Feature / Task records
+    path (str): Output file
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record.to_dict(), ensure_ascii=False) + "\n")
+
+
+def to_csv(records, path):
+    """
+    Write records of a single type as CSV; list fields are joined with "; ".
+
+    Parameters:
+    records (list): Records of one type
+    path (str): Output file
+    """
+    records = list(records)
+    if not records:
+        return
+    fieldnames = list(records[0].__slots__)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for record in records:
+            writer.writerow({
+                name: "; ".join(value) if isinstance(value, list) else value
+                for name, value in ((name, getattr(record, name)) for name in fieldnames)
+            })
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# VALIDATION AND DEPENDENCY GRAPH
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def validate_tasks(tasks):
+    """
+    Check tasks for the problems the Development Engineer evaluator looks for, locally.
+
+    Parameters:
+    tasks (list): Task records
+
+    Returns:
+    list: Human-readable problems (empty if the plan is valid)
+    """
+    problems = []
+    seen = set()
+    for task in tasks:
+        if task.id in seen:
+            problems.append(f"{task.id}: duplicate task id")
+        seen.add(task.id)
+        for field in ("title", "related_story", "description", "effort"):
+            if not getattr(task, field):
+                problems.append(f"{task.id}: missing {field.replace('_', ' ')}")
+        if not task.acceptance_criteria:
+            problems.append(f"{task.id}: missing acceptance criteria")
+        if task.effort and task.effort_days is None:
+            problems.append(f"{task.id}: effort '{task.effort}' has no duration")
+
+    for task in tasks:
+        for dependency in task.dependencies:
+            if dependency == task.id:
+                problems.append(f"{task.id}: depends on itself")
+            elif dependency not in seen:
+                problems.append(f"{task.id}: unknown dependency {dependency}")
+
+    cycle = find_dependency_cycle(tasks)
+    if cycle:
+        problems.append(f"dependency cycle: {' -> '.join(cycle)}")
+    return problems
+
+
+def topological_order(tasks):
+    """
+    Order tasks so every task comes after its dependencies (Kahn's algorithm).
+
+    Unknown and self dependencies are ignored.
+
+    Parameters:
+    tasks (list): Task records
+
+    Returns:
+    list | None: Task ids in dependency order, or None if the graph has a cycle
+    """
+    ids = {task.id for task in tasks}
+    indegree = {task.id: 0 for task in tasks}
+    dependents = {task.id: [] for task in tasks}
+    for task in tasks:
+        for dependency in set(task.dependencies):
+            if dependency in ids and dependency != task.id:
+                indegree[task.id] += 1
+                dependents[dependency].append(task.id)
+
+    ready = [task_id for task_id, degree in indegree.items() if degree == 0]
+    order = []
+    while ready:
+        task_id = ready.pop()
+        order.append(task_id)
+        for dependent in dependents[task_id]:
+            indegree[dependent] -= 1
+            if indegree[dependent] == 0:
+                ready.append(dependent)
+    return order if len(order) == len(indegree) else None
+
+
+def find_dependency_cycle(tasks):
+    """
+    Find one dependency cycle, if any.
+
+    Parameters:
+    tasks (list): Task records
+
+    Returns:
+    list | None: Task ids forming the cycle (first id repeated at the end), or None
+    """
+    graph = {task.id: [dep for dep in task.dependencies if dep != task.id] for task in tasks}
+    state = {}  # task id -> "visiting" | "done"
+
+    for root in graph:
+        if root in state:
+            continue
+        stack = [(root, iter(graph[root]))]
+        path = [root]
+        state[root] = "visiting"
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                path.pop()
+                state[node] = "done"
+            elif child not in graph or state.get(child) == "done":
+                continue
+            elif state.get(child) == "visiting":
+                return path[path.index(child):] + [child]
+            else:
+                state[child] = "visiting"
+                stack.append((child, iter(graph[child])))
+                path.append(child)
+    return None
+
+
+def critical_path(tasks, default_days=1.0):
+    """
+    Compute the longest chain of dependent work (the critical path of the plan).
+
+    Parameters:
+    tasks (list): Task records
+    default_days (float): Effort assumed for tasks without a parseable estimate
+
+    Returns:
+    tuple: (list of task ids on the critical path, total duration in working days)
+
+    Raises:
+    ValueError: If the dependency graph has a cycle
+    """
+    order = topological_order(tasks)
+    if order is None:
+        raise ValueError(f"Dependency cycle: {' -> '.join(find_dependency_cycle(tasks))}")
+
+    by_id = {task.id: task for task in tasks}
+    finish, previous = {}, {}
+    for task_id in order:
+        task = by_id[task_id]
+        start = 0.0
+        for dependency in task.dependencies:
+            if dependency in finish and finish[dependency] > start:
+                start, previous[task_id] = finish[dependency], dependency
+        duration = task.effort_days if task.effort_days is not None else default_days
+        finish[task_id] = start + duration
+
+    if not finish:
+        return [], 0.0
+    last = max(finish, key=finish.get)
+    path = [last]
+    while path[-1] in previous:
+        path.append(previous[path[-1]])
+    return path[::-1], finish[last]
@@ -0,0 +1,309 @@
+# cost_estimator.py
+
+# EDUCATIONAL NOTE: Before launching a batch of workflow runs we want to know roughly how many
+# tokens, dollars and seconds it will take. This module performs a DRY RUN: it builds every prompt
+# the workflow would send (using the agents' own prompt builders, so the text is identical), counts
+# tokens locally with a tokenizer and models the best and worst case of the EvaluationAgent loop.
+# WHY THIS MATTERS: The knowledge prompts embed the full product spec, and every rejected answer
+# costs a worker call, an evaluation call and an instruction call - a team can easily triple its
+# spend. Seeing that range up front is free: no API call is made.
+import json
+import math
+
+# Models hard-coded in workflow_agents.base_agents
+CHAT_MODEL = "gpt-3.5-turbo"
+EMBEDDING_MODEL = "text-embedding-3-large"
+
+# USD per 1M tokens: (input, output). Embedding models only bill input tokens.
+PRICING = {
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4": (30.00, 60.00),
+    "text-embedding-3-large": (0.13, 0.0),
+    "text-embedding-3-small": (0.02, 0.0),
+}
+
+# Latency profile per model: fixed overhead per request plus prefill and generation speed.
+# Replace with numbers recorded from real runs via load_latency_profile().
+DEFAULT_LATENCY_PROFILE = {
+    "gpt-3.5-turbo": {"overhead_s": 0.45, "input_tokens_per_s": 8000, "output_tokens_per_s": 90},
+    "gpt-4o-mini": {"overhead_s": 0.50, "input_tokens_per_s": 6000, "output_tokens_per_s": 80},
+    "gpt-4.1-mini": {"overhead_s": 0.55, "input_tokens_per_s": 6000, "output_tokens_per_s": 75},
+    "gpt-4.1-nano": {"overhead_s": 0.35, "input_tokens_per_s": 9000, "output_tokens_per_s": 120},
+    "text-embedding-3-large": {"overhead_s": 0.25, "input_tokens_per_s": 50000, "output_tokens_per_s": 1},
+}
+
+# Expected completion length per call type (tokens), taken from recorded workflow outputs
+DEFAULT_OUTPUT_TOKENS = {
+    "planner": 60,
+    "evaluation": 120,
+    "instructions": 300,
+    "Product Manager": 450,
+    "Program Manager": 900,
+    "Development Engineer": 2800,
+}
+
+# Tokens added by the chat format per message and to prime the reply
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+
+def load_latency_profile(path):
+    """
+    Load a recorded latency profile, merged over the defaults.
+
+    The JSON file maps model name -> {"overhead_s", "input_tokens_per_s", "output_tokens_per_s"}
+    and may contain an "output_tokens" object overriding DEFAULT_OUTPUT_TOKENS.
+
+    Parameters:
+    path (str): Profile file
+
+    Returns:
+    tuple: (latency profile dict, expected output tokens dict)
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        recorded = json.load(f)
+    output_tokens = {**DEFAULT_OUTPUT_TOKENS, **recorded.pop("output_tokens", {})}
+    profile = {model: dict(values) for model, values in DEFAULT_LATENCY_PROFILE.items()}
+    for model, values in recorded.items():
+        profile.setdefault(model, {}).update(values)
+    return profile, output_tokens
+
+
+class TokenCounter:
+    """
+    Counts tokens locally with tiktoken, or with a ~4 characters/token heuristic if it is not installed.
+    """
+
+    def __init__(self):
+        """Initialize the counter and detect whether tiktoken is available."""
+        try:
+            import tiktoken
+        except ImportError:
+            tiktoken = None
+        self.tiktoken = tiktoken
+        self.encodings = {}
+
+    @property
+    def exact(self):
+        """bool: True when counts come from a real tokenizer."""
+        return self.tiktoken is not None
+
+    def count(self, text, model):
+        """
+        Count the tokens of a text for a model.
+
+        Parameters:
+        text (str): Text to count
+        model (str): Model whose tokenizer should be used
+
+        Returns:
+        int: Number of tokens
+        """
+        if self.tiktoken is not None and model not in self.encodings:
+            try:
+                self.encodings[model] = self.tiktoken.encoding_for_model(model)
+            except KeyError:
+                self.encodings[model] = self.tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                # Encoding files are downloaded on first use; offline, fall back to the heuristic
+                self.tiktoken = None
+        if self.tiktoken is None:
+            return math.ceil(len(text) / 4)
+        return len(self.encodings[model].encode(text))
+
+    def count_messages(self, messages, model):
+        """
+        Count the prompt tokens of a chat request, including the chat format overhead.
+
+        Parameters:
+        messages (list): Chat messages ({"role", "content"})
+        model (str): Model whose tokenizer should be used
+
+        Returns:
+        int: Number of prompt tokens
+        """
+        return TOKENS_PER_REPLY + sum(
+            TOKENS_PER_MESSAGE + self.count(message["content"], model) for message in messages
+        )
+
+
+class WorkflowEstimator:
+    """
+    Projects tokens, cost and latency of an agentic workflow run without calling the API.
+    """
+
+    def __init__(self, pricing=None, latency_profile=None, output_tokens=None):
+        """
+        Initialize the estimator.
+
+        Parameters:
+        pricing (dict): Model -> (input USD, output USD) per 1M tokens
+        latency_profile (dict): Model -> latency parameters
+        output_tokens (dict): Call type / team name -> expected completion tokens
+        """
+        self.pricing = pricing or PRICING
+        self.latency_profile = latency_profile or DEFAULT_LATENCY_PROFILE
+        self.output_tokens = output_tokens or DEFAULT_OUTPUT_TOKENS
+        self.counter = TokenCounter()
+
+    def call(self, model, input_tokens, output_tokens):
+        """
+        Price and time a single API call.
+
+        Parameters:
+        model (str): Model used
+        input_tokens (int): Prompt tokens
+        output_tokens (int): Completion tokens
+
+        Returns:
+        dict: calls, input_tokens, output_tokens, cost_usd and latency_s of this call
+        """
+        input_price, output_price = self.pricing.get(model, (0.0, 0.0))
+        latency = self.latency_profile.get(model, DEFAULT_LATENCY_PROFILE[CHAT_MODEL])
+        return {
+            "calls": 1,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cost_usd": (input_tokens * input_price + output_tokens * output_price) / 1_000_000,
+            "latency_s": (latency["overhead_s"]
+                          + input_tokens / latency["input_tokens_per_s"]
+                          + output_tokens / latency["output_tokens_per_s"]),
+        }
+
+    def chat_call(self, system_prompt, user_prompt, output_tokens, embedded_tokens=0):
+        """
+        Estimate one chat completion with a system and a user message.
+
+        Parameters:
+        system_prompt (str): System message
+        user_prompt (str): User message, built with empty placeholders for earlier LLM outputs
+        output_tokens (int): Expected completion tokens
+        embedded_tokens (int): Expected tokens of the LLM outputs embedded in the user message
+
+        Returns:
+        dict: Call estimate
+        """
+        messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}]
+        input_tokens = self.counter.count_messages(messages, CHAT_MODEL) + embedded_tokens
+        return self.call(CHAT_MODEL, input_tokens, output_tokens)
+
+    def embedding_call(self, text):
+        """Estimate one embeddings request."""
+        return self.call(EMBEDDING_MODEL, self.counter.count(text, EMBEDDING_MODEL), 0)
+
+    def team_iterations(self, step, evaluation_agent, team_name, iterations, approved):
+        """
+        Estimate a team's generate -> evaluate -> correct loop for a number of iterations.
+
+        Every rejected iteration adds an instruction call, and the next worker prompt embeds the
+        rejected answer and the instructions, so later iterations are more expensive.
+
+        Parameters:
+        step (str): The workflow step routed to the team (the worker's first prompt)
+        evaluation_agent (EvaluationAgent): The team's evaluation agent
+        team_name (str): Team name, used to look up the expected answer length
+        iterations (int): Number of loop iterations to model
+        approved (bool): Whether the last iteration is accepted (no instruction call after it)
+
+        Returns:
+        list: Call estimates in execution order
+        """
+        worker = evaluation_agent.worker_agent
+        worker_output = self.output_tokens.get(team_name, 500)
+        evaluation_output = self.output_tokens["evaluation"]
+        instructions_output = self.output_tokens["instructions"]
+
+        # Earlier LLM outputs are unknown in a dry run: prompts are built with empty placeholders
+        # and the expected length of each embedded output is added to the token count.
+        calls = []
+        prompt, embedded = step, 0
+        for iteration in range(iterations):
+            calls.append(self.chat_call(worker.build_system_prompt(), prompt, worker_output, embedded))
+            calls.append(self.chat_call(evaluation_agent.persona, evaluation_agent.build_eval_prompt(""),
+                                        evaluation_output, worker_output))
+            if not (approved and iteration == iterations - 1):
+                calls.append(self.chat_call(evaluation_agent.persona, evaluation_agent.build_instruction_prompt(""),
+                                            instructions_output, evaluation_output))
+                prompt = evaluation_agent.build_refinement_prompt(step, "", "")
+                embedded = worker_output + instructions_output
+        return calls
+
+    def estimate(self, action_planning_agent, workflow_prompt, routing_agent, steps):
+        """
+        Estimate a full workflow run: planning, then routing and a team loop for every step.
+
+        Parameters:
+        action_planning_agent (ActionPlanningAgent): The workflow planner
+        workflow_prompt (str): The prompt given to the planner
+        routing_agent (RoutingAgent): The semantic router
+        steps (list): (step text, team name, EvaluationAgent) for each step the plan is expected to contain
+
+        Returns:
+        dict: Per-component {"best": totals, "worst": totals} plus overall totals and tokenizer info
+        """
+        components = {}
+
+        planning = [self.chat_call(action_planning_agent.build_system_prompt(), workflow_prompt,
+                                   self.output_tokens["planner"])]
+        components["Action Planning"] = {"best": planning, "worst": planning}
+
+        routing = []
+        for step, _, _ in steps:
+            routing.append(self.embedding_call(step))
+            routing.extend(self.embedding_call(agent["description"]) for agent in routing_agent.agents)
+        components["Routing"] = {"best": routing, "worst": routing}
+
+        for step, team_name, evaluation_agent in steps:
+            entry = components.setdefault(team_name, {"best": [], "worst": []})
+            entry["best"] += self.team_iterations(step, evaluation_agent, team_name, 1, approved=True)
+            entry["worst"] += self.team_iterations(step, evaluation_agent, team_name,
+                                                   evaluation_agent.max_interactions, approved=False)
+
+        report = {"components": {}, "tokenizer": "tiktoken" if self.counter.exact else "heuristic"}
+        for case in ("best", "worst"):
+            for name, entry in components.items():
+                report["components"].setdefault(name, {})[case] = sum_calls(entry[case])
+            report[case] = sum_calls([call for entry in components.values() for call in entry[case]])
+        return report
+
+
+def sum_calls(calls):
+    """
+    Add up call estimates.
+
+    Parameters:
+    calls (list): Call estimates from WorkflowEstimator.call()
+
+    Returns:
+    dict: Summed calls, tokens, cost and (sequential) latency
+    """
+    keys = ("calls", "input_tokens", "output_tokens", "cost_usd", "latency_s")
+    return {key: sum(call[key] for call in calls) for key in keys}
+
+
+def print_report(report, runs=1):
+    """
+    Print the dry-run report as a table.
+
+    Parameters:
+    report (dict): Output of WorkflowEstimator.estimate()
+    runs (int): Number of workflow runs in the planned batch
+    """
+    print("\n" + "="*80)
+    print(f"DRY RUN: PROJECTED COST AND LATENCY (tokenizer: {report['tokenizer']}, no API calls made)")
+    print("="*80)
+    header = f"{'Component':<22}{'Case':<7}{'Calls':>6}{'In tokens':>11}{'Out tokens':>12}{'Cost $':>10}{'Latency s':>11}"
+    print(header)
+    print("-" * len(header))
+    rows = list(report["components"].items()) + [("TOTAL per run", {"best": report["best"], "worst": report["worst"]})]
+    for name, cases in rows:
+        for case in ("best", "worst"):
+            totals = cases[case]
+            print(f"{name if case == 'best' else '':<22}{case:<7}{totals['calls']:>6}{totals['input_tokens']:>11,}"
+                  f"{totals['output_tokens']:>12,}{totals['cost_usd']:>10.4f}{totals['latency_s']:>11.1f}")
+    if runs > 1:
+        print(f"\nBatch of {runs} runs: ${report['best']['cost_usd'] * runs:,.2f} - "
+              f"${report['worst']['cost_usd'] * runs:,.2f}")
@@ -0,0 +1,9 @@
+# conftest.py
+
+# Shared setup for the phase 2 tests: the workflow modules are scripts next to this folder, not a
+# package, so their directory is put on the import path. No test calls the OpenAI API.
+import sys
+from pathlib import Path
+
+PHASE_2_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PHASE_2_DIR))
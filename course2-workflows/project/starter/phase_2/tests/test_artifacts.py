@@ -0,0 +1,145 @@
+# test_artifacts.py
+
+# Tests for the local artifact parser, run on a recorded workflow output and on small handmade plans.
+import json
+
+import pytest
+
+from artifacts import (
+    Task, critical_path, find_dependency_cycle, parse_effort_days, parse_features, parse_tasks,
+    parse_user_stories, to_csv, to_jsonl, topological_order, validate_tasks,
+)
+from conftest import PHASE_2_DIR
+
+RECORDED_OUTPUT = (PHASE_2_DIR / "workflow_simple_output.txt").read_text(encoding="utf-8")
+
+
+def section(title):
+    """Return the text of one "STEP n: <title>" section of the recorded output."""
+    start = RECORDED_OUTPUT.index(title)
+    end = RECORDED_OUTPUT.find("\n====", RECORDED_OUTPUT.index("\n", start) + 90)
+    return RECORDED_OUTPUT[start:end if end != -1 else None]
+
+
+def plan(*edges):
+    """Build tasks from (id, effort, dependencies) tuples."""
+    return [Task(task_id, f"Task {task_id}", related_story="Story", description="Do it",
+                 acceptance_criteria=["Done"], effort=effort, effort_days=parse_effort_days(effort),
+                 dependencies=list(dependencies))
+            for task_id, effort, dependencies in edges]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RECORDED WORKFLOW OUTPUT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def test_recorded_user_stories():
+    unparsed = []
+    stories = parse_user_stories(section("GENERATING USER STORIES"), unparsed=unparsed)
+    assert [story.id for story in stories] == [f"US-{number:03d}" for number in range(1, 7)]
+    assert stories[0].persona == "Customer Support Representative"
+    assert stories[2].persona == "Subject Matter Expert (SME)"
+    assert stories[0].benefit.startswith("I can focus on addressing complex customer inquiries")
+    assert unparsed == []
+
+
+def test_recorded_features():
+    features = parse_features(section("ORGANIZING INTO FEATURES"))
+    assert [feature.name for feature in features] == [
+        "Automated Email Classification", "Real-time Performance Monitoring",
+        "Intelligent Email Routing", "Contextually Accurate Response Generation",
+    ]
+    assert len(features[0].functionality) == 3
+    assert not features[0].functionality[0].startswith("-")
+    assert features[1].user_benefit.startswith("IT Administrators can monitor")
+
+
+def test_recorded_tasks_and_critical_path():
+    tasks = parse_tasks(section("DEFINING DEVELOPMENT TASKS"))
+    assert [task.id for task in tasks] == [f"TASK-{number:03d}" for number in range(1, 9)]
+    assert tasks[0].effort_days == 5 and tasks[0].dependencies == []
+    assert tasks[6].dependencies == ["TASK-003"]
+    assert tasks[1].acceptance_criteria
+
+    assert validate_tasks(tasks) == []
+    order = topological_order(tasks)
+    assert order.index("TASK-001") < order.index("TASK-003") < order.index("TASK-007")
+    assert critical_path(tasks) == (["TASK-001", "TASK-003", "TASK-007"], 15.0)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PARSER EDGE CASES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@pytest.mark.parametrize("effort, days", [
+    ("5 days", 5.0), ("2-3 days", 3.0), ("4 hours", 0.5), ("1 week", 5.0), ("1 to 2 sprints", 20.0), ("TBD", None),
+])
+def test_effort_days(effort, days):
+    assert parse_effort_days(effort) == days
+
+
+def test_story_without_comma_and_unparsed_story_lines():
+    unparsed = []
+    text = ("- As a manager I want weekly reports so that I can plan staffing.\n"
+            "- As a customer I want faster answers.\n")
+    stories = parse_user_stories(text, unparsed=unparsed)
+    assert [(story.persona, story.capability) for story in stories] == [("manager", "weekly reports")]
+    assert unparsed == ["As a customer I want faster answers."]
+
+
+def test_markdown_tasks_with_labels_and_dependency_lists():
+    text = (
+        "### Task 1\n**Task ID:** TASK-010\n**Task Title:** Build API\n**Estimated Effort:** 2 days\n"
+        "**Dependencies:** None\n\n"
+        "### Task 2\n**Task ID:** TASK-011\n**Task Title:** Build UI\n**Estimated Effort:** 1 week\n"
+        "**Dependencies:** TASK-010, TASK-010\n"
+    )
+    tasks = parse_tasks(text)
+    assert [(task.id, task.title, task.effort_days) for task in tasks] == [
+        ("TASK-010", "Build API", 2.0), ("TASK-011", "Build UI", 5.0),
+    ]
+    assert tasks[1].dependencies == ["TASK-010"]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# VALIDATION AND DEPENDENCY GRAPH
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def test_validation_reports_plan_problems():
+    tasks = plan(("TASK-001", "2 days", ["TASK-009"]), ("TASK-002", "soon", ["TASK-002"]), ("TASK-001", "1 day", []))
+    tasks[0].acceptance_criteria = []
+    problems = validate_tasks(tasks)
+    assert "TASK-001: duplicate task id" in problems
+    assert "TASK-001: missing acceptance criteria" in problems
+    assert "TASK-002: effort 'soon' has no duration" in problems
+    assert "TASK-002: depends on itself" in problems
+    assert "TASK-001: unknown dependency TASK-009" in problems
+
+
+def test_cycles_are_reported_and_block_the_critical_path():
+    tasks = plan(("TASK-001", "1 day", ["TASK-003"]), ("TASK-002", "1 day", ["TASK-001"]),
+                 ("TASK-003", "1 day", ["TASK-002"]), ("TASK-004", "1 day", []))
+    assert topological_order(tasks) is None
+    cycle = find_dependency_cycle(tasks)
+    assert cycle[0] == cycle[-1] and set(cycle) == {"TASK-001", "TASK-002", "TASK-003"}
+    assert any(problem.startswith("dependency cycle:") for problem in validate_tasks(tasks))
+    with pytest.raises(ValueError, match="Dependency cycle"):
+        critical_path(tasks)
+
+
+def test_critical_path_uses_default_days_for_unknown_effort():
+    tasks = plan(("TASK-001", "", []), ("TASK-002", "3 days", ["TASK-001"]), ("TASK-003", "1 day", []))
+    assert critical_path(tasks, default_days=2.0) == (["TASK-001", "TASK-002"], 5.0)
+    assert critical_path([]) == ([], 0.0)
+
+
+def test_export_jsonl_and_csv(tmp_path):
+    tasks = plan(("TASK-001", "2 days", []), ("TASK-002", "1 day", ["TASK-001"]))
+    to_jsonl(tasks, tmp_path / "tasks.jsonl")
+    rows = [json.loads(line) for line in (tmp_path / "tasks.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert rows[1]["type"] == "task" and rows[1]["dependencies"] == ["TASK-001"]
+
+    to_csv(tasks, tmp_path / "tasks.csv")
+    lines = (tmp_path / "tasks.csv").read_text(encoding="utf-8").splitlines()
+    assert lines[0].startswith("id,title,feature")
+    assert lines[2].endswith(",1 day,1.0,TASK-001")
@@ -0,0 +1,112 @@
+# test_cost_estimator.py
+
+# Tests for the dry-run estimator with stand-in agents that only provide the prompt builders it reads.
+# Token counts use the ~4 characters/token heuristic so they do not depend on tiktoken being installed.
+import json
+
+import pytest
+
+from cost_estimator import (
+    CHAT_MODEL, DEFAULT_OUTPUT_TOKENS, TOKENS_PER_MESSAGE, TOKENS_PER_REPLY, WorkflowEstimator,
+    load_latency_profile, sum_calls,
+)
+
+
+class FakeWorker:
+    def build_system_prompt(self):
+        return "w" * 40
+
+
+class FakeEvaluationAgent:
+    persona = "e" * 20
+    worker_agent = FakeWorker()
+
+    def __init__(self, max_interactions=3):
+        self.max_interactions = max_interactions
+
+    def build_eval_prompt(self, answer):
+        return "evaluate" + answer
+
+    def build_instruction_prompt(self, evaluation):
+        return "instruct" + evaluation
+
+    def build_refinement_prompt(self, step, answer, instructions):
+        return step + "-refine" + answer + instructions
+
+
+class FakePlanner:
+    def build_system_prompt(self):
+        return "p" * 80
+
+
+class FakeRouter:
+    agents = [{"description": "d" * 16}, {"description": "d" * 32}]
+
+
+@pytest.fixture
+def estimator():
+    estimator = WorkflowEstimator(
+        pricing={CHAT_MODEL: (1.0, 2.0)},
+        latency_profile={CHAT_MODEL: {"overhead_s": 1.0, "input_tokens_per_s": 100, "output_tokens_per_s": 10}},
+    )
+    estimator.counter.tiktoken = None
+    return estimator
+
+
+def test_call_cost_and_latency(estimator):
+    call = estimator.call(CHAT_MODEL, 1000, 500)
+    assert call["cost_usd"] == pytest.approx((1000 * 1.0 + 500 * 2.0) / 1_000_000)
+    assert call["latency_s"] == pytest.approx(1.0 + 1000 / 100 + 500 / 10)
+    assert estimator.call("unknown-model", 10, 10)["cost_usd"] == 0.0
+
+
+def test_chat_call_counts_format_overhead_and_embedded_outputs(estimator):
+    call = estimator.chat_call("s" * 8, "u" * 9, output_tokens=5, embedded_tokens=100)
+    assert call["input_tokens"] == TOKENS_PER_REPLY + 2 * TOKENS_PER_MESSAGE + 2 + 3 + 100
+    assert call["output_tokens"] == 5
+
+
+def test_team_loop_best_and_worst_case(estimator):
+    agent = FakeEvaluationAgent()
+    approved_first = estimator.team_iterations("step", agent, "Product Manager", 1, approved=True)
+    assert len(approved_first) == 2  # worker + evaluation, no instructions
+
+    never_approved = estimator.team_iterations("step", agent, "Product Manager", 3, approved=False)
+    assert len(never_approved) == 9  # worker + evaluation + instructions per iteration
+    worker_calls = never_approved[::3]
+    # Refinement prompts embed the rejected answer and the instructions
+    embedded = DEFAULT_OUTPUT_TOKENS["Product Manager"] + DEFAULT_OUTPUT_TOKENS["instructions"]
+    assert worker_calls[1]["input_tokens"] - worker_calls[0]["input_tokens"] >= embedded
+    assert worker_calls[1]["input_tokens"] == worker_calls[2]["input_tokens"]
+
+
+def test_estimate_totals_match_components(estimator):
+    steps = [("stories", "Product Manager", FakeEvaluationAgent(3)),
+             ("tasks", "Development Engineer", FakeEvaluationAgent(2))]
+    report = estimator.estimate(FakePlanner(), "plan this", FakeRouter(), steps)
+
+    assert report["tokenizer"] == "heuristic"
+    assert report["components"]["Routing"]["best"]["calls"] == 2 * (1 + len(FakeRouter.agents))
+    assert report["components"]["Product Manager"]["worst"]["calls"] == 9
+    assert report["components"]["Development Engineer"]["worst"]["calls"] == 6
+    for case in ("best", "worst"):
+        components = [totals[case] for totals in report["components"].values()]
+        assert report[case]["calls"] == sum(totals["calls"] for totals in components)
+        assert report[case]["cost_usd"] == pytest.approx(sum(totals["cost_usd"] for totals in components))
+    assert report["worst"]["cost_usd"] > report["best"]["cost_usd"]
+
+
+def test_sum_calls_of_nothing():
+    assert sum_calls([]) == {"calls": 0, "input_tokens": 0, "output_tokens": 0, "cost_usd": 0, "latency_s": 0}
+
+
+def test_latency_profile_is_merged_over_defaults(tmp_path):
+    path = tmp_path / "profile.json"
+    path.write_text(json.dumps({CHAT_MODEL: {"overhead_s": 2.0}, "my-model": {"overhead_s": 0.1},
+                                "output_tokens": {"planner": 10}}), encoding="utf-8")
+    profile, output_tokens = load_latency_profile(path)
+    assert profile[CHAT_MODEL]["overhead_s"] == 2.0
+    assert profile[CHAT_MODEL]["output_tokens_per_s"] == 90
+    assert profile["my-model"] == {"overhead_s": 0.1}
+    assert output_tokens["planner"] == 10
+    assert output_tokens["evaluation"] == DEFAULT_OUTPUT_TOKENS["evaluation"]
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Record/replay cassette for LLM and embedding calls.
+
+Runs as an OpenAI-compatible proxy. Every module in the repo builds its OpenAI client from the
+environment (base_agents.py, src/utils.get_completion, project_lib.do_chat_completion's callers,
+the course2 call_api/llm_call wrappers), so setting OPENAI_BASE_URL routes all of their chat
+and embedding calls through the cassette without touching their code.
+
+Modes:
+    record  forward every request upstream and store the request/response pair
+    replay  serve stored responses only; a request that is not on the cassette gets a 404
+    auto    replay hits, record misses
+
+Requests are keyed by a hash of the normalized request (path + body with sorted keys, None
+values dropped and message text stripped). When the same request was recorded several times
+(e.g. temperature > 0), replay serves the recordings in the order they were captured.
+
+Only successful (2xx) responses are recorded, so a 401 or a 400 from a misconfigured run is
+not replayed later; --record-errors also records 4xx answers (never 429 or 5xx).
+
+The cassette is gzip-compressed JSON lines, one entry per call:
+    {"key", "path", "model", "status", "content_type", "body", "latency_s"}
+so it can also feed the mock server's trace latency distribution.
+
+Usage:
+    python tools/llm_cassette.py record --cassette runs/claims.cassette.jsonl.gz
+    python tools/llm_cassette.py replay --cassette runs/claims.cassette.jsonl.gz --latency-scale 1.0
+    OPENAI_BASE_URL=http://127.0.0.1:8766/v1 python <module>.py
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from mock_openai_server import MockOpenAIHandler, MockOpenAIServer
+
+DEFAULT_UPSTREAM = "https://api.openai.com/v1"
+
+
+#================================#
+# ----- Request Keys ----- #
+#================================#
+
+def normalize_request(path, payload):
+    """
+    Reduce a request to the fields that determine its response.
+
+    Args:
+        path: Endpoint path, e.g. "/chat/completions"
+        payload: Parsed JSON body
+
+    Returns:
+        dict: Normalized request
+    """
+    def clean(value):
+        if isinstance(value, dict):
+            return {key: clean(item) for key, item in sorted(value.items()) if item is not None}
+        if isinstance(value, list):
+            return [clean(item) for item in value]
+        if isinstance(value, str):
+            return value.strip()
+        return value
+
+    body = clean(payload)
+    # Client-side bookkeeping that does not change the model output
+    for field in ("user", "stream_options", "metadata"):
+        body.pop(field, None)
+    return {"path": path, "body": body}
+
+
+def request_key(path, payload):
+    """Stable hash of the normalized request, used as the cassette key."""
+    normalized = json.dumps(normalize_request(path, payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+#================================#
+# ----- Cassette ----- #
+#================================#
+
+class Cassette:
+    """
+    Recorded request/response pairs backed by a gzip JSON lines file.
+
+    A run appends its entries to one gzip stream that stays open and is sync-flushed after
+    every entry, so a crash mid-run loses at most the call in flight. The stream trailer is
+    written by close(); a cassette left without one by a crash is rewritten as a single
+    stream the next time it is opened.
+    """
+
+    def __init__(self, path, truncate=False):
+        """
+        Args:
+            path: Cassette file (.jsonl.gz)
+            truncate: Start an empty cassette instead of loading the existing file
+        """
+        self.path = Path(path)
+        self.entries = {}
+        self._cursors = {}
+        self._lock = threading.Lock()
+        self._file = None
+        if truncate and self.path.exists():
+            self.path.unlink()
+        if self.path.exists():
+            entries, complete = self._read()
+            for entry in entries:
+                self.entries.setdefault(entry["key"], []).append(entry)
+            if not complete:
+                self._compact(entries)
+
+    def _read(self):
+        """Entries of the cassette file, and False when it ends without a gzip trailer (crashed run)."""
+        entries = []
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    if line.endswith("\n"):
+                        entries.append(json.loads(line))
+            except EOFError:
+                return entries, False
+        return entries, True
+
+    def _compact(self, entries):
+        """Rewrite the entries as one complete gzip stream."""
+        partial = self.path.with_name(self.path.name + ".tmp")
+        with gzip.open(partial, "wt", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        os.replace(partial, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return sum(len(recordings) for recordings in self.entries.values())
+
+    def lookup(self, key):
+        """
+        Return the next recording for a key (cycling through repeats), or None on a miss.
+        """
+        with self._lock:
+            recordings = self.entries.get(key)
+            if not recordings:
+                return None
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            return recordings[cursor % len(recordings)]
+
+    def record(self, entry):
+        """Store an entry in memory and append it to the cassette file."""
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            self.entries.setdefault(entry["key"], []).append(entry)
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = gzip.open(self.path, "ab")
+            self._file.write(line.encode("utf-8"))
+            self._file.flush()
+
+    def close(self):
+        """Finish the gzip stream of this run."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+#================================#
+# ----- Proxy Server ----- #
+#================================#
+
+class CassetteHandler(MockOpenAIHandler):
+    """Serves requests from the cassette and/or forwards them upstream."""
+
+    def do_GET(self):
+        if self._route() == "/stats":
+            self._send_json(200, self.server.snapshot_stats())
+        else:
+            self._send_error(404, f"Unknown route {self.path}", "invalid_request_error")
+
+    def do_POST(self):
+        route = self._route()
+        raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            payload = json.loads(raw or b"{}")
+        except json.JSONDecodeError:
+            self._send_error(400, "Request body is not valid JSON", "invalid_request_error")
+            return
+
+        server = self.server
+        server.count("requests")
+        key = request_key(route, payload)
+
+        if server.mode in ("replay", "auto"):
+            entry = server.cassette.lookup(key)
+            if entry is not None:
+                server.count("hits")
+                time.sleep(entry.get("latency_s", 0.0) * server.latency_scale)
+                self._send_entry(entry)
+                return
+            server.count("misses")
+            if server.mode == "replay":
+                self._send_error(404, f"Request not on cassette (key {key[:12]})", "cassette_miss")
+                return
+
+        entry = self._forward(route, raw, key, payload)
+        status = entry["status"]
+        if 200 <= status < 300 or (server.record_errors and 400 <= status < 500 and status != 429):
+            # Other answers (errors, transient upstream failures) are passed through only
+            server.cassette.record(entry)
+            server.count("recorded")
+        else:
+            server.count("errors")
+        self._send_entry(entry)
+
+    def _forward(self, route, raw, key, payload):
+        """
+        Send the request upstream and capture the response as a cassette entry.
+
+        An unreachable or timed-out upstream becomes a 502 entry with an OpenAI-style error
+        body, so the client sees a retryable error instead of a dropped connection.
+        """
+        request = urllib.request.Request(
+            self.server.upstream + route,
+            data=raw,
+            method="POST",
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": self.headers.get("Authorization", ""),
+            },
+        )
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.server.upstream_timeout) as response:
+                status, content_type, body = response.status, response.headers.get("Content-Type"), response.read()
+        except urllib.error.HTTPError as e:
+            status, content_type, body = e.code, e.headers.get("Content-Type"), e.read()
+        except (urllib.error.URLError, socket.timeout, ConnectionError) as e:
+            reason = getattr(e, "reason", e)
+            status, content_type = 502, "application/json"
+            body = json.dumps({"error": {
+                "message": f"Upstream {self.server.upstream} unreachable: {reason}",
+                "type": "upstream_error",
+                "code": None,
+            }}).encode("utf-8")
+        return {
+            "key": key,
+            "path": route,
+            "model": payload.get("model"),
+            "status": status,
+            "content_type": content_type or "application/json",
+            "body": body.decode("utf-8"),
+            "latency_s": round(time.perf_counter() - start, 4),
+        }
+
+    def _send_entry(self, entry):
+        data = entry["body"].encode("utf-8")
+        self.send_response(entry["status"])
+        self.send_header("Content-Type", entry["content_type"])
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class CassetteServer(MockOpenAIServer):
+    """Threaded proxy holding the cassette, mode and upstream settings."""
+
+    def __init__(self, address, cassette, mode="replay", upstream=DEFAULT_UPSTREAM,
+                 latency_scale=0.0, timeout=120, record_errors=False, verbose=False):
+        """
+        Args:
+            address: (host, port) to bind
+            cassette: Cassette to read from / write to
+            mode: "record", "replay" or "auto"
+            upstream: Real API base URL used in record/auto mode
+            latency_scale: Multiplier for recorded latency on replay (0 = as fast as possible)
+            timeout: Upstream request timeout in seconds
+            record_errors: Also record 4xx answers (other than 429), not only 2xx
+            verbose: Log every request
+        """
+        if mode not in ("record", "replay", "auto"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        super().__init__(address, config=None, verbose=verbose)
+        self.RequestHandlerClass = CassetteHandler
+        self.cassette = cassette
+        self.mode = mode
+        self.upstream = upstream.rstrip("/")
+        self.latency_scale = latency_scale
+        self.upstream_timeout = timeout
+        self.record_errors = record_errors
+        self._stats.update({"hits": 0, "misses": 0, "recorded": 0})
+
+
+def start_proxy(cassette, mode="replay", host="127.0.0.1", port=0, **kwargs):
+    """
+    Start the cassette proxy on a background thread (port 0 picks a free port).
+
+    Returns:
+        CassetteServer: The running server; use .base_url as OPENAI_BASE_URL
+    """
+    server = CassetteServer((host, port), cassette, mode=mode, **kwargs)
+    threading.Thread(target=server.serve_forever, name="llm-cassette", daemon=True).start()
+    return server
+
+
+#================================#
+# ----- CLI ----- #
+#================================#
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay cassette proxy for OpenAI calls")
+    parser.add_argument("mode", choices=["record", "replay", "auto"])
+    parser.add_argument("--cassette", required=True, help="Cassette file (.jsonl.gz)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--upstream", default=os.getenv("OPENAI_UPSTREAM_BASE_URL", DEFAULT_UPSTREAM),
+                        help="Real API base URL for record/auto (e.g. https://openai.vocareum.com/v1)")
+    parser.add_argument("--append", action="store_true", help="Record mode: keep existing entries")
+    parser.add_argument("--record-errors", action="store_true",
+                        help="Also record 4xx answers (other than 429); by default only 2xx are recorded")
+    parser.add_argument("--latency-scale", type=float, default=0.0,
+                        help="Replay recorded latency times this factor (0 = no delay)")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    cassette = Cassette(args.cassette, truncate=(args.mode == "record" and not args.append))
+    server = CassetteServer((args.host, args.port), cassette, mode=args.mode, upstream=args.upstream,
+                            latency_scale=args.latency_scale, record_errors=args.record_errors,
+                            verbose=args.verbose)
+    print(f"Cassette proxy ({args.mode}) on {server.base_url} - {len(cassette)} recorded calls loaded")
+    print(f"  export OPENAI_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        cassette.close()
+        print(f"Stats: {server.snapshot_stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+Local OpenAI-compatible mock server for offline throughput benchmarking.
+
+Implements the endpoints our workflows use:
+    POST /v1/chat/completions   (plain, streaming, and response_format json_schema,
+                                 which is what client.beta.chat.completions.parse sends)
+    POST /v1/embeddings
+    GET  /v1/models
+    GET  /stats                 (request / error counters of this server)
+
+Latency can be fixed, lognormal or replayed from a recorded trace, and errors / 429s can be
+injected at a configurable rate. Responses are scripted (regex rules) or deterministic
+(derived from a hash of the request, or synthesized from the JSON schema).
+
+Every OpenAI client in the repo reads OPENAI_BASE_URL, so pointing a module at the mock is:
+    python tools/mock_openai_server.py --port 8765 --latency-dist lognormal --latency-median 0.8
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=mock python <module>.py
+
+Standard library only, so it runs anywhere the workflows run.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_EMBEDDING_DIMENSIONS = {"text-embedding-3-large": 3072, "text-embedding-3-small": 1536}
+
+
+#================================#
+# ----- Configuration ----- #
+#================================#
+
+class MockConfig:
+    """Behaviour of the mock server: latency model, fault injection and response script."""
+
+    def __init__(self, latency_dist="fixed", latency=0.0, latency_median=0.5, latency_sigma=0.5,
+                 latency_trace=None, error_rate=0.0, rate_limit_rate=0.0, retry_after=1,
+                 script=None, responder=None, stream_chunk_chars=16, seed=None):
+        """
+        Args:
+            latency_dist: "fixed", "lognormal" or "trace"
+            latency: Seconds per request for the fixed distribution
+            latency_median: Median seconds for the lognormal distribution
+            latency_sigma: Shape (sigma of the underlying normal) for the lognormal distribution
+            latency_trace: Recorded latencies in seconds, replayed in order (cycled)
+            error_rate: Probability of answering 500
+            rate_limit_rate: Probability of answering 429 with Retry-After
+            retry_after: Seconds sent in the Retry-After header of injected 429s
+            script: {"rules": [{"match": regex, "response": str | list}], "default": str}
+            responder: Optional callable(payload) -> str | None for programmatic fake LLMs;
+                consulted after the script rules
+            stream_chunk_chars: Characters per streamed content chunk
+            seed: Seed for latency sampling and fault injection
+        """
+        if latency_dist not in ("fixed", "lognormal", "trace"):
+            raise ValueError(f"Unknown latency distribution: {latency_dist}")
+        if latency_dist == "trace" and not latency_trace:
+            raise ValueError("The trace latency distribution needs a non-empty latency_trace")
+        self.latency_dist = latency_dist
+        self.latency = latency
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.latency_trace = list(latency_trace or [])
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.rules = [
+            (re.compile(rule["match"], re.IGNORECASE | re.DOTALL), rule["response"])
+            for rule in (script or {}).get("rules", [])
+        ]
+        self.default_response = (script or {}).get("default")
+        self.responder = responder
+        self.stream_chunk_chars = stream_chunk_chars
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._trace_index = 0
+        self._rule_counters = {}
+
+    def sample_latency(self):
+        """Return the latency in seconds for the next request."""
+        with self._lock:
+            if self.latency_dist == "lognormal":
+                return self._random.lognormvariate(math.log(self.latency_median), self.latency_sigma)
+            if self.latency_dist == "trace":
+                value = self.latency_trace[self._trace_index % len(self.latency_trace)]
+                self._trace_index += 1
+                return value
+            return self.latency
+
+    def sample_fault(self):
+        """Return "error", "rate_limit" or None for the next request."""
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            return "rate_limit"
+        if roll < self.rate_limit_rate + self.error_rate:
+            return "error"
+        return None
+
+    def scripted_response(self, text):
+        """
+        Return the scripted reply for a request, or None if no rule matches.
+
+        A rule whose response is a list cycles through it on every match.
+        """
+        for index, (pattern, response) in enumerate(self.rules):
+            if pattern.search(text):
+                if isinstance(response, list):
+                    with self._lock:
+                        count = self._rule_counters.get(index, 0)
+                        self._rule_counters[index] = count + 1
+                    return response[count % len(response)]
+                return response
+        return self.default_response
+
+
+def load_latency_trace(path):
+    """
+    Load recorded latencies: a JSON list of seconds, or JSON lines with a "latency_s" field
+    (such as a cassette recorded by llm_cassette.py; .gz files are decompressed).
+
+    Args:
+        path: Trace file
+
+    Returns:
+        list[float]: Latencies in seconds
+    """
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        content = f.read().strip()
+    if content.startswith("["):
+        return [float(value) for value in json.loads(content)]
+    return [float(json.loads(line)["latency_s"]) for line in content.splitlines() if line.strip()]
+
+
+#================================#
+# ----- Response Builders ----- #
+#================================#
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token) used for the usage block."""
+    return max(1, math.ceil(len(text) / 4))
+
+
+def request_digest(payload):
+    """Stable short hash of a request body, used to derive deterministic responses."""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+def synthesize_from_schema(schema, defs=None, name=""):
+    """
+    Build a deterministic JSON instance that validates against a JSON schema.
+
+    Covers what pydantic emits for our models: objects, arrays, enums/Literal, $ref/$defs,
+    anyOf (Optional), numeric bounds and string lengths.
+
+    Args:
+        schema: JSON schema (sub)tree
+        defs: $defs of the root schema
+        name: Property name, used to make string values readable
+
+    Returns:
+        Any: A value matching the schema
+    """
+    defs = defs if defs is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return synthesize_from_schema(defs[schema["$ref"].split("/")[-1]], defs, name)
+    if "const" in schema:
+        return schema["const"]
+    if "enum" in schema:
+        return schema["enum"][0]
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [option for option in schema[key] if option.get("type") != "null"] or schema[key]
+            return synthesize_from_schema(options[0], defs, name)
+
+    schema_type = schema.get("type", "object")
+    if isinstance(schema_type, list):
+        schema_type = next((t for t in schema_type if t != "null"), "null")
+    if schema_type == "object":
+        return {
+            prop: synthesize_from_schema(sub_schema, defs, prop)
+            for prop, sub_schema in schema.get("properties", {}).items()
+        }
+    if schema_type == "array":
+        count = max(1, schema.get("minItems", 1))
+        return [synthesize_from_schema(schema.get("items", {}), defs, name) for _ in range(count)]
+    if schema_type in ("number", "integer"):
+        low = schema.get("minimum", schema.get("exclusiveMinimum", 0))
+        high = schema.get("maximum", schema.get("exclusiveMaximum", low + 2))
+        value = (low + high) / 2
+        return int(value) if schema_type == "integer" else float(value)
+    if schema_type == "boolean":
+        return True
+    if schema_type == "null":
+        return None
+    value = f"mock {name}".strip() if name else "mock"
+    min_length = schema.get("minLength", 0)
+    max_length = schema.get("maxLength")
+    value = value.ljust(min_length, "x")
+    return value[:max_length] if max_length else value
+
+
+def completion_content(payload, config):
+    """
+    Decide the assistant message content for a chat completion request.
+
+    Order: scripted rule -> responder -> JSON schema instance -> JSON object -> deterministic text.
+    """
+    messages = payload.get("messages", [])
+    text = "\n".join(str(message.get("content", "")) for message in messages)
+    scripted = config.scripted_response(text)
+    if scripted is not None:
+        return scripted if isinstance(scripted, str) else json.dumps(scripted)
+    if config.responder is not None:
+        response = config.responder(payload)
+        if response is not None:
+            return response
+
+    response_format = payload.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        schema = response_format.get("json_schema", {}).get("schema", {})
+        return json.dumps(synthesize_from_schema(schema))
+    if response_format.get("type") == "json_object":
+        return "{}"
+    return f"Deterministic mock response {request_digest(payload)}."
+
+
+def chat_completion_body(payload, content):
+    """Build a non-streaming chat.completion object."""
+    prompt_tokens = sum(estimate_tokens(str(m.get("content", ""))) for m in payload.get("messages", []))
+    completion_tokens = estimate_tokens(content)
+    return {
+        "id": f"chatcmpl-mock-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": payload.get("model", "mock-model"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content, "refusal": None},
+            "logprobs": None,
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def embedding_vector(text, dimensions):
+    """Deterministic unit vector derived from the text (identical inputs -> identical vectors)."""
+    generator = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+    vector = [generator.gauss(0.0, 1.0) for _ in range(dimensions)]
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+def embeddings_body(payload):
+    """Build an embeddings list object."""
+    inputs = payload.get("input", "")
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    model = payload.get("model", "text-embedding-3-small")
+    dimensions = payload.get("dimensions") or DEFAULT_EMBEDDING_DIMENSIONS.get(model, 1536)
+    tokens = sum(estimate_tokens(str(text)) for text in inputs)
+    return {
+        "object": "list",
+        "data": [
+            {"object": "embedding", "index": index, "embedding": embedding_vector(str(text), dimensions)}
+            for index, text in enumerate(inputs)
+        ],
+        "model": model,
+        "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+    }
+
+
+#================================#
+# ----- HTTP Server ----- #
+#================================#
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    """Request handler; behaviour comes from self.server.config (a MockConfig)."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, str(value))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status, message, error_type, headers=None):
+        self._send_json(status, {"error": {"message": message, "type": error_type, "code": None}}, headers)
+
+    def _route(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+        return path[3:] if path.startswith("/v1") else path
+
+    def do_GET(self):
+        route = self._route()
+        if route == "/models":
+            self._send_json(200, {"object": "list", "data": [{"id": "mock-model", "object": "model"}]})
+        elif route == "/stats":
+            self._send_json(200, self.server.snapshot_stats())
+        else:
+            self._send_error(404, f"Unknown route {self.path}", "invalid_request_error")
+
+    def do_POST(self):
+        route = self._route()
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_error(400, "Request body is not valid JSON", "invalid_request_error")
+            return
+        if route not in ("/chat/completions", "/embeddings"):
+            self._send_error(404, f"Unknown route {self.path}", "invalid_request_error")
+            return
+
+        config = self.server.config
+        self.server.count("requests")
+        time.sleep(config.sample_latency())
+
+        fault = config.sample_fault()
+        if fault == "rate_limit":
+            self.server.count("rate_limited")
+            self._send_error(429, "Rate limit reached (injected by mock server)", "rate_limit_error",
+                             {"Retry-After": config.retry_after})
+            return
+        if fault == "error":
+            self.server.count("errors")
+            self._send_error(500, "Internal server error (injected by mock server)", "server_error")
+            return
+
+        if route == "/embeddings":
+            self._send_json(200, embeddings_body(payload))
+            return
+
+        content = completion_content(payload, config)
+        body = chat_completion_body(payload, content)
+        if payload.get("stream"):
+            self._stream(body, include_usage=(payload.get("stream_options") or {}).get("include_usage", False))
+        else:
+            self._send_json(200, body)
+
+    def _stream(self, body, include_usage):
+        """Send a completion as server-sent chat.completion.chunk events."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        content = body["choices"][0]["message"]["content"]
+        size = self.server.config.stream_chunk_chars
+        base = {key: body[key] for key in ("id", "created", "model")}
+        base["object"] = "chat.completion.chunk"
+
+        def event(choices, **extra):
+            chunk = dict(base, choices=choices, **extra)
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        event([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+        for start in range(0, len(content), size):
+            event([{"index": 0, "delta": {"content": content[start:start + size]}, "finish_reason": None}])
+        event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if include_usage:
+            event([], usage=body["usage"])
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the mock configuration and request counters."""
+
+    daemon_threads = True
+
+    def __init__(self, address, config, verbose=False):
+        super().__init__(address, MockOpenAIHandler)
+        self.config = config
+        self.verbose = verbose
+        self._stats = {"requests": 0, "errors": 0, "rate_limited": 0}
+        self._stats_lock = threading.Lock()
+
+    def count(self, key):
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def snapshot_stats(self):
+        with self._stats_lock:
+            return dict(self._stats)
+
+    @property
+    def base_url(self):
+        """The value to use as OPENAI_BASE_URL / base_url for clients."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_server(config=None, host="127.0.0.1", port=0, verbose=False):
+    """
+    Start the mock server on a background thread (port 0 picks a free port).
+
+    Args:
+        config: MockConfig (defaults to zero latency, no faults)
+        host: Interface to bind
+        port: Port to bind
+        verbose: Log every request
+
+    Returns:
+        MockOpenAIServer: The running server; call shutdown() to stop it
+    """
+    server = MockOpenAIServer((host, port), config or MockConfig(), verbose=verbose)
+    threading.Thread(target=server.serve_forever, name="mock-openai-server", daemon=True).start()
+    return server
+
+
+#================================#
+# ----- CLI ----- #
+#================================#
+
+def build_config(args):
+    """Translate CLI arguments into a MockConfig."""
+    script = None
+    if args.script:
+        with open(args.script, "r", encoding="utf-8") as f:
+            script = json.load(f)
+    return MockConfig(
+        latency_dist=args.latency_dist,
+        latency=args.latency,
+        latency_median=args.latency_median,
+        latency_sigma=args.latency_sigma,
+        latency_trace=load_latency_trace(args.latency_trace) if args.latency_trace else None,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        script=script,
+        stream_chunk_chars=args.stream_chunk_chars,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Local OpenAI-compatible mock server",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # 200 ms per call, deterministic responses
+  python tools/mock_openai_server.py --latency 0.2
+
+  # Realistic latency with 2% 429s, scripted answers for the claims prompts
+  python tools/mock_openai_server.py --latency-dist lognormal --latency-median 0.9 \\
+      --rate-limit-rate 0.02 --script claims_script.json
+
+  # Replay latencies recorded in a cassette
+  python tools/mock_openai_server.py --latency-dist trace --latency-trace run.cassette.jsonl.gz
+        """
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-dist", choices=["fixed", "lognormal", "trace"], default="fixed")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per request (fixed)")
+    parser.add_argument("--latency-median", type=float, default=0.5, help="Median seconds (lognormal)")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Sigma (lognormal)")
+    parser.add_argument("--latency-trace", help="JSON list or JSON lines with latency_s (trace)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds for injected 429s")
+    parser.add_argument("--script", help='JSON: {"rules": [{"match": regex, "response": ...}], "default": ...}')
+    parser.add_argument("--stream-chunk-chars", type=int, default=16)
+    parser.add_argument("--seed", type=int, help="Seed for latency sampling and fault injection")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    server = MockOpenAIServer((args.host, args.port), build_config(args), verbose=args.verbose)
+    print(f"Mock OpenAI server listening on {server.base_url}")
+    print(f"  export OPENAI_BASE_URL={server.base_url} OPENAI_API_KEY=mock")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,6 @@
+"""Shared setup for the tools tests (the tools are scripts, not a package)"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
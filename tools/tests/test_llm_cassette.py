@@ -0,0 +1,95 @@
+"""Tests for the record/replay cassette proxy"""
+
+import gzip
+import json
+import shutil
+import urllib.error
+import urllib.request
+
+import pytest
+
+from llm_cassette import Cassette, start_proxy
+from mock_openai_server import MockConfig, start_server
+
+CHAT = {"model": "gpt-4.1-nano", "messages": [{"role": "user", "content": "Hello"}]}
+
+
+def post(base_url: str, route: str, payload: dict) -> int:
+    request = urllib.request.Request(base_url + route, data=json.dumps(payload).encode(), method="POST",
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def start(server):
+        started.append(server)
+        return server
+
+    yield start
+    for server in started:
+        server.shutdown()
+        server.server_close()
+
+
+def entry(index: int) -> dict:
+    return {"key": f"k{index % 3}", "path": "/chat/completions", "status": 200, "body": f"answer {index}"}
+
+
+def test_one_gzip_stream_survives_a_crash(tmp_path):
+    path = tmp_path / "run.cassette.jsonl.gz"
+    cassette = Cassette(path)
+    for index in range(50):
+        cassette.record(entry(index))
+    shutil.copy(path, tmp_path / "crashed.jsonl.gz")  # the file as a killed process leaves it
+    cassette.close()
+    with gzip.open(path, "rt") as f:
+        assert len(f.readlines()) == 50
+
+    crashed = Cassette(tmp_path / "crashed.jsonl.gz")
+    assert len(crashed) == 50
+    assert crashed.lookup("k1")["body"] == "answer 1"
+    crashed.record(entry(50))
+    crashed.close()
+    with gzip.open(tmp_path / "crashed.jsonl.gz", "rt") as f:
+        assert [json.loads(line)["body"] for line in f] == [f"answer {index}" for index in range(51)]
+
+
+def recorded_statuses(cassette: Cassette) -> list:
+    return sorted(recording["status"] for recordings in Cassette(cassette.path).entries.values()
+                  for recording in recordings)
+
+
+def test_only_successful_answers_are_recorded(tmp_path, servers):
+    upstream = servers(start_server(MockConfig(script={"default": "Hi"})))
+    cassette = Cassette(tmp_path / "run.cassette.jsonl.gz")
+    proxy = servers(start_proxy(cassette, mode="record", upstream=upstream.base_url))
+
+    assert post(proxy.base_url, "/chat/completions", CHAT) == 200
+    assert post(proxy.base_url, "/unknown", CHAT) == 404
+    cassette.close()
+    assert recorded_statuses(cassette) == [200]
+
+    replay = servers(start_proxy(Cassette(cassette.path), mode="replay"))
+    assert post(replay.base_url, "/chat/completions", CHAT) == 200
+    assert post(replay.base_url, "/unknown", CHAT) == 404
+    assert replay.snapshot_stats()["misses"] == 1
+
+
+def test_error_recording_is_opt_in_and_skips_transient_errors(tmp_path, servers):
+    ok = servers(start_server(MockConfig(script={"default": "Hi"})))
+    limited = servers(start_server(MockConfig(rate_limit_rate=1.0, retry_after=0)))
+    cassette = Cassette(tmp_path / "run.cassette.jsonl.gz")
+    recorder = servers(start_proxy(cassette, mode="record", upstream=ok.base_url, record_errors=True))
+    throttled = servers(start_proxy(cassette, mode="record", upstream=limited.base_url, record_errors=True))
+
+    assert post(recorder.base_url, "/unknown", CHAT) == 404
+    assert post(throttled.base_url, "/chat/completions", CHAT) == 429
+    cassette.close()
+    assert recorded_statuses(cassette) == [404]
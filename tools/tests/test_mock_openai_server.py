@@ -0,0 +1,62 @@
+"""Round trips through the openai SDK against the mock server"""
+
+import openai
+import pytest
+from pydantic import BaseModel
+
+from mock_openai_server import MockConfig, start_server
+
+
+class Verdict(BaseModel):
+    approved: bool
+    reason: str
+
+
+@pytest.fixture
+def client():
+    started = []
+
+    def connect(config):
+        server = start_server(config)
+        started.append(server)
+        return server, openai.OpenAI(base_url=server.base_url, api_key="mock", max_retries=0)
+
+    yield connect
+    for server in started:
+        server.shutdown()
+        server.server_close()
+
+
+def test_chat_streaming_and_embeddings(client):
+    server, api = client(MockConfig(script={"rules": [{"match": "weather", "response": "Sunny all day"}],
+                                            "default": "Hi"}, stream_chunk_chars=4))
+
+    response = api.chat.completions.create(model="gpt-4.1-nano",
+                                           messages=[{"role": "user", "content": "How is the weather?"}])
+    assert response.choices[0].message.content == "Sunny all day"
+    assert response.usage.total_tokens > 0
+
+    chunks = list(api.chat.completions.create(model="gpt-4.1-nano", stream=True,
+                                              stream_options={"include_usage": True},
+                                              messages=[{"role": "user", "content": "Hello"}]))
+    assert "".join(chunk.choices[0].delta.content or "" for chunk in chunks if chunk.choices) == "Hi"
+    assert chunks[-1].usage.completion_tokens > 0
+
+    embeddings = api.embeddings.create(model="text-embedding-3-small", input=["a", "b", "a"])
+    vectors = [item.embedding for item in embeddings.data]
+    assert len(vectors[0]) == 1536 and vectors[0] == vectors[2] != vectors[1]
+    assert server.snapshot_stats()["requests"] == 3
+
+
+def test_structured_output_is_synthesized_from_the_schema(client):
+    _, api = client(MockConfig())
+    response = api.beta.chat.completions.parse(model="gpt-4.1-nano", response_format=Verdict,
+                                               messages=[{"role": "user", "content": "Approve?"}])
+    assert response.choices[0].message.parsed == Verdict(approved=True, reason="mock reason")
+
+
+def test_injected_rate_limit_reaches_the_client(client):
+    server, api = client(MockConfig(rate_limit_rate=1.0, retry_after=0))
+    with pytest.raises(openai.RateLimitError):
+        api.chat.completions.create(model="gpt-4.1-nano", messages=[{"role": "user", "content": "Hello"}])
+    assert server.snapshot_stats()["rate_limited"] == 1